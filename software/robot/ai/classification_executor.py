@@ -0,0 +1,78 @@
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import List, Optional, Set
+import numpy as np
+from robot.global_config import GlobalConfig
+from robot.our_types.classify import ClassificationResult
+from robot.ai.classify import classifyPiece
+
+
+class ClassificationExecutor:
+    # Classifies the frames of a piece concurrently on a bounded pool and
+    # returns as soon as the category is decided: when the leading category
+    # is classification_consensus_margin results ahead of the next, or so far
+    # ahead that the results still pending can't overturn it. Requests that
+    # haven't started by then are cancelled and ones in flight are ignored.
+    def __init__(self, global_config: GlobalConfig):
+        self.global_config = global_config
+        self.logger = global_config["logger"].ctx(system="classification_executor")
+        self.metrics = global_config["metrics"]
+        self.executor = ThreadPoolExecutor(
+            max_workers=global_config["classification_max_workers"],
+            thread_name_prefix="classification",
+        )
+
+    def classifyFrames(
+        self, frames: List[np.ndarray], timeout_s: float
+    ) -> List[ClassificationResult]:
+        start_time = time.time()
+        deadline = start_time + timeout_s
+        pending: Set[Future] = {
+            self.executor.submit(classifyPiece, [frame], self.global_config)
+            for frame in frames
+        }
+
+        results: List[ClassificationResult] = []
+        while pending:
+            done, pending = wait(
+                pending,
+                timeout=max(0.0, deadline - time.time()),
+                return_when=FIRST_COMPLETED,
+            )
+            if not done:
+                self.logger.warning(
+                    f"Classification timed out after {timeout_s}s with {len(pending)} requests pending"
+                )
+                break
+
+            for future in done:
+                result = future.result()
+                if result:
+                    results.append(result)
+
+            if self._isDecided(results, len(pending)):
+                break
+
+        for future in pending:
+            future.cancel()
+
+        duration = time.time() - start_time
+        self.metrics.histogram("classification.duration_s").record(duration)
+        self.logger.info(
+            f"Classified {len(results)} of {len(frames)} frames in {duration:.3f}s, {len(pending)} skipped"
+        )
+        return results
+
+    def _isDecided(self, results: List[ClassificationResult], num_pending: int) -> bool:
+        if not results:
+            return False
+
+        counts = Counter(result["category_id"] for result in results).most_common(2)
+        leader_count = counts[0][1]
+        runner_up_count = counts[1][1] if len(counts) > 1 else 0
+        margin = leader_count - runner_up_count
+        return (
+            margin >= self.global_config["classification_consensus_margin"]
+            or margin > num_pending
+        )
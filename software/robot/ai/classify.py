@@ -1,30 +1,37 @@
 import numpy as np
-import requests
+import os
 from PIL import Image
 from typing import cast, Optional, Dict, List
 import io
 from robot.global_config import GlobalConfig
 from robot.ai.brickognize_types import BrickognizeClassificationResult
 from robot.our_types.classify import ClassificationResult
-from robot.piece.bricklink.api import getPartInfo
-from robot.piece.bricklink.auth import mkAuth
+from robot.piece.category_resolver import getCategoryResolver
+from robot.util.http_client import getHttpClient
+
+# overridable to point classification at a local stub server
+BRICKOGNIZE_API_URL = os.getenv("BRICKOGNIZE_API_URL", "https://api.brickognize.com")
+BRICKOGNIZE_DEADLINE_S = 10.0
 
 
 def brickognizeClassifySegment(
     segment_image: np.ndarray, global_config: GlobalConfig
 ) -> BrickognizeClassificationResult:
-    url = "https://api.brickognize.com/predict/"
+    url = f"{BRICKOGNIZE_API_URL}/predict/"
 
     img = Image.fromarray(segment_image)
     img_bytes = io.BytesIO()
     img.save(img_bytes, format="JPEG")
-    img_bytes.seek(0)
 
-    files = {"query_image": ("segment.jpg", img_bytes, "image/jpeg")}
+    # bytes rather than the buffer, so a retry sends the image again
+    files = {"query_image": ("segment.jpg", img_bytes.getvalue(), "image/jpeg")}
 
     headers = {"accept": "application/json"}
 
-    response = requests.post(url, headers=headers, files=files)
+    response = getHttpClient("brickognize").post(
+        url, headers=headers, files=files, deadline_s=BRICKOGNIZE_DEADLINE_S
+    )
+    response.raise_for_status()
     out = cast(BrickognizeClassificationResult, response.json())
     filter_category_substrings = ["primo", "duplo"]
     out["items"] = [
@@ -68,12 +75,9 @@ def classifyWithBrickognize(
             item_id = best_item.get("id")
 
             if item_id:
-                auth = mkAuth()
-                part_data = getPartInfo(item_id, auth)
-                if part_data and part_data.get("category_id"):
-                    return ClassificationResult(
-                        id=item_id, category_id=str(part_data["category_id"])
-                    )
+                category_id = getCategoryResolver(global_config).resolve(item_id)
+                if category_id:
+                    return ClassificationResult(id=item_id, category_id=category_id)
 
         return None
     except Exception as e:
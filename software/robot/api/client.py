@@ -1,4 +1,6 @@
 import time
+import dataclasses
+from typing import Any, Dict
 from robot.our_types import SystemLifecycleStage
 from robot.our_types.irl_runtime_params import IRLSystemRuntimeParams
 from robot.our_types.bin_state import BinState
@@ -26,6 +28,15 @@ class API:
     def updateIRLRuntimeParams(self, params: IRLSystemRuntimeParams):
         self.controller.irl_interface["runtime_params"] = params
 
+    def getVisionPerformance(self) -> Dict[str, Any]:
+        report = self.controller.vision_system.getPerformanceReport()
+        return {
+            camera: dataclasses.asdict(metrics) for camera, metrics in report.items()
+        }
+
+    def getMetrics(self) -> Dict[str, Any]:
+        return self.controller.global_config["metrics"].snapshot()
+
     def getBinState(self) -> BinState:
         return {
             "bin_contents": self.controller.bin_state_tracker.current_state,
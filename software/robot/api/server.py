@@ -1,7 +1,7 @@
 import asyncio
 from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from typing import Optional
+from typing import Any, Dict, Optional
 from .client import API
 from robot.our_types import SystemLifecycleStage
 from robot.our_types.irl_runtime_params import IRLSystemRuntimeParams
@@ -84,6 +84,20 @@ async def update_irl_runtime_params(params: IRLSystemRuntimeParams):
     return {"success": True}
 
 
+@app.get("/vision/performance")
+async def get_vision_performance() -> Dict[str, Any]:
+    if not api_client:
+        raise HTTPException(status_code=503, detail="API not initialized")
+    return api_client.getVisionPerformance()
+
+
+@app.get("/metrics")
+async def get_metrics() -> Dict[str, Any]:
+    if not api_client:
+        raise HTTPException(status_code=503, detail="API not initialized")
+    return api_client.getMetrics()
+
+
 @app.get("/bin-state")
 async def get_bin_state() -> BinState:
     if not api_client:
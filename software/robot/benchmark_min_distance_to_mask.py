@@ -0,0 +1,104 @@
+import time
+import cv2
+import numpy as np
+from typing import Any, Callable, List, Tuple
+from robot.util.masks import buildDistanceMap, minDistanceFromBoundingBox
+
+# mask resolution of the segmentation model and full camera resolution
+MASK_SIZES = [(384, 640), (1080, 1920)]
+NUM_OBJECTS = 5
+NUM_REFERENCE_RUNS = 1
+NUM_VECTORIZED_RUNS = 50
+
+
+def referenceMinDistanceToMask(
+    obj_bbox: Tuple[int, int, int, int], mask: np.ndarray
+) -> float:
+    # the original per-pixel implementation from vision_system
+    x1_obj, y1_obj, x2_obj, y2_obj = obj_bbox
+
+    mask_pixels = np.where(mask)
+    if len(mask_pixels[0]) == 0:
+        return float("inf")
+
+    mask_y, mask_x = mask_pixels
+
+    min_distance = float("inf")
+    for my, mx in zip(mask_y, mask_x):
+        dx = max(x1_obj - mx, 0, mx - x2_obj)
+        dy = max(y1_obj - my, 0, my - y2_obj)
+        distance = np.sqrt(dx * dx + dy * dy)
+        min_distance = min(min_distance, distance)
+
+    return min_distance
+
+
+def buildFirstFeederMask(height: int, width: int) -> np.ndarray:
+    # roughly the shape the first feeder takes in the feeder camera: a large
+    # rotated ellipse in the upper left of the frame
+    mask = np.zeros((height, width), dtype=np.uint8)
+    center = (int(width * 0.3), int(height * 0.35))
+    axes = (int(width * 0.22), int(height * 0.25))
+    cv2.ellipse(mask, center, axes, 20, 0, 360, 1, -1)
+    return mask.astype(bool)
+
+
+def buildObjectBoundingBoxes(
+    height: int, width: int, rng: np.random.Generator
+) -> List[Tuple[int, int, int, int]]:
+    bboxes = []
+    for _ in range(NUM_OBJECTS):
+        box_w = int(rng.integers(width // 40, width // 15))
+        box_h = int(rng.integers(height // 40, height // 15))
+        x1 = int(rng.integers(width // 3, width - box_w))
+        y1 = int(rng.integers(height // 3, height - box_h))
+        bboxes.append((x1, y1, x1 + box_w, y1 + box_h))
+    return bboxes
+
+
+def timeRuns(fn: Callable[[], List[Any]], runs: int) -> Tuple[float, List[Any]]:
+    start = time.perf_counter()
+    distances: List[Any] = []
+    for _ in range(runs):
+        distances = fn()
+    return (time.perf_counter() - start) / runs, distances
+
+
+def main():
+    rng = np.random.default_rng(0)
+
+    for height, width in MASK_SIZES:
+        mask = buildFirstFeederMask(height, width)
+        bboxes = buildObjectBoundingBoxes(height, width, rng)
+
+        reference_time, reference = timeRuns(
+            lambda: [referenceMinDistanceToMask(bbox, mask) for bbox in bboxes],
+            NUM_REFERENCE_RUNS,
+        )
+
+        # one distance transform per mask per frame, sampled once per object
+        transform_time, _ = timeRuns(
+            lambda: [buildDistanceMap(mask)], NUM_VECTORIZED_RUNS
+        )
+        built_distance_map = buildDistanceMap(mask)
+        assert built_distance_map is not None
+        # the lambda doesn't see the assert's narrowing
+        distance_map: np.ndarray = built_distance_map
+        lookup_time, result = timeRuns(
+            lambda: [minDistanceFromBoundingBox(bbox, distance_map) for bbox in bboxes],
+            NUM_VECTORIZED_RUNS,
+        )
+
+        max_error = max(abs(a - b) for a, b in zip(reference, result))
+        print(
+            f"{width}x{height} mask ({int(mask.sum())} px), {NUM_OBJECTS} objects: "
+            f"reference {reference_time * 1000:.1f}ms, "
+            f"distance transform {transform_time * 1000:.2f}ms + "
+            f"lookups {lookup_time * 1e6:.0f}us, "
+            f"speedup {reference_time / (transform_time + lookup_time):.0f}x, "
+            f"max error {max_error:.4f}px"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import argparse
+import sys
+import time
+from collections import Counter
+from typing import Optional, Tuple, cast
+from robot.global_config import buildGlobalConfig
+from robot.irl.camera import ReplayCamera, ReplayPacing
+from robot.irl.config import IRLSystemInterface
+from robot.our_types import CameraType
+from robot.frame_trace import stageLatencySummary
+from robot.vision_system import SegmentationModelManager
+from robot.websocket_manager import WebSocketManager
+
+REPORT_INTERVAL_S = 5.0
+
+
+class FixedSpeedEncoderManager:
+    # recordings carry no encoder readings, the belt is taken to run at one speed
+    def __init__(self, speed_cm_per_s: float):
+        self.speed_cm_per_s = speed_cm_per_s
+
+    def getCurrentSpeedCmPerS(self) -> float:
+        return self.speed_cm_per_s
+
+    def getLatestSpeedSample(self) -> Optional[Tuple[float, float]]:
+        return time.time(), self.speed_cm_per_s
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run the vision system on recorded camera streams. "
+        "Arguments not listed here are passed on to the robot config."
+    )
+    parser.add_argument("main_camera", help="main camera avi or frame directory")
+    parser.add_argument("feeder_camera", help="feeder camera avi or frame directory")
+    parser.add_argument(
+        "--pacing",
+        choices=[ReplayPacing.REALTIME, ReplayPacing.FAST, ReplayPacing.FIXED],
+        default=ReplayPacing.FAST,
+    )
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--duration-s", type=float, default=None)
+    parser.add_argument("--belt-speed-cm-per-s", type=float, default=0.0)
+    args, robot_args = parser.parse_known_args()
+
+    sys.argv = sys.argv[:1] + robot_args
+    gc = buildGlobalConfig()
+    metrics = gc["metrics"]
+
+    main_camera = ReplayCamera(gc, args.main_camera, args.pacing, args.fps)
+    feeder_camera = ReplayCamera(gc, args.feeder_camera, args.pacing, args.fps)
+    irl_interface = cast(
+        IRLSystemInterface,
+        {"main_camera": main_camera, "feeder_camera": feeder_camera},
+    )
+    vision_system = SegmentationModelManager(
+        gc,
+        irl_interface,
+        WebSocketManager(gc),
+        FixedSpeedEncoderManager(args.belt_speed_cm_per_s),  # type: ignore[arg-type]
+    )
+    events = vision_system.events.subscribe()
+    event_counts: Counter = Counter()
+
+    start_time = time.time()
+    last_report = start_time
+    vision_system.start()
+    try:
+        while not (main_camera.finished and feeder_camera.finished):
+            elapsed = time.time() - start_time
+            if args.duration_s is not None and elapsed >= args.duration_s:
+                break
+
+            for event in events.wait(REPORT_INTERVAL_S):
+                event_counts[event.type.value] += 1
+                print(
+                    f"{event.timestamp - start_time:8.3f}s {event.type.value} "
+                    f"track={event.track_id} region={event.region.value if event.region else None}"
+                )
+
+            if time.time() - last_report >= REPORT_INTERVAL_S:
+                last_report = time.time()
+                print(
+                    f"{last_report - start_time:8.3f}s main frame {main_camera.frame_idx}, "
+                    f"feeder frame {feeder_camera.frame_idx}"
+                )
+    finally:
+        vision_system.stop()
+        main_camera.release()
+        feeder_camera.release()
+
+    elapsed = time.time() - start_time
+    print(f"\nreplayed for {elapsed:.1f}s, pacing {args.pacing}")
+    for camera_type, camera in [
+        (CameraType.MAIN_CAMERA, main_camera),
+        (CameraType.FEEDER_CAMERA, feeder_camera),
+    ]:
+        latency = metrics.histogram(f"vision.{camera_type.value}.latency_s").summary()
+        print(
+            f"{camera_type.value}: {camera.frame_idx} frames "
+            f"({camera.frame_idx / elapsed:.1f}/s), "
+            f"{latency['count']} inferred ({latency['count'] / elapsed:.1f}/s), "
+            f"inference p50 {latency['p50'] * 1000:.1f}ms "
+            f"p95 {latency['p95'] * 1000:.1f}ms p99 {latency['p99'] * 1000:.1f}ms"
+        )
+        for stage, summary in stageLatencySummary(
+            metrics, camera_type.value, elapsed
+        ).items():
+            print(
+                f"  {stage:>16}: p50 {summary['p50']:.1f}ms p95 {summary['p95']:.1f}ms "
+                f"p99 {summary['p99']:.1f}ms max {summary['max']:.1f}ms"
+            )
+
+    print("events: " + ", ".join(f"{k}={v}" for k, v in sorted(event_counts.items())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+import numpy as np
+from robot.global_config import GlobalConfig
+from robot.our_types.classify import (
+    ClassificationConsensus,
+    ClassificationResult,
+    PendingClassification,
+)
+from robot.our_types.known_object import KnownObject
+from robot.our_types.bin import BinCoordinates
+from robot.ai.classification_executor import ClassificationExecutor
+from robot.websocket_manager import WebSocketManager
+from robot.bin_state_tracker import BinStateTracker
+from robot.states.shared_variables import SharedVariables
+
+
+class ClassificationPipeline:
+    # Classifies the piece under the main camera in the background while the
+    # belt carries it on, and turns the results into a known object with a
+    # bin. Bins are only reserved by whoever resolves the classification, so
+    # a result that arrives after its piece was sent to the fallback bin
+    # reserves nothing.
+    def __init__(
+        self,
+        global_config: GlobalConfig,
+        websocket_manager: WebSocketManager,
+        bin_state_tracker: BinStateTracker,
+        shared_variables: SharedVariables,
+    ):
+        self.global_config = global_config
+        self.websocket_manager = websocket_manager
+        self.bin_state_tracker = bin_state_tracker
+        self.shared_variables = shared_variables
+        self.logger = global_config["logger"].ctx(system="classification_pipeline")
+        self.classification_executor = ClassificationExecutor(global_config)
+        # one piece is classified at a time, its frames fan out in the executor
+        self.dispatcher = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="classification_dispatch"
+        )
+        self.known_objects: Dict[str, KnownObject] = {}
+
+    def dispatch(
+        self,
+        object_uuid: str,
+        main_camera_id: str,
+        frames: List[np.ndarray],
+        reference_time: float,
+        distance_past_center_cm: float,
+    ) -> PendingClassification:
+        results = self.dispatcher.submit(
+            self.classification_executor.classifyFrames,
+            frames,
+            self.global_config["classifying_timeout_ms"] / 1000.0,
+        )
+        return PendingClassification(
+            uuid=object_uuid,
+            main_camera_id=main_camera_id,
+            results=results,
+            reference_time=reference_time,
+            distance_past_center_cm=distance_past_center_cm,
+        )
+
+    def resolve(self, pending: PendingClassification) -> Optional[KnownObject]:
+        # blocks until the results are in
+        classification_results = pending.results.result()
+        if not classification_results:
+            self.logger.warning("No valid classification results obtained")
+            return None
+
+        id_counts = Counter([r["id"] for r in classification_results])
+        category_counts = Counter([r["category_id"] for r in classification_results])
+        most_common_id = id_counts.most_common(1)[0][0]
+        most_common_category = category_counts.most_common(1)[0][0]
+        consensus = ClassificationConsensus(
+            id=most_common_id, category_id=most_common_category
+        )
+        self.logger.info(f"CLASSIFICATION CONSENSUS: {consensus}")
+
+        bin_coordinates = self._determineBinCoordinates(most_common_category)
+        return self._recordKnownObject(pending, consensus, bin_coordinates)
+
+    def fallback(self, pending: PendingClassification) -> KnownObject:
+        # when the piece's own bin can't be decided in time, any late result
+        # is ignored
+        consensus = ClassificationConsensus(
+            id="", category_id=self.bin_state_tracker.fallback_category_id
+        )
+        return self._recordKnownObject(
+            pending, consensus, self.bin_state_tracker.fallback_bin_coordinates
+        )
+
+    def _recordKnownObject(
+        self,
+        pending: PendingClassification,
+        consensus: ClassificationConsensus,
+        bin_coordinates: Optional[BinCoordinates],
+    ) -> KnownObject:
+        known_object = KnownObject(
+            uuid=pending.uuid,
+            main_camera_id=pending.main_camera_id,
+            observations=[],  # Not needed for this simplified approach
+            classification_consensus=consensus,
+            bin_coordinates=bin_coordinates,
+            created_at=int(time.time()),
+        )
+        self.known_objects[pending.main_camera_id] = known_object
+        self.shared_variables.all_known_objects.append(known_object)
+
+        self.logger.info(
+            f"WEBSOCKET: Sending classification update for UUID {pending.uuid}: {consensus['id']} (category: {consensus['category_id']})"
+        )
+        self.websocket_manager.broadcastKnownObject(
+            uuid=pending.uuid,
+            classification_id=consensus["id"],
+            bin_coordinates=bin_coordinates,
+        )
+        return known_object
+
+    def _determineBinCoordinates(self, category_id: str) -> Optional[BinCoordinates]:
+        if not category_id:
+            return None
+
+        # Use bin state tracker to find available bin for this category
+        bin_coordinates = self.bin_state_tracker.findAvailableBin(category_id)
+        if bin_coordinates:
+            # Reserve the bin for this category
+            self.bin_state_tracker.reserveBin(bin_coordinates, category_id)
+            self.logger.info(
+                f"BINS: Assigned category {category_id} to bin {bin_coordinates}"
+            )
+            return bin_coordinates
+        else:
+            self.logger.warning(
+                f"BINS: No available bin found for category {category_id}"
+            )
+            return None
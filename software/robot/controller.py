@@ -38,14 +38,14 @@ class Controller:
             global_config["use_prev_bin_state"],
         )
 
-        self.vision_system = SegmentationModelManager(
-            global_config, irl_interface, websocket_manager
-        )
-
         self.encoder_manager = EncoderManager(
             global_config, irl_interface["conveyor_encoder"]
         )
 
+        self.vision_system = SegmentationModelManager(
+            global_config, irl_interface, websocket_manager, self.encoder_manager
+        )
+
         self.sorting_state_machine = SortingStateMachine(
             global_config,
             self.vision_system,
@@ -129,6 +129,7 @@ class Controller:
             SystemLifecycleStage.PAUSED,
         ]:
             if self.lifecycle_stage == SystemLifecycleStage.RUNNING:
+                # paces itself on vision events
                 self.sorting_state_machine.step()
 
             # Broadcast system status every 500ms
@@ -137,7 +138,8 @@ class Controller:
                 self._broadcastSystemStatus()
                 last_status_broadcast = current_time
 
-            time.sleep(0.1)
+            if self.lifecycle_stage != SystemLifecycleStage.RUNNING:
+                time.sleep(0.1)
 
         self.lifecycle_stage = SystemLifecycleStage.STOPPING
 
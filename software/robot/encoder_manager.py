@@ -1,14 +1,15 @@
 import time
 import threading
-from collections import deque
-from typing import List, Tuple, Optional
+from typing import Optional, Tuple
 from robot.global_config import GlobalConfig
 from robot.irl.encoder import Encoder
+from robot.metrics import RollingTimeSeries
 
 HISTORY_CUTOFF_SECONDS = 40
 SPEED_WINDOW_1S_SAMPLES = 10
 SPEED_WINDOW_5S_SAMPLES = 50
 ENCODER_RESPONSE_WAIT_MS = 100
+POSITION_HISTORY_CAPACITY = 1024
 
 
 class EncoderManager:
@@ -17,9 +18,9 @@ class EncoderManager:
         self.encoder = encoder
         self.data_lock = threading.Lock()
 
-        self.position_history: List[Tuple[float, int, float]] = []
-        self.speed_1s_window = deque(maxlen=SPEED_WINDOW_1S_SAMPLES)
-        self.speed_5s_window = deque(maxlen=SPEED_WINDOW_5S_SAMPLES)
+        # distance in cm at each poll, and the speed measured between polls
+        self.position_history = RollingTimeSeries(POSITION_HISTORY_CAPACITY)
+        self.speed_history = gc["metrics"].timeSeries("encoder.speed_cm_per_s")
 
         self.last_position = 0
         self.last_position_time = time.time()
@@ -46,7 +47,6 @@ class EncoderManager:
                 with self.data_lock:
                     self._updateSpeedCalculation(current_time, current_position)
                     self._updatePositionHistory(current_time, current_position)
-                    self._cleanupOldData(current_time)
 
                 time.sleep(self.gc["encoder_polling_delay_ms"] / 1000.0)
             except Exception as e:
@@ -67,8 +67,7 @@ class EncoderManager:
                 speed_cm_per_s = distance_cm / time_diff
 
                 self.current_speed_cm_per_s = speed_cm_per_s
-                self.speed_1s_window.append(speed_cm_per_s)
-                self.speed_5s_window.append(speed_cm_per_s)
+                self.speed_history.add(speed_cm_per_s, current_time)
 
         self.last_position = current_position
         self.last_position_time = current_time
@@ -79,54 +78,48 @@ class EncoderManager:
         distance_cm = (
             current_position / self.encoder.getPulsesPerRevolution()
         ) * self.encoder.getWheelCircumferenceCm()
-        self.position_history.append((current_time, current_position, distance_cm))
-
-    def _cleanupOldData(self, current_time: float) -> None:
-        cutoff_time = current_time - HISTORY_CUTOFF_SECONDS
-        self.position_history = [
-            (t, pos, dist) for t, pos, dist in self.position_history if t > cutoff_time
-        ]
+        self.position_history.add(distance_cm, current_time)
 
     def getDistanceTraveledSince(self, timestamp: float) -> float:
-        with self.data_lock:
-            if not self.position_history:
-                return 0.0
+        cutoff_time = time.time() - HISTORY_CUTOFF_SECONDS
+        _, distances = self.position_history.since(max(timestamp, cutoff_time))
+        if len(distances) == 0:
+            return 0.0
 
-            start_distance = None
-            for t, pos, dist in self.position_history:
-                if t >= timestamp:
-                    start_distance = dist
-                    break
+        start_distance = distances[0]
+        current_distance = distances[-1]
+        return float(start_distance - current_distance)
 
-            if start_distance is None:
-                return 0.0
+    def getExtrapolatedDistanceTraveledSince(self, timestamp: float) -> float:
+        # encoder samples are a poll apart, so the distance between the
+        # samples is extended at the current speed to timestamp and to now
+        current_time = time.time()
+        speed_cm_per_s = self.getCurrentSpeedCmPerS()
+        sample_times, distances = self.position_history.since(timestamp)
+        if len(distances) == 0:
+            return speed_cm_per_s * max(0.0, current_time - timestamp)
 
-            current_distance = self.position_history[-1][2]
-            return start_distance - current_distance
+        sampled_cm = float(distances[0] - distances[-1])
+        unsampled_s = (sample_times[0] - timestamp) + (current_time - sample_times[-1])
+        return sampled_cm + speed_cm_per_s * max(0.0, unsampled_s)
 
     def getCurrentSpeedCmPerS(self) -> float:
         with self.data_lock:
             return self.current_speed_cm_per_s
 
+    def getLatestSpeedSample(self) -> Optional[Tuple[float, float]]:
+        # (poll time, speed in cm/s measured since the poll before it)
+        return self.speed_history.last()
+
     def getAverageSpeed1s(self) -> float:
-        # Note: caller must hold data_lock
-        try:
-            if not self.speed_1s_window:
-                return 0.0
-            return sum(self.speed_1s_window) / len(self.speed_1s_window)
-        except Exception as e:
-            self.gc["logger"].error(f"getAverageSpeed1s error: {e}")
-            return 0.0
+        return self._averageOfLatestSpeeds(SPEED_WINDOW_1S_SAMPLES)
 
     def getAverageSpeed5s(self) -> float:
-        # Note: caller must hold data_lock
-        try:
-            if not self.speed_5s_window:
-                return 0.0
-            return sum(self.speed_5s_window) / len(self.speed_5s_window)
-        except Exception as e:
-            self.gc["logger"].error(f"getAverageSpeed5s error: {e}")
-            return 0.0
+        return self._averageOfLatestSpeeds(SPEED_WINDOW_5S_SAMPLES)
+
+    def _averageOfLatestSpeeds(self, samples: int) -> float:
+        speeds = self.speed_history.latest(samples)
+        return float(speeds.mean()) if len(speeds) else 0.0
 
     def getStatus(self) -> dict:
         with self.data_lock:
@@ -134,7 +127,9 @@ class EncoderManager:
                 "current_speed_cm_per_s": self.current_speed_cm_per_s,
                 "average_speed_1s_cm_per_s": self.getAverageSpeed1s(),
                 "average_speed_5s_cm_per_s": self.getAverageSpeed5s(),
-                "position_history_count": len(self.position_history),
+                "position_history_count": len(
+                    self.position_history.since(time.time() - HISTORY_CUTOFF_SECONDS)[0]
+                ),
             }
 
     def stop(self) -> None:
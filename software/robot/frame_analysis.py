@@ -0,0 +1,309 @@
+import cv2
+import numpy as np
+from typing import Any, Dict, List, Optional, Tuple
+from robot.our_types.vision_system import FrameAnalysis
+from robot.util.masks import letterboxTransform, scaleMaskToFrame
+
+# YOLO model class definitions
+YOLO_CLASSES = {
+    0: "object",
+    1: "first_feeder",
+    2: "second_feeder",
+    3: "main_conveyor",
+    4: "feeder_conveyor",
+}
+
+OBJECT_CLASS_ID = 0
+FIRST_FEEDER_CLASS_ID = 1
+SECOND_FEEDER_CLASS_ID = 2
+MAIN_CONVEYOR_CLASS_ID = 3
+FEEDER_CONVEYOR_CLASS_ID = 4
+
+# BGR colors used when drawing an analysis onto a frame
+CLASS_COLORS = {
+    0: (56, 56, 255),
+    1: (151, 157, 255),
+    2: (31, 112, 255),
+    3: (29, 178, 255),
+    4: (49, 210, 207),
+}
+MASK_OVERLAY_ALPHA = 0.4
+
+# fixed machine geometry, everything except objects
+REGION_CLASS_IDS = [
+    FIRST_FEEDER_CLASS_ID,
+    SECOND_FEEDER_CLASS_ID,
+    MAIN_CONVEYOR_CLASS_ID,
+    FEEDER_CONVEYOR_CLASS_ID,
+]
+
+
+def emptyFrameAnalysis(
+    timestamp: float,
+    capture_timestamp: float,
+    frame_shape: Tuple[int, int] = (0, 0),
+) -> FrameAnalysis:
+    return FrameAnalysis(
+        timestamp=timestamp,
+        capture_timestamp=capture_timestamp,
+        frame_shape=frame_shape,
+        class_ids=np.zeros((0,), dtype=np.int32),
+        track_ids=[],
+        boxes_xyxy=np.zeros((0, 4), dtype=np.float32),
+        masks=np.zeros((0, 0, 0), dtype=bool),
+        mask_bboxes=[],
+        touches_edge=np.zeros((0,), dtype=bool),
+    )
+
+
+def buildFrameAnalysis(
+    results: Any, timestamp: float, capture_timestamp: float
+) -> FrameAnalysis:
+    if not results or len(results) == 0:
+        return emptyFrameAnalysis(timestamp, capture_timestamp)
+
+    # model.predict is always called with a single frame
+    result = results[0]
+    frame_shape = (int(result.orig_shape[0]), int(result.orig_shape[1]))
+
+    if result.masks is None or result.boxes is None or len(result.boxes) == 0:
+        return emptyFrameAnalysis(timestamp, capture_timestamp, frame_shape)
+
+    # one batched device->host transfer per tensor instead of per-instance .item() calls
+    boxes = result.boxes
+    class_ids = boxes.cls.cpu().numpy().astype(np.int32)
+    boxes_xyxy = boxes.xyxy.cpu().numpy().astype(np.float32)
+    masks = result.masks.data.cpu().numpy() > 0.5
+
+    track_ids: List[Optional[str]] = [None] * len(class_ids)
+    if boxes.id is not None:
+        ids = boxes.id.cpu().numpy().astype(np.int64)
+        for i in range(min(len(ids), len(track_ids))):
+            track_ids[i] = str(int(ids[i]))
+
+    return FrameAnalysis(
+        timestamp=timestamp,
+        capture_timestamp=capture_timestamp,
+        frame_shape=frame_shape,
+        class_ids=class_ids,
+        track_ids=track_ids,
+        boxes_xyxy=boxes_xyxy,
+        masks=masks,
+        mask_bboxes=computeMaskBoundingBoxes(masks),
+        touches_edge=computeMasksTouchingEdge(masks),
+    )
+
+
+def remapAnalysisFromCrop(
+    analysis: FrameAnalysis,
+    crop_origin: Tuple[int, int],
+    frame_shape: Tuple[int, int],
+    mask_shape: Tuple[int, int],
+) -> FrameAnalysis:
+    # Moves an analysis of a crop back onto the full frame: boxes are offset by
+    # the crop origin, and masks are warped from the crop's letterboxed mask
+    # grid onto the grid a full frame inference would have produced, so they
+    # line up with the learned scene regions.
+    if len(analysis.class_ids) == 0:
+        return emptyFrameAnalysis(
+            analysis.timestamp, analysis.capture_timestamp, frame_shape
+        )
+
+    crop_x, crop_y = crop_origin
+    crop_gain, crop_pad_x, crop_pad_y = letterboxTransform(
+        analysis.frame_shape, analysis.masks.shape[1:3]
+    )
+    gain, pad_x, pad_y = letterboxTransform(frame_shape, mask_shape)
+
+    # crop mask -> crop pixels -> frame pixels -> full frame mask
+    scale = gain / crop_gain
+    transform = np.array(
+        [
+            [scale, 0.0, (crop_x - crop_pad_x / crop_gain) * gain + pad_x],
+            [0.0, scale, (crop_y - crop_pad_y / crop_gain) * gain + pad_y],
+        ],
+        dtype=np.float32,
+    )
+    masks = np.stack(
+        [_warpMask(mask, transform, mask_shape) for mask in analysis.masks]
+    )
+
+    boxes_xyxy = analysis.boxes_xyxy + np.array(
+        [crop_x, crop_y, crop_x, crop_y], dtype=np.float32
+    )
+
+    # the crop's own edges in the full frame mask grid, warped like the masks
+    # so they round the same way. In the crop's mask grid there is letterbox
+    # padding between them and the border.
+    crop_height, crop_width = analysis.frame_shape
+    crop_content = np.zeros(analysis.masks.shape[1:3], dtype=bool)
+    crop_content[
+        crop_pad_y : crop_pad_y + int(round(crop_height * crop_gain)),
+        crop_pad_x : crop_pad_x + int(round(crop_width * crop_gain)),
+    ] = True
+    crop_rect = computeMaskBoundingBoxes(
+        _warpMask(crop_content, transform, mask_shape)[np.newaxis]
+    )[0]
+    mask_bboxes = computeMaskBoundingBoxes(masks)
+    touches_crop_edge = (
+        computeMasksTouchingRect(mask_bboxes, crop_rect)
+        if crop_rect is not None
+        else np.zeros((len(mask_bboxes),), dtype=bool)
+    )
+
+    return FrameAnalysis(
+        timestamp=analysis.timestamp,
+        capture_timestamp=analysis.capture_timestamp,
+        frame_shape=frame_shape,
+        class_ids=analysis.class_ids,
+        track_ids=analysis.track_ids,
+        boxes_xyxy=boxes_xyxy,
+        masks=masks,
+        mask_bboxes=mask_bboxes,
+        # a mask cut off by the crop is just as incomplete as one cut off by the frame
+        touches_edge=computeMasksTouchingEdge(masks)
+        | touches_crop_edge
+        | analysis.touches_edge,
+    )
+
+
+def _warpMask(
+    mask: np.ndarray, transform: np.ndarray, mask_shape: Tuple[int, int]
+) -> np.ndarray:
+    mask_height, mask_width = mask_shape
+    return cv2.warpAffine(
+        mask.astype(np.uint8),
+        transform,
+        (mask_width, mask_height),
+        flags=cv2.INTER_NEAREST,
+    ).astype(bool)
+
+
+def computeMaskBoundingBoxes(
+    masks: np.ndarray,
+) -> List[Optional[Tuple[int, int, int, int]]]:
+    if masks.shape[0] == 0:
+        return []
+
+    rows = np.asarray(masks.any(axis=2))  # (N, H)
+    cols = np.asarray(masks.any(axis=1))  # (N, W)
+    has_pixels = np.asarray(rows.any(axis=1))
+
+    height, width = masks.shape[1], masks.shape[2]
+    rmin = rows.argmax(axis=1)
+    rmax = height - 1 - rows[:, ::-1].argmax(axis=1)
+    cmin = cols.argmax(axis=1)
+    cmax = width - 1 - cols[:, ::-1].argmax(axis=1)
+
+    bboxes: List[Optional[Tuple[int, int, int, int]]] = []
+    for i in range(masks.shape[0]):
+        if has_pixels[i]:
+            bboxes.append((int(cmin[i]), int(rmin[i]), int(cmax[i]), int(rmax[i])))
+        else:
+            bboxes.append(None)
+    return bboxes
+
+
+def computeMasksTouchingEdge(masks: np.ndarray) -> np.ndarray:
+    if masks.shape[0] == 0:
+        return np.zeros((0,), dtype=bool)
+
+    return np.asarray(
+        masks[:, 0, :].any(axis=1)  # Top edge
+        | masks[:, -1, :].any(axis=1)  # Bottom edge
+        | masks[:, :, 0].any(axis=1)  # Left edge
+        | masks[:, :, -1].any(axis=1)  # Right edge
+    )
+
+
+def computeMasksTouchingRect(
+    mask_bboxes: List[Optional[Tuple[int, int, int, int]]],
+    rect: Tuple[int, int, int, int],
+) -> np.ndarray:
+    # masks reaching the border of rect, for masks that lie inside it
+    x1, y1, x2, y2 = rect
+    return np.array(
+        [
+            bbox is not None
+            and (bbox[0] <= x1 or bbox[1] <= y1 or bbox[2] >= x2 or bbox[3] >= y2)
+            for bbox in mask_bboxes
+        ],
+        dtype=bool,
+    )
+
+
+def className(class_id: int) -> str:
+    return YOLO_CLASSES.get(class_id, f"unknown_{class_id}")
+
+
+def masksByClass(analysis: Optional[FrameAnalysis]) -> Dict[str, List[np.ndarray]]:
+    masks_by_class: Dict[str, List[np.ndarray]] = {}
+    if analysis is None:
+        return masks_by_class
+
+    for i, class_id in enumerate(analysis.class_ids):
+        masks_by_class.setdefault(className(int(class_id)), []).append(
+            analysis.masks[i]
+        )
+    return masks_by_class
+
+
+def indicesForClass(analysis: Optional[FrameAnalysis], class_id: int) -> List[int]:
+    if analysis is None:
+        return []
+    return [int(i) for i in np.flatnonzero(analysis.class_ids == class_id)]
+
+
+def indexForTrackId(
+    analysis: Optional[FrameAnalysis], track_id: str, class_id: int = OBJECT_CLASS_ID
+) -> Optional[int]:
+    if analysis is None:
+        return None
+    for i in indicesForClass(analysis, class_id):
+        if analysis.track_ids[i] == track_id:
+            return i
+    return None
+
+
+def renderFrameAnalysis(frame: np.ndarray, analysis: FrameAnalysis) -> np.ndarray:
+    # draws the detections over frame, which can be a downscaled copy of the
+    # camera frame the analysis came from
+    annotated = frame.copy()
+    if len(analysis.class_ids) == 0:
+        return annotated
+
+    frame_shape = (frame.shape[0], frame.shape[1])
+    box_scale = np.array(
+        [
+            frame_shape[1] / analysis.frame_shape[1],
+            frame_shape[0] / analysis.frame_shape[0],
+        ]
+        * 2
+    )
+    overlay = annotated.copy()
+    for i, class_id in enumerate(analysis.class_ids):
+        color = CLASS_COLORS.get(int(class_id), (255, 255, 255))
+        overlay[scaleMaskToFrame(analysis.masks[i], frame_shape)] = color
+    cv2.addWeighted(
+        overlay, MASK_OVERLAY_ALPHA, annotated, 1 - MASK_OVERLAY_ALPHA, 0, annotated
+    )
+
+    for i, class_id in enumerate(analysis.class_ids):
+        color = CLASS_COLORS.get(int(class_id), (255, 255, 255))
+        x1, y1, x2, y2 = (int(v) for v in analysis.boxes_xyxy[i] * box_scale)
+        cv2.rectangle(annotated, (x1, y1), (x2, y2), color, 2)
+
+        label = className(int(class_id))
+        if analysis.track_ids[i] is not None:
+            label = f"id:{analysis.track_ids[i]} {label}"
+        cv2.putText(
+            annotated,
+            label,
+            (x1, max(y1 - 6, 12)),
+            cv2.FONT_HERSHEY_SIMPLEX,
+            0.6,
+            color,
+            2,
+        )
+
+    return annotated
@@ -0,0 +1,80 @@
+from typing import Optional
+import cv2
+import numpy as np
+from robot.global_config import GlobalConfig
+from robot.util.masks import scaleMaskToFrame
+
+GATE_FRAME_WIDTH = 160
+GATE_BLUR_KERNEL = (5, 5)
+# grey level difference for a downscaled pixel to count as changed
+GATE_PIXEL_THRESHOLD = 18
+# fraction of the region of interest that has to change to rerun inference
+GATE_CHANGED_FRACTION_THRESHOLD = 0.002
+
+
+class FrameChangeGate:
+    # Decides whether a frame is different enough from the last inferred frame
+    # to be worth running segmentation on. Frames are compared downscaled and
+    # blurred so sensor noise doesn't count, and only inside the region of
+    # interest when one is set. The comparison is always against the last
+    # inferred frame, so slow changes still add up to a refresh.
+    def __init__(self, global_config: GlobalConfig):
+        self.max_skip_ms = global_config["frame_change_gate_max_skip_ms"]
+
+        self.reference: Optional[np.ndarray] = None
+        self.reference_time = 0.0
+        self.roi: Optional[np.ndarray] = None
+        self.roi_source: Optional[np.ndarray] = None
+
+    def setRegionOfInterest(self, mask: Optional[np.ndarray]) -> None:
+        # mask is in model mask coordinates, it is mapped onto the gate frame
+        # the next time one is compared
+        if mask is not self.roi_source:
+            self.roi_source = mask
+            self.roi = None
+
+    def shouldInfer(
+        self, frame: np.ndarray, current_time: float, force: bool = False
+    ) -> bool:
+        small = self._downscale(frame)
+
+        infer = (
+            force
+            or self.reference is None
+            or self.reference.shape != small.shape
+            or (current_time - self.reference_time) * 1000 >= self.max_skip_ms
+            or self._changedFraction(small) > GATE_CHANGED_FRACTION_THRESHOLD
+        )
+        if infer:
+            self.reference = small
+            self.reference_time = current_time
+        return infer
+
+    def _downscale(self, frame: np.ndarray) -> np.ndarray:
+        height, width = frame.shape[:2]
+        gate_height = max(1, round(height * GATE_FRAME_WIDTH / width))
+        # skip rows and columns first, area averaging the full frame costs
+        # more than the rest of the gate put together
+        step = max(1, width // (GATE_FRAME_WIDTH * 2))
+        small = cv2.resize(
+            frame[::step, ::step],
+            (GATE_FRAME_WIDTH, gate_height),
+            interpolation=cv2.INTER_AREA,
+        )
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return cv2.GaussianBlur(small, GATE_BLUR_KERNEL, 0)
+
+    def _changedFraction(self, small: np.ndarray) -> float:
+        assert self.reference is not None
+        changed = cv2.absdiff(small, self.reference) > GATE_PIXEL_THRESHOLD
+
+        if self.roi_source is not None and self.roi is None:
+            self.roi = scaleMaskToFrame(self.roi_source, small.shape)
+        if self.roi is not None and self.roi.shape == small.shape:
+            roi_pixels = np.count_nonzero(self.roi)
+            if roi_pixels == 0:
+                return 0.0
+            return np.count_nonzero(changed & self.roi) / roi_pixels
+
+        return np.count_nonzero(changed) / changed.size
@@ -0,0 +1,153 @@
+import threading
+from collections import deque
+from typing import Any, Callable, Deque, List, Optional, Tuple
+import cv2
+import numpy as np
+
+JPEG_TIER_QUALITY = 85
+
+
+class FrameHistory:
+    # Fixed-capacity ring of preallocated frame slots. A single producer writes
+    # into the current write slot, then commits it with its metadata. One extra
+    # slot is allocated so the slot being written is never visible to readers.
+    def __init__(self, capacity: int, jpeg_tier_capacity: int = 0):
+        if capacity < 1:
+            raise ValueError("FrameHistory capacity must be at least 1")
+
+        self.capacity = capacity
+        self.num_slots = capacity + 1
+        self.lock = threading.Lock()
+
+        self.frames: Optional[np.ndarray] = None
+        self.metadata: List[Any] = [None] * self.num_slots
+        self.write_idx = 0
+        self.count = 0
+
+        self.jpeg_tier_capacity = jpeg_tier_capacity
+        self.jpeg_tier: Deque[Tuple[bytes, Any]] = deque(
+            maxlen=max(jpeg_tier_capacity, 1)
+        )
+
+    def store(self, frame: np.ndarray) -> np.ndarray:
+        if self.frames is None or self.frames.shape[1:] != frame.shape:
+            self._allocate(frame.shape, frame.dtype)
+
+        assert self.frames is not None
+        slot = self.frames[self.write_idx]
+        if not np.shares_memory(slot, frame):
+            np.copyto(slot, frame)
+        return slot
+
+    def commit(self, metadata: Any) -> None:
+        with self.lock:
+            self.metadata[self.write_idx] = metadata
+            self.write_idx = (self.write_idx + 1) % self.num_slots
+            evicted = self.count == self.capacity
+            self.count = min(self.count + 1, self.capacity)
+
+        # the new write slot holds the frame that just fell out of the ring,
+        # it is invisible to readers so it can be demoted without the lock
+        if evicted and self.jpeg_tier_capacity > 0 and self.frames is not None:
+            evicted_metadata = self.metadata[self.write_idx]
+            ok, buffer = cv2.imencode(
+                ".jpg",
+                self.frames[self.write_idx],
+                [cv2.IMWRITE_JPEG_QUALITY, JPEG_TIER_QUALITY],
+            )
+            if ok:
+                with self.lock:
+                    self.jpeg_tier.append((buffer.tobytes(), evicted_metadata))
+
+    def selectFrames(
+        self,
+        predicate: Callable[[Any], bool],
+        limit: Optional[int] = None,
+        newest_first: bool = True,
+        skip_newest: int = 0,
+        include_jpeg_tier: bool = False,
+    ) -> List[np.ndarray]:
+        with self.lock:
+            return self._selectFramesLocked(
+                predicate, limit, newest_first, skip_newest, include_jpeg_tier
+            )
+
+    def selectLatestAndFrames(
+        self, predicate: Callable[[Any], bool], limit: Optional[int] = None
+    ) -> List[np.ndarray]:
+        # the newest frame followed by older frames matching predicate, newest
+        # first, under one lock so a commit can't shift the ring in between
+        with self.lock:
+            if self.count == 0 or self.frames is None:
+                return []
+            idx = (self.write_idx - 1) % self.num_slots
+            selected = [self.frames[idx].copy()]
+            selected.extend(self._selectFramesLocked(predicate, limit, True, 1, False))
+        return selected
+
+    def _selectFramesLocked(
+        self,
+        predicate: Callable[[Any], bool],
+        limit: Optional[int],
+        newest_first: bool,
+        skip_newest: int,
+        include_jpeg_tier: bool,
+    ) -> List[np.ndarray]:
+        if self.frames is None:
+            return []
+
+        # slot indices from oldest to newest, excluding the write slot
+        indices = [
+            (self.write_idx - self.count + i) % self.num_slots
+            for i in range(self.count - skip_newest)
+        ]
+        if newest_first:
+            indices.reverse()
+
+        selected: List[np.ndarray] = []
+        if include_jpeg_tier and not newest_first:
+            selected.extend(self._selectFromJpegTier(predicate, limit, False))
+
+        for idx in indices:
+            if limit is not None and len(selected) >= limit:
+                break
+            if predicate(self.metadata[idx]):
+                # copy so the caller can keep the frame after its slot is reused
+                selected.append(self.frames[idx].copy())
+
+        if include_jpeg_tier and newest_first:
+            remaining = None if limit is None else limit - len(selected)
+            if remaining is None or remaining > 0:
+                selected.extend(self._selectFromJpegTier(predicate, remaining, True))
+
+        return selected[:limit] if limit is not None else selected
+
+    def _allocate(self, shape: Tuple[int, ...], dtype: np.dtype) -> None:
+        with self.lock:
+            self.frames = np.empty((self.num_slots, *shape), dtype=dtype)
+            self.metadata = [None] * self.num_slots
+            self.write_idx = 0
+            self.count = 0
+            self.jpeg_tier.clear()
+
+    def _selectFromJpegTier(
+        self,
+        predicate: Callable[[Any], bool],
+        limit: Optional[int],
+        newest_first: bool,
+    ) -> List[np.ndarray]:
+        entries = list(self.jpeg_tier)
+        if newest_first:
+            entries.reverse()
+
+        selected: List[np.ndarray] = []
+        for jpeg_bytes, metadata in entries:
+            if limit is not None and len(selected) >= limit:
+                break
+            if predicate(metadata):
+                frame = cv2.imdecode(
+                    np.frombuffer(jpeg_bytes, dtype=np.uint8), cv2.IMREAD_COLOR
+                )
+                if frame is not None:
+                    selected.append(frame)
+        return selected
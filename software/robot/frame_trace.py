@@ -0,0 +1,71 @@
+import time
+from typing import Dict, List, Tuple
+import numpy as np
+from robot.metrics import MetricsRegistry
+
+# stages of a vision loop iteration, in the order they happen
+VISION_STAGES = [
+    "capture",
+    "recording",
+    "inference",
+    "post_processing",
+    "analysis",
+    "annotation",
+    "broadcast",
+]
+STAGE_PERCENTILES = [50, 95, 99]
+
+
+class FrameTrace:
+    # Monotonic timestamps of one frame on its way through a vision loop. Each
+    # mark closes the stage that ran since the previous one, so a stage that
+    # runs in pieces (recording) adds up and one that is skipped has no entry.
+    def __init__(self, capture_time: float):
+        # the grabber stamps frames with wall time, move that onto the
+        # monotonic clock once so the capture stage can be measured
+        self.started_at = time.monotonic() - max(0.0, time.time() - capture_time)
+        self.marks: List[Tuple[str, float]] = []
+
+    def mark(self, stage: str) -> None:
+        self.marks.append((stage, time.monotonic()))
+
+    def stageDurations(self) -> Dict[str, float]:
+        durations: Dict[str, float] = {}
+        previous = self.started_at
+        for stage, timestamp in self.marks:
+            durations[stage] = durations.get(stage, 0.0) + timestamp - previous
+            previous = timestamp
+        return durations
+
+    def total(self) -> float:
+        return self.marks[-1][1] - self.started_at if self.marks else 0.0
+
+
+def recordFrameTrace(metrics: MetricsRegistry, camera: str, trace: FrameTrace) -> None:
+    for stage, duration in trace.stageDurations().items():
+        metrics.timeSeries(f"vision.{camera}.stage.{stage}_s").add(duration)
+    metrics.timeSeries(f"vision.{camera}.stage.total_s").add(trace.total())
+
+
+def stageLatencySummary(
+    metrics: MetricsRegistry, camera: str, window_s: float
+) -> Dict[str, Dict[str, float]]:
+    # per-stage percentiles and max over the window, in milliseconds
+    current_time = time.time()
+    summary = {}
+    for stage in VISION_STAGES + ["total"]:
+        _, durations = metrics.timeSeries(f"vision.{camera}.stage.{stage}_s").window(
+            window_s, current_time
+        )
+        if len(durations) == 0:
+            continue
+
+        stage_summary = {
+            f"p{q}": float(value) * 1000
+            for q, value in zip(
+                STAGE_PERCENTILES, np.percentile(durations, STAGE_PERCENTILES)
+            )
+        }
+        stage_summary["max"] = float(durations.max()) * 1000
+        summary[stage] = stage_summary
+    return summary
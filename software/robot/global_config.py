@@ -5,17 +5,21 @@ from typing import TypedDict, TYPE_CHECKING, cast, Optional
 
 if TYPE_CHECKING:
     from robot.logger import Logger
+    from robot.metrics import MetricsRegistry
 
 
 class GlobalConfig(TypedDict):
     debug_level: int
     auto_confirm: bool
     logger: "Logger"
+    metrics: "MetricsRegistry"
     blob_storage_path: str
     run_id: str
     run_blob_dir: str
     db_path: str
     tensor_device: str
+    inference_worker_mode: str
+    inference_backend: str
     main_camera_index: int
     yolo_model: str
     feeder_camera_yolo_weights_path: str
@@ -28,8 +32,29 @@ class GlobalConfig(TypedDict):
     disable_classification: bool
     capture_delay_ms: int
     camera_preview: bool
+    camera_replay_pacing: str
+    camera_replay_fps: float
+    camera_replay_loop: bool
     enable_profiling: bool
     recording_enabled: bool
+    recording_queue_size: int
+    recording_segment_s: int
+    clip_recording_enabled: bool
+    clip_recording_queue_size: int
+    clip_pre_roll_s: float
+    clip_post_roll_s: float
+    main_camera_frame_history_size: int
+    main_camera_frame_history_jpeg_size: int
+    static_scene_cache_enabled: bool
+    static_scene_warmup_frames: int
+    static_scene_refresh_interval_ms: int
+    static_scene_drift_iou_threshold: float
+    frame_change_gate_enabled: bool
+    frame_change_gate_max_skip_ms: int
+    main_camera_roi_enabled: bool
+    main_camera_roi_margin_px: int
+    annotated_preview_width: int
+    annotated_preview_max_fps: float
     max_queue_size: int
     conveyor_door_open_angle: int
     bin_door_open_angle: int
@@ -53,7 +78,15 @@ class GlobalConfig(TypedDict):
     encoder_polling_delay_ms: int
     delay_between_firmata_commands_ms: int
     classifying_timeout_ms: int
+    classification_max_workers: int
+    classification_consensus_margin: int
+    pipelined_classification_enabled: bool
+    classification_door_lead_ms: int
+    part_category_cache_ttl_s: int
+    part_category_negative_cache_ttl_s: int
     waiting_for_object_to_center_timeout_ms: int
+    predicted_center_stop_enabled: bool
+    main_conveyor_stop_lead_ms: int
     waiting_for_object_to_appear_timeout_ms: int
     fs_object_at_end_of_second_feeder_timeout_ms: int
     state_machine_steps_per_second: int
@@ -81,6 +114,19 @@ def buildGlobalConfig() -> GlobalConfig:
         ],
         help="Disable specified systems",
     )
+    parser.add_argument(
+        "--enable",
+        nargs="*",
+        choices=[
+            "static_scene_cache",
+            "frame_change_gate",
+            "main_camera_roi",
+            "predicted_center_stop",
+            "pipelined_classification",
+        ],
+        help="Enable features that change how the robot sorts, off until validated "
+        "against recorded footage with benchmark_vision.py",
+    )
     parser.add_argument(
         "--profile",
         action="store_true",
@@ -96,6 +142,22 @@ def buildGlobalConfig() -> GlobalConfig:
         action="store_true",
         help="Record raw and annotated camera feeds to video files",
     )
+    parser.add_argument(
+        "--record-clips",
+        action="store_true",
+        help="Record short camera clips around feeding, classification and timeouts",
+    )
+    parser.add_argument(
+        "--replay-pacing",
+        choices=["realtime", "fast", "fixed"],
+        default="realtime",
+        help="How replayed camera recordings are paced, see MAIN_CAMERA_REPLAY_PATH",
+    )
+    parser.add_argument(
+        "--replay-loop",
+        action="store_true",
+        help="Start replayed camera recordings over when they end",
+    )
     parser.add_argument(
         "--use_prev_bin_state",
         nargs="?",
@@ -105,12 +167,20 @@ def buildGlobalConfig() -> GlobalConfig:
     args = parser.parse_args()
 
     disabled_motors = args.disable or []
+    enabled_features = args.enable or []
+    # the crop is taken from the conveyor band the static scene cache learns
+    if (
+        "main_camera_roi" in enabled_features
+        and "static_scene_cache" not in enabled_features
+    ):
+        parser.error("--enable main_camera_roi requires static_scene_cache")
 
     run_id = f"run_{int(time.time())}"
     base_blob_path = "../.blob"
     run_blob_dir = os.path.join(base_blob_path, run_id)
 
     from robot.logger import Logger
+    from robot.metrics import defaultMetricsRegistry
 
     debug_level = int(os.getenv("DEBUG", "0"))
     gc: GlobalConfig = {
@@ -121,6 +191,10 @@ def buildGlobalConfig() -> GlobalConfig:
         "run_blob_dir": run_blob_dir,
         "db_path": "../database.db",
         "tensor_device": "cpu",
+        # "thread" runs both models in this process, "process" gives each its own
+        "inference_worker_mode": "thread",
+        # "pytorch", or "onnx"/"openvino" to export the weights once and run them there
+        "inference_backend": "pytorch",
         "main_camera_index": 0,
         "yolo_model": "yolo11n-seg",
         # "yolo_weights_path":" /Users/spencer/Downloads/checkpoints (small)/run_1757963343/weights/best.pt",
@@ -147,8 +221,30 @@ def buildGlobalConfig() -> GlobalConfig:
         "disable_classification": "classification" in disabled_motors,
         "capture_delay_ms": 300,
         "camera_preview": args.preview,
+        "camera_replay_pacing": args.replay_pacing,
+        "camera_replay_fps": 30.0,
+        "camera_replay_loop": args.replay_loop,
         "enable_profiling": args.profile,
         "recording_enabled": args.record,
+        "recording_queue_size": 30,
+        "recording_segment_s": 60,
+        "clip_recording_enabled": args.record_clips,
+        "clip_recording_queue_size": 30,
+        "clip_pre_roll_s": 3.0,
+        "clip_post_roll_s": 2.0,
+        "main_camera_frame_history_size": 30,
+        "main_camera_frame_history_jpeg_size": 0,
+        "static_scene_cache_enabled": "static_scene_cache" in enabled_features,
+        "static_scene_warmup_frames": 20,
+        "static_scene_refresh_interval_ms": 30000,
+        "static_scene_drift_iou_threshold": 0.8,
+        "frame_change_gate_enabled": "frame_change_gate" in enabled_features,
+        "frame_change_gate_max_skip_ms": 500,
+        "main_camera_roi_enabled": "main_camera_roi" in enabled_features,
+        "main_camera_roi_margin_px": 48,
+        # annotated frames are only drawn for the live view and the recorder
+        "annotated_preview_width": 960,
+        "annotated_preview_max_fps": 10.0,
         "max_queue_size": 8,
         "conveyor_door_open_angle": 70,
         "bin_door_open_angle": 180 - 60,
@@ -174,11 +270,28 @@ def buildGlobalConfig() -> GlobalConfig:
         "encoder_polling_delay_ms": 1000,
         "delay_between_firmata_commands_ms": 8,
         "classifying_timeout_ms": 5000,
+        # frames of a piece are classified in parallel until one category
+        # leads by this many results
+        "classification_max_workers": 5,
+        "classification_consensus_margin": 2,
+        # classify with the belt running, the bin is needed by the time the
+        # piece is the conveyor door's opening time short of the first module
+        "pipelined_classification_enabled": "pipelined_classification"
+        in enabled_features,
+        "classification_door_lead_ms": 500,
+        # categories of items missing from the local catalog, cached in sqlite
+        "part_category_cache_ttl_s": 30 * 24 * 60 * 60,
+        "part_category_negative_cache_ttl_s": 24 * 60 * 60,
         "waiting_for_object_to_center_timeout_ms": 5000,
+        "predicted_center_stop_enabled": "predicted_center_stop" in enabled_features,
+        # the centering stop is sent this much before the predicted crossing,
+        # to cover the time the belt takes to come to rest
+        "main_conveyor_stop_lead_ms": 0,
         "waiting_for_object_to_appear_timeout_ms": 5000,
         "fs_object_at_end_of_second_feeder_timeout_ms": 4000,
         "state_machine_steps_per_second": 15,
         "logger": Logger(debug_level),
+        "metrics": defaultMetricsRegistry(),
     }
 
     return cast(GlobalConfig, gc)
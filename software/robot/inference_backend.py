@@ -0,0 +1,163 @@
+import os
+import sys
+import glob
+import argparse
+import importlib.util
+from typing import Any, List, Optional
+import cv2
+import numpy as np
+from ultralytics import YOLO
+from robot.logger import Logger
+from robot.frame_analysis import buildFrameAnalysis, className
+from robot.our_types.vision_system import FrameAnalysis
+from robot.util.masks import scaleMaskToFrame
+
+INFERENCE_BACKENDS = ["pytorch", "onnx", "openvino"]
+
+# python module each exported runtime needs at inference time
+BACKEND_RUNTIME_MODULES = {
+    "onnx": "onnxruntime",
+    "openvino": "openvino",
+}
+
+PARITY_MASK_IOU_THRESHOLD = 0.9
+PARITY_BOX_TOLERANCE_PX = 8.0
+
+
+def loadSegmentationModel(
+    model_path: str,
+    backend: str,
+    tensor_device: Optional[str],
+    logger: Logger,
+) -> Any:
+    if backend not in INFERENCE_BACKENDS:
+        raise ValueError(
+            f"Unknown inference backend '{backend}', expected one of {INFERENCE_BACKENDS}"
+        )
+
+    if backend != "pytorch":
+        exported_path = exportModel(model_path, backend, logger)
+        if exported_path is not None:
+            logger.info(f"Running {backend} inference from {exported_path}")
+            return YOLO(exported_path, task="segment")
+        logger.warning(f"Falling back to pytorch inference for {model_path}")
+
+    model = YOLO(model_path)
+    if tensor_device:
+        model.to(tensor_device)
+    return model
+
+
+def exportedModelPath(model_path: str, backend: str) -> str:
+    # where ultralytics puts exports: next to the weights, named after them
+    stem, _ = os.path.splitext(model_path)
+    if backend == "onnx":
+        return f"{stem}.onnx"
+    if backend == "openvino":
+        return f"{stem}_openvino_model"
+    return model_path
+
+
+def exportModel(model_path: str, backend: str, logger: Logger) -> Optional[str]:
+    runtime_module = BACKEND_RUNTIME_MODULES[backend]
+    if importlib.util.find_spec(runtime_module) is None:
+        logger.warning(f"{backend} backend needs the '{runtime_module}' package")
+        return None
+
+    exported_path = exportedModelPath(model_path, backend)
+    if os.path.exists(exported_path) and os.path.getmtime(
+        exported_path
+    ) >= os.path.getmtime(model_path):
+        return exported_path
+
+    logger.info(f"Exporting {model_path} to {backend}, this can take a minute")
+    try:
+        return str(YOLO(model_path).export(format=backend))
+    except Exception as e:
+        logger.error(f"Failed to export {model_path} to {backend}: {e}")
+        return None
+
+
+def compareAnalyses(reference: FrameAnalysis, candidate: FrameAnalysis) -> List[str]:
+    # Each reference detection must have a same-class candidate whose mask
+    # matches in frame coordinates. Exported models may run at a different
+    # input size, so the masks are compared after undoing the letterbox.
+    mismatches = []
+    if len(reference.class_ids) != len(candidate.class_ids):
+        mismatches.append(
+            f"detection count {len(reference.class_ids)} != {len(candidate.class_ids)}"
+        )
+
+    frame_shape = reference.frame_shape
+    candidate_masks = [scaleMaskToFrame(mask, frame_shape) for mask in candidate.masks]
+    matched = set()
+    for i, class_id in enumerate(reference.class_ids):
+        reference_mask = scaleMaskToFrame(reference.masks[i], frame_shape)
+        best_j, best_iou = None, 0.0
+        for j, candidate_class_id in enumerate(candidate.class_ids):
+            if j in matched or candidate_class_id != class_id:
+                continue
+            union = np.count_nonzero(reference_mask | candidate_masks[j])
+            iou = (
+                np.count_nonzero(reference_mask & candidate_masks[j]) / union
+                if union
+                else 1.0
+            )
+            if iou > best_iou:
+                best_j, best_iou = j, iou
+
+        name = className(int(class_id))
+        if best_j is None or best_iou < PARITY_MASK_IOU_THRESHOLD:
+            mismatches.append(f"{name} #{i}: best mask iou {best_iou:.3f}")
+            continue
+
+        matched.add(best_j)
+        box_error = float(
+            np.abs(reference.boxes_xyxy[i] - candidate.boxes_xyxy[best_j]).max()
+        )
+        if box_error > PARITY_BOX_TOLERANCE_PX:
+            mismatches.append(f"{name} #{i}: box off by {box_error:.1f}px")
+
+    return mismatches
+
+
+def checkParity(
+    model_path: str, backend: str, image_paths: List[str], logger: Logger
+) -> bool:
+    reference_model = loadSegmentationModel(model_path, "pytorch", None, logger)
+    candidate_model = loadSegmentationModel(model_path, backend, None, logger)
+
+    passed = True
+    for image_path in image_paths:
+        frame = cv2.imread(image_path)
+        if frame is None:
+            logger.warning(f"Skipping unreadable image {image_path}")
+            continue
+
+        reference = buildFrameAnalysis(reference_model.predict(frame), 0.0, 0.0)
+        candidate = buildFrameAnalysis(candidate_model.predict(frame), 0.0, 0.0)
+        mismatches = compareAnalyses(reference, candidate)
+        if mismatches:
+            passed = False
+            logger.warning(f"{image_path}: {'; '.join(mismatches)}")
+        else:
+            logger.info(f"{image_path}: {len(reference.class_ids)} detections match")
+
+    return passed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Export weights to an inference backend and check it against pytorch"
+    )
+    parser.add_argument("weights", help="Path to the .pt weights")
+    parser.add_argument("images", help="Directory of sample frames to compare on")
+    parser.add_argument("--backend", choices=INFERENCE_BACKENDS[1:], default="onnx")
+    args = parser.parse_args()
+
+    image_paths = sorted(
+        glob.glob(os.path.join(args.images, "*.jpg"))
+        + glob.glob(os.path.join(args.images, "*.png"))
+    )
+    ok = checkParity(args.weights, args.backend, image_paths, Logger(0))
+    sys.exit(0 if ok else 1)
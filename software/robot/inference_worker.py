@@ -0,0 +1,306 @@
+import time
+import multiprocessing
+from multiprocessing import shared_memory
+from multiprocessing.connection import Connection
+from typing import Any, Dict, List, Optional, Protocol
+import numpy as np
+import logging
+
+logging.getLogger("ultralytics").setLevel(logging.WARNING)
+from robot.global_config import GlobalConfig
+from robot.logger import Logger
+from robot.frame_analysis import buildFrameAnalysis
+from robot.inference_backend import loadSegmentationModel
+from robot.our_types.vision_system import FrameAnalysis
+
+WORKER_STARTUP_TIMEOUT_S = 120.0
+INFERENCE_TIMEOUT_S = 10.0
+WORKER_POLL_INTERVAL_S = 0.5
+WORKER_SHUTDOWN_TIMEOUT_S = 5.0
+
+
+class WorkerExitedError(RuntimeError):
+    pass
+
+
+class SegmentationInference(Protocol):
+    # None when the frame got no analysis, a worker that is busy past its
+    # timeout or has exited
+    def infer(
+        self, frame: np.ndarray, classes: Optional[List[int]], capture_time: float
+    ) -> Optional[FrameAnalysis]: ...
+
+    def close(self) -> None: ...
+
+
+class LocalInference:
+    # Runs the model on the calling thread, the original behaviour
+    def __init__(self, global_config: GlobalConfig, camera_name: str, model_path: str):
+        self.model = loadSegmentationModel(
+            model_path,
+            global_config["inference_backend"],
+            global_config.get("tensor_device"),
+            global_config["logger"].ctx(system="inference", camera=camera_name),
+        )
+
+    def infer(
+        self, frame: np.ndarray, classes: Optional[List[int]], capture_time: float
+    ) -> FrameAnalysis:
+        # track ids come from the MaskTracker in the vision loop
+        results = self.model.predict(frame, classes=classes)
+        return buildFrameAnalysis(results, time.time(), capture_time)
+
+    def close(self) -> None:
+        pass
+
+
+class InferenceWorker:
+    # Runs the model in its own process so inference doesn't compete for the
+    # GIL. Frames are handed over through a shared memory slot, and compact
+    # FrameAnalysis records come back over a pipe. The raw ultralytics results
+    # stay in the worker, FrameAnalysis is all either inference exposes.
+    def __init__(self, global_config: GlobalConfig, camera_name: str, model_path: str):
+        self.logger = global_config["logger"].ctx(
+            system="inference_worker", camera=camera_name
+        )
+        self.camera_name = camera_name
+        self.request_id = 0
+        # a request that timed out, the worker is still busy with it
+        self.late_request_id: Optional[int] = None
+        self.exited = False
+        self.frame_slot: Optional[shared_memory.SharedMemory] = None
+        self.frame_view: Optional[np.ndarray] = None
+
+        context = multiprocessing.get_context("spawn")
+        self.conn, worker_conn = context.Pipe()
+        self.process = context.Process(
+            target=_runInferenceWorker,
+            args=(
+                worker_conn,
+                camera_name,
+                model_path,
+                global_config["inference_backend"],
+                global_config.get("tensor_device"),
+                global_config["debug_level"],
+            ),
+            name=f"inference_worker_{camera_name}",
+            daemon=True,
+        )
+        self.process.start()
+        worker_conn.close()
+
+        self._receive(WORKER_STARTUP_TIMEOUT_S)
+        self.logger.info(f"Inference worker started with pid {self.process.pid}")
+
+    def infer(
+        self, frame: np.ndarray, classes: Optional[List[int]], capture_time: float
+    ) -> Optional[FrameAnalysis]:
+        if self.exited:
+            return None
+        try:
+            if self.late_request_id is not None:
+                # the worker may still be reading the frame slot for it
+                self._receive(0.0, self.late_request_id)
+                self.late_request_id = None
+            return self._inferInWorker(frame, classes, capture_time)
+        except TimeoutError as e:
+            if self.late_request_id is None:
+                self.late_request_id = self.request_id
+                self.logger.warning(str(e))
+            return None
+        except (WorkerExitedError, BrokenPipeError) as e:
+            self.logger.error(f"Inference worker stopped, frames go unanalyzed: {e}")
+            self.exited = True
+            return None
+        except RuntimeError as e:
+            # the worker replied with an error for this frame, or for the late
+            # request it was still answering
+            self.late_request_id = None
+            self.logger.warning(str(e))
+            return None
+
+    def close(self) -> None:
+        if self.process.is_alive():
+            try:
+                self.conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            self.process.join(WORKER_SHUTDOWN_TIMEOUT_S)
+            if self.process.is_alive():
+                self.process.terminate()
+        self.conn.close()
+        self._releaseFrameSlot()
+
+    def _inferInWorker(
+        self, frame: np.ndarray, classes: Optional[List[int]], capture_time: float
+    ) -> FrameAnalysis:
+        if self.frame_view is None or self.frame_view.shape != frame.shape:
+            self._allocateFrameSlot(frame)
+
+        assert self.frame_slot is not None and self.frame_view is not None
+        np.copyto(self.frame_view, frame)
+        self.request_id += 1
+        self.conn.send(
+            {
+                "request_id": self.request_id,
+                "slot_name": self.frame_slot.name,
+                "shape": frame.shape,
+                "dtype": frame.dtype.str,
+                "classes": classes,
+                "capture_time": capture_time,
+            }
+        )
+        return _unpackFrameAnalysis(self._receive(INFERENCE_TIMEOUT_S, self.request_id))
+
+    def _allocateFrameSlot(self, frame: np.ndarray) -> None:
+        # the worker is idle between requests, so the old slot can go right away
+        self._releaseFrameSlot()
+        self.frame_slot = shared_memory.SharedMemory(create=True, size=frame.nbytes)
+        self.frame_view = np.ndarray(
+            frame.shape, dtype=frame.dtype, buffer=self.frame_slot.buf
+        )
+
+    def _releaseFrameSlot(self) -> None:
+        if self.frame_slot is not None:
+            self.frame_view = None
+            self.frame_slot.close()
+            self.frame_slot.unlink()
+            self.frame_slot = None
+
+    def _receive(
+        self, timeout_s: float, request_id: Optional[int] = None
+    ) -> Dict[str, Any]:
+        deadline = time.time() + timeout_s
+        while True:
+            while not self.conn.poll(WORKER_POLL_INTERVAL_S):
+                if not self.process.is_alive():
+                    raise WorkerExitedError(
+                        f"Inference worker for {self.camera_name} exited with code {self.process.exitcode}"
+                    )
+                if time.time() > deadline:
+                    raise TimeoutError(
+                        f"Inference worker for {self.camera_name} did not respond within {timeout_s}s"
+                    )
+
+            try:
+                message = self.conn.recv()
+            except EOFError:
+                self.process.join(WORKER_SHUTDOWN_TIMEOUT_S)
+                raise WorkerExitedError(
+                    f"Inference worker for {self.camera_name} exited with code {self.process.exitcode}"
+                )
+            # replies to requests that timed out
+            if request_id is None or message.get("request_id") == request_id:
+                break
+
+        if "error" in message:
+            raise RuntimeError(
+                f"Inference worker for {self.camera_name} failed: {message['error']}"
+            )
+        return message
+
+
+def buildInference(
+    global_config: GlobalConfig, camera_name: str, model_path: str
+) -> SegmentationInference:
+    if global_config["inference_worker_mode"] == "process":
+        return InferenceWorker(global_config, camera_name, model_path)
+    return LocalInference(global_config, camera_name, model_path)
+
+
+def _packFrameAnalysis(analysis: FrameAnalysis) -> Dict[str, Any]:
+    # masks are bit packed, an 8x smaller message than the bool array
+    return {
+        "timestamp": analysis.timestamp,
+        "capture_timestamp": analysis.capture_timestamp,
+        "frame_shape": analysis.frame_shape,
+        "class_ids": analysis.class_ids,
+        "track_ids": analysis.track_ids,
+        "boxes_xyxy": analysis.boxes_xyxy,
+        "mask_shape": analysis.masks.shape,
+        "masks": np.packbits(analysis.masks, axis=-1),
+        "mask_bboxes": analysis.mask_bboxes,
+        "touches_edge": analysis.touches_edge,
+    }
+
+
+def _unpackFrameAnalysis(record: Dict[str, Any]) -> FrameAnalysis:
+    mask_shape = record["mask_shape"]
+    masks = np.unpackbits(record["masks"], axis=-1, count=mask_shape[-1]).astype(bool)
+    return FrameAnalysis(
+        timestamp=record["timestamp"],
+        capture_timestamp=record["capture_timestamp"],
+        frame_shape=record["frame_shape"],
+        class_ids=record["class_ids"],
+        track_ids=record["track_ids"],
+        boxes_xyxy=record["boxes_xyxy"],
+        masks=masks.reshape(mask_shape),
+        mask_bboxes=record["mask_bboxes"],
+        touches_edge=record["touches_edge"],
+    )
+
+
+def _runInferenceWorker(
+    conn: Connection,
+    camera_name: str,
+    model_path: str,
+    backend: str,
+    tensor_device: Optional[str],
+    debug_level: int,
+) -> None:
+    logger = Logger(debug_level).ctx(system="inference_worker", camera=camera_name)
+    try:
+        model = loadSegmentationModel(model_path, backend, tensor_device, logger)
+    except Exception as e:
+        conn.send({"error": f"failed to load model {model_path}: {e}"})
+        return
+
+    conn.send({"ready": True})
+
+    frame_slot: Optional[shared_memory.SharedMemory] = None
+    try:
+        while True:
+            try:
+                request = conn.recv()
+            except EOFError:
+                break
+            if request is None:
+                break
+
+            # the parent owns the slot and unlinks it, the worker only maps it
+            if frame_slot is None or frame_slot.name != request["slot_name"]:
+                _closeFrameSlot(frame_slot)
+                frame_slot = shared_memory.SharedMemory(name=request["slot_name"])
+
+            frame = np.ndarray(
+                request["shape"],
+                dtype=np.dtype(request["dtype"]),
+                buffer=frame_slot.buf,
+            )
+            try:
+                results = model.predict(frame, classes=request["classes"])
+                analysis = buildFrameAnalysis(
+                    results, time.time(), request["capture_time"]
+                )
+                conn.send(
+                    {
+                        "request_id": request["request_id"],
+                        **_packFrameAnalysis(analysis),
+                    }
+                )
+            except Exception as e:
+                conn.send({"request_id": request["request_id"], "error": str(e)})
+    finally:
+        _closeFrameSlot(frame_slot)
+        conn.close()
+
+
+def _closeFrameSlot(frame_slot: Optional[shared_memory.SharedMemory]) -> None:
+    if frame_slot is None:
+        return
+    try:
+        frame_slot.close()
+    except BufferError:
+        # the last results still reference the frame, the mapping goes away
+        # once they are collected
+        pass
@@ -1,9 +1,26 @@
 import cv2
+import csv
+import os
 import time
+import threading
 import numpy as np
 import uuid
 from typing import Optional, List, Tuple
 from robot.global_config import GlobalConfig
+from robot.our_types.camera import CapturedFrame
+
+# the grabber cycles through three buffers: the latest published frame, the one
+# held by the consumer, and the one being written
+NUM_GRAB_BUFFERS = 3
+GRAB_FAILURE_BACKOFF_MS = 10
+REPLAY_IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+REPLAY_CONSUMER_WAIT_MS = 100
+
+
+class ReplayPacing:
+    REALTIME = "realtime"  # the recorded frame intervals
+    FAST = "fast"  # the next frame as soon as the last one is read
+    FIXED = "fixed"  # a fixed frame rate
 
 
 class Camera:
@@ -42,21 +59,257 @@ class Camera:
             f"Camera initialized: {actual_width}x{actual_height} @ {actual_fps} FPS"
         )
 
-    def captureFrame(self) -> Optional[np.ndarray]:
-        ret, frame = self.cap.read()
+        self._initGrabBuffers()
+
+    def _initGrabBuffers(self) -> None:
+        self.grabbing = False
+        self.grab_thread: Optional[threading.Thread] = None
+        self.frame_condition = threading.Condition()
+        self.grab_buffers: List[Optional[np.ndarray]] = [None] * NUM_GRAB_BUFFERS
+        self.latest_buffer_idx: Optional[int] = None
+        self.held_buffer_idx: Optional[int] = None
+        self.latest_timestamp = 0.0
+        self.latest_sequence = 0
+        self.consumed_sequence = 0
+        # a live camera never runs out of frames
+        self.finished = False
+
+    def captureFrame(self, out: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+        # the grabber thread owns the device while it runs
+        if self.grabbing:
+            with self.frame_condition:
+                if self.latest_buffer_idx is None:
+                    return None
+                latest = self.grab_buffers[self.latest_buffer_idx]
+                assert latest is not None
+                if out is not None and out.shape == latest.shape:
+                    np.copyto(out, latest)
+                    return out
+                return latest.copy()
+
+        ret, frame = self._readFrame(out)
         if not ret:
             self.global_config["logger"].info("Failed to capture frame")
             return None
         return frame
 
+    def startGrabbing(self) -> None:
+        if self.grabbing:
+            return
+        self.grabbing = True
+        self.grab_thread = threading.Thread(target=self._grabLoop, daemon=True)
+        self.grab_thread.start()
+
+    def stopGrabbing(self) -> None:
+        self.grabbing = False
+        if self.grab_thread:
+            self.grab_thread.join()
+            self.grab_thread = None
+
+    def readLatestFrame(
+        self, last_sequence: int, timeout_s: float
+    ) -> Optional[CapturedFrame]:
+        # Single consumer: the returned frame stays valid until the next call
+        with self.frame_condition:
+            if not self.frame_condition.wait_for(
+                lambda: self.latest_sequence > last_sequence, timeout=timeout_s
+            ):
+                return None
+
+            assert self.latest_buffer_idx is not None
+            self.held_buffer_idx = self.latest_buffer_idx
+            self.consumed_sequence = self.latest_sequence
+            self.frame_condition.notify_all()
+            frame = self.grab_buffers[self.held_buffer_idx]
+            assert frame is not None
+            return CapturedFrame(
+                frame=frame,
+                timestamp=self.latest_timestamp,
+                sequence=self.latest_sequence,
+            )
+
+    def _grabLoop(self) -> None:
+        while self.grabbing:
+            with self.frame_condition:
+                write_idx = next(
+                    i
+                    for i in range(NUM_GRAB_BUFFERS)
+                    if i != self.latest_buffer_idx and i != self.held_buffer_idx
+                )
+            buffer = self.grab_buffers[write_idx]
+
+            ret, frame = self._readFrame(buffer)
+            capture_timestamp = time.time()
+
+            if not ret:
+                if self.finished:
+                    break
+                self.global_config["logger"].info("Failed to capture frame")
+                time.sleep(GRAB_FAILURE_BACKOFF_MS / 1000.0)
+                continue
+
+            with self.frame_condition:
+                # opencv allocates a new array on the first read or a size change
+                self.grab_buffers[write_idx] = frame
+                self.latest_buffer_idx = write_idx
+                self.latest_timestamp = capture_timestamp
+                self.latest_sequence += 1
+                self.frame_condition.notify_all()
+
+    def _readFrame(
+        self, out: Optional[np.ndarray]
+    ) -> Tuple[bool, Optional[np.ndarray]]:
+        # when out matches the capture size opencv decodes straight into it
+        if out is not None:
+            return self.cap.read(out)
+        return self.cap.read()
+
     def release(self) -> None:
         self.global_config["logger"].info("Releasing camera")
+        self.stopGrabbing()
         self.cap.release()
 
     def isOpened(self) -> bool:
         return self.cap.isOpened()
 
 
+class ReplayCamera(Camera):
+    # Plays back a recording in place of a live camera: an avi written by the
+    # video recorder, with its csv of capture timestamps when there is one,
+    # or a directory of image files in name order. Frames are stamped with
+    # the time they are published, like a live grab.
+    def __init__(
+        self,
+        global_config: GlobalConfig,
+        source_path: str,
+        pacing: str = ReplayPacing.REALTIME,
+        fps: float = 30.0,
+        loop: bool = False,
+    ):
+        if pacing not in (ReplayPacing.REALTIME, ReplayPacing.FAST, ReplayPacing.FIXED):
+            raise ValueError(f"Unknown replay pacing: {pacing}")
+
+        self.global_config = global_config
+        self.debug_level = global_config["debug_level"]
+        self.source_path = source_path
+        self.pacing = pacing
+        self.fps = fps
+        self.loop = loop
+
+        self.cap: Optional[cv2.VideoCapture] = None
+        self.image_paths: List[str] = []
+        if os.path.isdir(source_path):
+            self.image_paths = sorted(
+                os.path.join(source_path, name)
+                for name in os.listdir(source_path)
+                if name.lower().endswith(REPLAY_IMAGE_EXTENSIONS)
+            )
+            if not self.image_paths:
+                raise ValueError(f"No image files in replay directory {source_path}")
+            # image directories have no timestamps, so realtime is fixed rate
+            self.frame_intervals: Optional[List[float]] = None
+        else:
+            self.cap = cv2.VideoCapture(source_path)
+            if not self.cap.isOpened():
+                raise ValueError(f"Failed to open replay file {source_path}")
+            self.frame_intervals = self._loadFrameIntervals(source_path)
+
+        self.global_config["logger"].info(
+            f"Replay camera initialized from {source_path}, pacing {pacing}"
+        )
+
+        self.frame_idx = 0
+        self.next_frame_due: Optional[float] = None
+        self._initGrabBuffers()
+
+    def _readFrame(
+        self, out: Optional[np.ndarray]
+    ) -> Tuple[bool, Optional[np.ndarray]]:
+        if not self._waitUntilDue():
+            return False, None
+
+        ret, frame = self._readSourceFrame(out)
+        if not ret and self.loop and self.frame_idx > 0:
+            self._rewind()
+            ret, frame = self._readSourceFrame(out)
+        if not ret:
+            self.finished = True
+            return False, None
+
+        self._scheduleNextFrame()
+        self.frame_idx += 1
+        return ret, frame
+
+    def _readSourceFrame(
+        self, out: Optional[np.ndarray]
+    ) -> Tuple[bool, Optional[np.ndarray]]:
+        if self.cap is not None:
+            return super()._readFrame(out)
+        if self.frame_idx >= len(self.image_paths):
+            return False, None
+        frame = cv2.imread(self.image_paths[self.frame_idx])
+        return frame is not None, frame
+
+    def _rewind(self) -> None:
+        self.frame_idx = 0
+        if self.cap is not None:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+
+    def _waitUntilDue(self) -> bool:
+        if self.pacing == ReplayPacing.FAST:
+            # lockstep with the consumer, so no frame is skipped
+            if not self.grabbing:
+                return True
+            with self.frame_condition:
+                while self.consumed_sequence < self.latest_sequence:
+                    if not self.grabbing:
+                        return False
+                    self.frame_condition.wait(REPLAY_CONSUMER_WAIT_MS / 1000.0)
+            return True
+
+        if self.next_frame_due is not None:
+            delay = self.next_frame_due - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        return True
+
+    def _scheduleNextFrame(self) -> None:
+        interval = 1.0 / self.fps
+        if (
+            self.pacing == ReplayPacing.REALTIME
+            and self.frame_intervals is not None
+            and self.frame_idx < len(self.frame_intervals)
+        ):
+            interval = self.frame_intervals[self.frame_idx]
+        # from the previous due time rather than now, so decode time doesn't
+        # add up into drift, but without bursting to catch up after a stall
+        current_time = time.monotonic()
+        if self.next_frame_due is None:
+            self.next_frame_due = current_time
+        self.next_frame_due = max(self.next_frame_due + interval, current_time)
+
+    def _loadFrameIntervals(self, video_path: str) -> Optional[List[float]]:
+        # time from each frame to the next, from the recorder's csv sidecar
+        timestamps_path = os.path.splitext(video_path)[0] + ".csv"
+        if not os.path.exists(timestamps_path):
+            return None
+        with open(timestamps_path, newline="") as timestamps_file:
+            timestamps = [
+                float(row["capture_timestamp"])
+                for row in csv.DictReader(timestamps_file)
+            ]
+        return [max(0.0, b - a) for a, b in zip(timestamps, timestamps[1:])]
+
+    def release(self) -> None:
+        self.global_config["logger"].info("Releasing replay camera")
+        self.stopGrabbing()
+        if self.cap is not None:
+            self.cap.release()
+
+    def isOpened(self) -> bool:
+        return self.cap.isOpened() if self.cap is not None else True
+
+
 def connectToCamera(
     camera_device_index: int,
     global_config: GlobalConfig,
@@ -3,7 +3,7 @@ from robot.irl.our_arduino import OurArduinoNano
 from robot.irl.motors import PCA9685, Servo, DCMotor
 from robot.irl.encoder import Encoder
 from robot.irl.distribution import Bin, DistributionModule
-from robot.irl.camera import Camera, connectToCamera
+from robot.irl.camera import Camera, ReplayCamera, connectToCamera
 from typing import Dict, List, Tuple, TypedDict, Optional
 import os
 import subprocess
@@ -46,6 +46,8 @@ class CameraConfig(TypedDict):
     width: int
     height: int
     fps: int
+    # a recording to play back instead of opening the device
+    replay_path: Optional[str]
 
 
 class IRLConfig(TypedDict):
@@ -78,18 +80,24 @@ def buildIRLConfig() -> IRLConfig:
     if mc_path is None:
         raise ValueError("MC_PATH environment variable must be set")
 
+    main_camera_replay_path = os.getenv("MAIN_CAMERA_REPLAY_PATH")
     camera_index = os.getenv("CAMERA_INDEX")
-    if camera_index is None:
-        raise ValueError("CAMERA_INDEX environment variable must be set")
+    if camera_index is None and main_camera_replay_path is None:
+        raise ValueError(
+            "CAMERA_INDEX or MAIN_CAMERA_REPLAY_PATH environment variable must be set"
+        )
 
+    feeder_camera_replay_path = os.getenv("FEEDER_CAMERA_REPLAY_PATH")
     feeder_camera_index = os.getenv("FEEDER_CAMERA_INDEX")
-    if feeder_camera_index is None:
-        raise ValueError("FEEDER_CAMERA_INDEX environment variable must be set")
+    if feeder_camera_index is None and feeder_camera_replay_path is None:
+        raise ValueError(
+            "FEEDER_CAMERA_INDEX or FEEDER_CAMERA_REPLAY_PATH environment variable must be set"
+        )
 
     return {
         "mc_path": mc_path,
         "main_camera": {
-            "device_index": int(camera_index),
+            "device_index": int(camera_index or -1),
             "width": 1920,
             "height": 1080,
             # "width": 3840,
@@ -97,12 +105,14 @@ def buildIRLConfig() -> IRLConfig:
             # "width": 1280,
             # "height": 720,
             "fps": 30,
+            "replay_path": main_camera_replay_path,
         },
         "feeder_camera": {
-            "device_index": int(feeder_camera_index),
+            "device_index": int(feeder_camera_index or -1),
             "width": 1920,
             "height": 1080,
             "fps": 30,
+            "replay_path": feeder_camera_replay_path,
         },
         "distribution_modules": [
             {
@@ -233,6 +243,25 @@ def connectToArduino(mc_path: str, gc: GlobalConfig) -> OurArduinoNano:
             raise e
 
 
+def buildCamera(camera_config: CameraConfig, gc: GlobalConfig) -> Camera:
+    if camera_config["replay_path"] is not None:
+        return ReplayCamera(
+            gc,
+            camera_config["replay_path"],
+            gc["camera_replay_pacing"],
+            gc["camera_replay_fps"],
+            gc["camera_replay_loop"],
+        )
+
+    return connectToCamera(
+        camera_config["device_index"],
+        gc,
+        camera_config["width"],
+        camera_config["height"],
+        camera_config["fps"],
+    )
+
+
 def buildIRLSystemInterface(config: IRLConfig, gc: GlobalConfig) -> IRLSystemInterface:
     mc = connectToArduino(config["mc_path"], gc)
     logger = gc["logger"]
@@ -295,21 +324,8 @@ def buildIRLSystemInterface(config: IRLConfig, gc: GlobalConfig) -> IRLSystemInt
         config["second_vibration_hopper_motor"]["input_2_pin"],
     )
 
-    main_camera = connectToCamera(
-        config["main_camera"]["device_index"],
-        gc,
-        config["main_camera"]["width"],
-        config["main_camera"]["height"],
-        config["main_camera"]["fps"],
-    )
-
-    feeder_camera = connectToCamera(
-        config["feeder_camera"]["device_index"],
-        gc,
-        config["feeder_camera"]["width"],
-        config["feeder_camera"]["height"],
-        config["feeder_camera"]["fps"],
-    )
+    main_camera = buildCamera(config["main_camera"], gc)
+    feeder_camera = buildCamera(config["feeder_camera"], gc)
 
     conveyor_encoder = Encoder(
         gc,
@@ -12,14 +12,17 @@ class OurArduinoNano(Arduino):
         self.gc = gc
         self.command_delay_ms = command_delay_ms / 1000.0
         self.command_queue = queue.Queue()
+        self.queue_depth = gc["metrics"].timeSeries("firmata.queue_depth")
+        self.command_wait = gc["metrics"].histogram("firmata.command_wait_s")
         self.running = True
         self.worker_thread = threading.Thread(target=self._processCommands, daemon=True)
         self.worker_thread.start()
 
     def sysex(self, command: int, data: List[int]) -> None:
         if self.running:
-            self.command_queue.put((command, data))
+            self.command_queue.put((command, data, time.time()))
             queue_size = self.command_queue.qsize()
+            self.queue_depth.add(queue_size)
             if queue_size > 10:
                 self.gc["logger"].warning(
                     f"Firmata command queue size is large: {queue_size} commands pending"
@@ -28,7 +31,8 @@ class OurArduinoNano(Arduino):
     def _processCommands(self) -> None:
         while self.running:
             try:
-                command, data = self.command_queue.get(timeout=1.0)
+                command, data, queued_at = self.command_queue.get(timeout=1.0)
+                self.command_wait.record(time.time() - queued_at)
                 # self.gc["logger"].info(f"Sending command {command} with data {data}")
                 self.send_sysex(command, data)
                 time.sleep(self.command_delay_ms)
@@ -0,0 +1,3 @@
+from robot.metrics.time_series import RollingTimeSeries
+from robot.metrics.histogram import StreamingHistogram
+from robot.metrics.registry import MetricsRegistry, defaultMetricsRegistry
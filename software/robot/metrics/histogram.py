@@ -0,0 +1,80 @@
+import math
+import threading
+from typing import Dict
+import numpy as np
+
+# bucket bounds grow by this factor, so percentiles are within half of it
+HISTOGRAM_BUCKET_GROWTH = 1.05
+HISTOGRAM_MIN_VALUE = 1e-6
+HISTOGRAM_MAX_VALUE = 1e6
+
+
+class StreamingHistogram:
+    # Log-bucketed histogram of non-negative values. Recording is O(1) and
+    # memory is fixed no matter how many values go in, percentiles come from
+    # the bucket they fall in.
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.log_growth = math.log(HISTOGRAM_BUCKET_GROWTH)
+        num_buckets = (
+            math.ceil(
+                math.log(HISTOGRAM_MAX_VALUE / HISTOGRAM_MIN_VALUE) / self.log_growth
+            )
+            + 2
+        )
+        self.counts = np.zeros(num_buckets, dtype=np.int64)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, value: float) -> None:
+        value = float(value)
+        bucket = self._bucketFor(value)
+        with self.lock:
+            self.counts[bucket] += 1
+            self.count += 1
+            self.total += value
+            self.max = max(self.max, value)
+
+    def percentile(self, q: float) -> float:
+        with self.lock:
+            if self.count == 0:
+                return 0.0
+            rank = max(1, math.ceil(self.count * q / 100.0))
+            bucket = int(np.searchsorted(np.cumsum(self.counts), rank))
+            return min(self._bucketValue(bucket), self.max)
+
+    def mean(self) -> float:
+        with self.lock:
+            return self.total / self.count if self.count else 0.0
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "mean": self.mean(),
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "max": self.max,
+        }
+
+    def reset(self) -> None:
+        with self.lock:
+            self.counts[:] = 0
+            self.count = 0
+            self.total = 0.0
+            self.max = 0.0
+
+    def _bucketFor(self, value: float) -> int:
+        # bucket 0 holds everything below the smallest bound
+        if value < HISTOGRAM_MIN_VALUE:
+            return 0
+        bucket = int(math.log(value / HISTOGRAM_MIN_VALUE) / self.log_growth) + 1
+        return min(bucket, len(self.counts) - 1)
+
+    def _bucketValue(self, bucket: int) -> float:
+        # geometric middle of the bucket
+        if bucket == 0:
+            return 0.0
+        lower = HISTOGRAM_MIN_VALUE * math.exp((bucket - 1) * self.log_growth)
+        return lower * math.sqrt(HISTOGRAM_BUCKET_GROWTH)
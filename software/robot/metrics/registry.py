@@ -0,0 +1,63 @@
+import threading
+from typing import Any, Dict
+from robot.metrics.time_series import RollingTimeSeries
+from robot.metrics.histogram import StreamingHistogram
+
+DEFAULT_TIME_SERIES_CAPACITY = 1024
+# window the registry snapshot summarizes time series over
+SNAPSHOT_WINDOW_S = 5.0
+
+
+class MetricsRegistry:
+    # Named metrics shared by the whole robot, lives in global_config["metrics"].
+    # Names are dotted paths like "vision.main_camera.latency_s"; asking for a
+    # name creates the metric the first time.
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.time_series: Dict[str, RollingTimeSeries] = {}
+        self.histograms: Dict[str, StreamingHistogram] = {}
+
+    def timeSeries(
+        self, name: str, capacity: int = DEFAULT_TIME_SERIES_CAPACITY
+    ) -> RollingTimeSeries:
+        with self.lock:
+            series = self.time_series.get(name)
+            if series is None:
+                series = RollingTimeSeries(capacity)
+                self.time_series[name] = series
+            return series
+
+    def histogram(self, name: str) -> StreamingHistogram:
+        with self.lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = StreamingHistogram()
+                self.histograms[name] = histogram
+            return histogram
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self.lock:
+            time_series = dict(self.time_series)
+            histograms = dict(self.histograms)
+
+        return {
+            "time_series": {
+                name: {
+                    "count_5s": series.windowCount(SNAPSHOT_WINDOW_S),
+                    "mean_5s": series.windowMean(SNAPSHOT_WINDOW_S),
+                    "p95_5s": series.windowPercentile(95, SNAPSHOT_WINDOW_S),
+                }
+                for name, series in time_series.items()
+            },
+            "histograms": {
+                name: histogram.summary() for name, histogram in histograms.items()
+            },
+        }
+
+
+# the registry in global_config, also reachable from code that isn't handed it
+_default_registry = MetricsRegistry()
+
+
+def defaultMetricsRegistry() -> MetricsRegistry:
+    return _default_registry
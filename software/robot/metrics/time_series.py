@@ -0,0 +1,90 @@
+import time
+import threading
+from typing import Optional, Tuple
+import numpy as np
+
+
+class RollingTimeSeries:
+    # Fixed-capacity ring of (timestamp, value) samples. Adding is O(1), and
+    # since samples arrive in time order, a window query is a binary search
+    # for its start followed by a numpy reduction over the samples inside it.
+    def __init__(self, capacity: int):
+        if capacity < 1:
+            raise ValueError("RollingTimeSeries capacity must be at least 1")
+
+        self.capacity = capacity
+        self.lock = threading.Lock()
+        self.timestamps = np.zeros(capacity, dtype=np.float64)
+        self.values = np.zeros(capacity, dtype=np.float64)
+        self.write_idx = 0
+        self.count = 0
+
+    def add(self, value: float, timestamp: Optional[float] = None) -> None:
+        if timestamp is None:
+            timestamp = time.time()
+        with self.lock:
+            self.timestamps[self.write_idx] = timestamp
+            self.values[self.write_idx] = value
+            self.write_idx = (self.write_idx + 1) % self.capacity
+            self.count = min(self.count + 1, self.capacity)
+
+    def window(
+        self, window_s: float, current_time: Optional[float] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        # timestamps and values of the samples in the last window_s seconds
+        if current_time is None:
+            current_time = time.time()
+        return self.since(current_time - window_s)
+
+    def since(self, start_time: float) -> Tuple[np.ndarray, np.ndarray]:
+        with self.lock:
+            timestamps, values = self._ordered()
+            start = np.searchsorted(timestamps, start_time, side="left")
+            return timestamps[start:].copy(), values[start:].copy()
+
+    def latest(self, n: int) -> np.ndarray:
+        with self.lock:
+            _, values = self._ordered()
+            return values[max(0, len(values) - n) :].copy()
+
+    def last(self) -> Optional[Tuple[float, float]]:
+        with self.lock:
+            if self.count == 0:
+                return None
+            idx = (self.write_idx - 1) % self.capacity
+            return float(self.timestamps[idx]), float(self.values[idx])
+
+    def windowCount(self, window_s: float, current_time: Optional[float] = None) -> int:
+        return len(self.window(window_s, current_time)[1])
+
+    def windowSum(self, window_s: float, current_time: Optional[float] = None) -> float:
+        return float(self.window(window_s, current_time)[1].sum())
+
+    def windowMean(
+        self, window_s: float, current_time: Optional[float] = None
+    ) -> float:
+        values = self.window(window_s, current_time)[1]
+        return float(values.mean()) if len(values) else 0.0
+
+    def windowRate(
+        self, window_s: float, current_time: Optional[float] = None
+    ) -> float:
+        # samples per second over the window
+        return self.windowCount(window_s, current_time) / window_s
+
+    def windowPercentile(
+        self, q: float, window_s: float, current_time: Optional[float] = None
+    ) -> float:
+        values = self.window(window_s, current_time)[1]
+        return float(np.percentile(values, q)) if len(values) else 0.0
+
+    def __len__(self) -> int:
+        with self.lock:
+            return self.count
+
+    def _ordered(self) -> Tuple[np.ndarray, np.ndarray]:
+        # caller must hold the lock, returns views when the ring hasn't wrapped
+        if self.count < self.capacity:
+            return self.timestamps[: self.count], self.values[: self.count]
+        order = np.r_[self.write_idx : self.capacity, 0 : self.write_idx]
+        return self.timestamps[order], self.values[order]
@@ -0,0 +1,106 @@
+import threading
+from collections import OrderedDict, deque
+from typing import Deque, Dict, List
+from robot.our_types.vision_system import FeederRegion, RegionReading
+
+
+class RegionRun:
+    # consecutive readings of a track in the same region, collapsed into one
+    __slots__ = ("region", "first_seen", "last_seen", "last_captured", "count")
+
+    def __init__(
+        self, region: FeederRegion, timestamp: float, capture_timestamp: float
+    ):
+        self.region = region
+        self.first_seen = timestamp
+        self.last_seen = timestamp
+        self.last_captured = capture_timestamp
+        self.count = 1
+
+
+class TrackedObject:
+    __slots__ = ("track_id", "runs", "last_seen")
+
+    def __init__(self, track_id: str, timestamp: float):
+        self.track_id = track_id
+        self.runs: Deque[RegionRun] = deque()
+        self.last_seen = timestamp
+
+
+class ObjectDetectionStore:
+    # Region readings of feeder camera tracks, indexed by track id. Tracks are
+    # kept in order of their last reading, so expiry and window queries stop
+    # at the first track that is too old instead of scanning all of them.
+    def __init__(self, retention_s: float):
+        self.retention_s = retention_s
+        self.lock = threading.Lock()
+        self.tracks: "OrderedDict[str, TrackedObject]" = OrderedDict()
+
+    def record(
+        self,
+        track_id: str,
+        region: FeederRegion,
+        timestamp: float,
+        capture_timestamp: float,
+    ) -> bool:
+        # whether the track is in a different region than at its last reading
+        with self.lock:
+            tracked = self.tracks.get(track_id)
+            if tracked is None:
+                tracked = TrackedObject(track_id, timestamp)
+                self.tracks[track_id] = tracked
+            else:
+                self.tracks.move_to_end(track_id)
+            tracked.last_seen = timestamp
+
+            runs = tracked.runs
+            region_changed = not runs or runs[-1].region != region
+            if region_changed:
+                runs.append(RegionRun(region, timestamp, capture_timestamp))
+            else:
+                runs[-1].last_seen = timestamp
+                runs[-1].last_captured = capture_timestamp
+                runs[-1].count += 1
+
+            cutoff_time = timestamp - self.retention_s
+            while runs[0].last_seen < cutoff_time:
+                runs.popleft()
+            return region_changed
+
+    def expire(self, current_time: float) -> None:
+        cutoff_time = current_time - self.retention_s
+        with self.lock:
+            while self.tracks:
+                oldest = next(iter(self.tracks.values()))
+                if oldest.last_seen >= cutoff_time:
+                    break
+                self.tracks.popitem(last=False)
+
+    def recentReadings(self, since: float) -> Dict[str, List[RegionReading]]:
+        # the newest reading of each region a track was in at or after since,
+        # oldest first, for every track seen since then
+        recent: Dict[str, List[RegionReading]] = {}
+        with self.lock:
+            for tracked in reversed(self.tracks.values()):
+                if tracked.last_seen < since:
+                    break
+
+                readings = []
+                for run in reversed(tracked.runs):
+                    if run.last_seen < since:
+                        break
+                    readings.append(
+                        RegionReading(
+                            timestamp=run.last_seen,
+                            capture_timestamp=run.last_captured,
+                            region=run.region,
+                            track_id=tracked.track_id,
+                        )
+                    )
+                readings.reverse()
+                recent[tracked.track_id] = readings
+        return recent
+
+    def __len__(self) -> int:
+        with self.lock:
+            return len(self.tracks)
@@ -1,6 +1,27 @@
 from enum import Enum
+from dataclasses import dataclass
+from typing import Optional
+import numpy as np
 
 
 class CameraType(Enum):
     MAIN_CAMERA = "main_camera"
     FEEDER_CAMERA = "feeder_camera"
+
+
+@dataclass
+class CapturedFrame:
+    frame: np.ndarray
+    timestamp: float
+    sequence: int
+
+
+@dataclass
+class ClipRequest:
+    # a span of time every clip recorder should save, tagged with the
+    # KnownObject uuid once one exists
+    event: str
+    trigger_time: float
+    start_time: float
+    end_time: float
+    tag: Optional[str] = None
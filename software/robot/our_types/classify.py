@@ -1,4 +1,6 @@
-from typing import TypedDict, Optional
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import TypedDict, Optional, List
 
 
 class ClassificationResult(TypedDict):
@@ -9,3 +11,14 @@ class ClassificationResult(TypedDict):
 class ClassificationConsensus(TypedDict):
     id: str
     category_id: str
+
+
+@dataclass
+class PendingClassification:
+    uuid: str
+    main_camera_id: str
+    results: "Future[List[ClassificationResult]]"
+    # the piece was distance_past_center_cm past the main camera center at
+    # reference_time, belt travel since then locates it
+    reference_time: float
+    distance_past_center_cm: float
@@ -1,6 +1,7 @@
 from enum import Enum
 from dataclasses import dataclass, field
-from typing import List
+from typing import Dict, List, Optional, Tuple
+import numpy as np
 
 
 @dataclass
@@ -9,6 +10,9 @@ class CameraPerformanceMetrics:
     fps_5s: float
     latency_1s: float
     latency_5s: float
+    dropped_frames_5s: int
+    # per vision stage p50/p95/p99/max over the last 5s, in ms
+    stage_latency_ms: Dict[str, Dict[str, float]] = field(default_factory=dict)
 
 
 class FeederRegion(Enum):
@@ -23,14 +27,47 @@ class FeederRegion(Enum):
 @dataclass
 class RegionReading:
     timestamp: float
+    capture_timestamp: float  # when the frame it was read from was grabbed
     region: FeederRegion
     track_id: str
 
 
+@dataclass(frozen=True)
+class FrameAnalysis:
+    timestamp: float
+    capture_timestamp: float  # when the camera grabbed the frame
+    frame_shape: Tuple[int, int]  # height, width of the camera frame
+    class_ids: np.ndarray  # (N,) int
+    track_ids: List[Optional[str]]
+    boxes_xyxy: np.ndarray  # (N, 4) float, frame coordinates
+    masks: np.ndarray  # (N, H, W) bool, mask coordinates
+    mask_bboxes: List[Optional[Tuple[int, int, int, int]]]  # x1, y1, x2, y2
+    touches_edge: np.ndarray  # (N,) bool
+
+
+@dataclass(frozen=True)
+class SceneRegions:
+    # feeder and conveyor geometry in mask coordinates, keyed by class name
+    masks_by_class: Dict[str, List[np.ndarray]]
+    bboxes_by_class: Dict[str, List[Optional[Tuple[int, int, int, int]]]]
+    main_conveyor_bboxes_with_margin: List[Tuple[int, int, int, int]]
+    # (H, W) uint8, bit k set where region k of REGION_CLASS_IDS is present
+    label_raster: Optional[np.ndarray]
+    # filled lazily, one distance transform per first feeder mask
+    first_feeder_distance_maps: Dict[int, Optional[np.ndarray]]
+
+
 @dataclass
-class ObjectDetection:
+class MaskTrack:
     track_id: str
-    region_readings: List[RegionReading] = field(default_factory=list)
+    mask: np.ndarray  # (H, W) bool, mask coordinates
+    bbox: Tuple[int, int, int, int]
+    area: int
+    centroid: Tuple[float, float]  # x, y
+    velocity: Tuple[float, float]  # mask px per second
+    last_seen: float
+    observations: int = 1
+    misses: int = 0
 
 
 class FeederState(Enum):
@@ -49,3 +86,18 @@ class MainCameraState(Enum):
         "waiting_for_object_to_center_under_main_camera"
     )
     OBJECT_CENTERED_UNDER_MAIN_CAMERA = "object_centered_under_main_camera"
+
+
+class VisionEventType(Enum):
+    OBJECT_ENTERED_MAIN_CONVEYOR = "object_entered_main_conveyor"
+    OBJECT_UNDER_MAIN_CAMERA = "object_under_main_camera"
+    OBJECT_CENTERED = "object_centered"
+    FEEDER_REGION_CHANGED = "feeder_region_changed"
+
+
+@dataclass
+class VisionEvent:
+    type: VisionEventType
+    timestamp: float  # capture time of the frame it was seen in
+    track_id: Optional[str] = None
+    region: Optional[FeederRegion] = None
@@ -44,6 +44,8 @@ class CameraPerformanceMessage(TypedDict):
     fps_5s: float
     latency_1s: float
     latency_5s: float
+    dropped_frames_5s: int
+    stage_latency_ms: Dict[str, Dict[str, float]]
 
 
 class FeederStatusMessage(TypedDict):
@@ -1,4 +1,4 @@
-import requests
+import os
 import time
 from typing import List, Optional, cast
 from requests_oauthlib import OAuth1
@@ -12,32 +12,56 @@ from robot.piece.bricklink.types import (
     BricklinkColorsResponse,
     BricklinkColorData,
 )
+from robot.util.http_client import getHttpClient
 
+# overridable to point lookups at a local stub server
+BASE_URL = os.getenv("BRICKLINK_API_URL", "https://api.bricklink.com/api/store/v1")
+BRICKLINK_DEADLINE_S = 10.0
 
-BASE_URL = "https://api.bricklink.com/api/store/v1"
 
+class BricklinkUnavailableError(Exception):
+    # BrickLink couldn't answer, as opposed to answering that it has no data
+    pass
 
-def _makeApiRequest(endpoint: str, auth: OAuth1) -> Optional[dict]:
+
+def _requestApi(endpoint: str, auth: OAuth1) -> Optional[dict]:
     url = BASE_URL + endpoint
 
     try:
-        response = requests.get(url, auth=auth)
-
+        response = getHttpClient("bricklink").get(
+            url, auth=auth, deadline_s=BRICKLINK_DEADLINE_S
+        )
         if response.status_code != 200:
-            return None
-
+            raise BricklinkUnavailableError(f"HTTP {response.status_code}")
         data = response.json()
+    except BricklinkUnavailableError:
+        raise
+    except Exception as e:
+        raise BricklinkUnavailableError(str(e)) from e
 
-        if "data" not in data:
-            return None
+    if "data" not in data:
+        return None
 
-        # Rate limiting
-        time.sleep(BRICKLINK_API_RATE_LIMIT_DELAY_MS / 1000.0)
+    # Rate limiting
+    time.sleep(BRICKLINK_API_RATE_LIMIT_DELAY_MS / 1000.0)
 
-        return data
+    return data
 
-    except Exception as e:
+
+def _makeApiRequest(endpoint: str, auth: OAuth1) -> Optional[dict]:
+    try:
+        return _requestApi(endpoint, auth)
+    except BricklinkUnavailableError:
+        return None
+
+
+def fetchPartInfo(part_id: str, auth: OAuth1) -> Optional[BricklinkPartData]:
+    # like getPartInfo, but raises BricklinkUnavailableError instead of
+    # returning None when BrickLink couldn't be asked
+    response_data = _requestApi(f"/items/part/{part_id}", auth)
+    if not response_data:
         return None
+    return cast(BricklinkPartResponse, response_data)["data"]
 
 
 def getPartInfo(part_id: str, auth: OAuth1) -> Optional[BricklinkPartData]:
@@ -1,8 +1,11 @@
 import os
+from functools import lru_cache
 from typing import Optional
 from requests_oauthlib import OAuth1
 
 
+# the credentials don't change while running, signing is per request
+@lru_cache(maxsize=1)
 def mkAuth() -> OAuth1:
     consumer_key = os.environ.get("BL_CONSUMER_KEY")
     consumer_secret = os.environ.get("BL_CONSUMER_SECRET")
@@ -0,0 +1,106 @@
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from robot.global_config import GlobalConfig
+from robot.piece.bricklink.api import BricklinkUnavailableError, fetchPartInfo
+from robot.piece.bricklink.auth import mkAuth
+from robot.storage.sqlite3.operations import (
+    getCachedPartCategory,
+    getItemCategoryIndex,
+    savePartCategoryToCache,
+)
+
+
+class CategoryResolver:
+    # BrickLink category of a classified item id. The local piece catalog is
+    # indexed in memory and answers almost every lookup; ids it doesn't know
+    # are looked up in the sqlite part category cache, and only a miss there
+    # or an expired entry goes to BrickLink. Items BrickLink has no category
+    # for are cached too, for a shorter time, so they aren't asked for again
+    # on every sighting. BrickLink being unreachable is never cached. On a
+    # database without the cache table every lookup is a cache miss.
+    def __init__(self, global_config: GlobalConfig):
+        self.global_config = global_config
+        self.logger = global_config["logger"].ctx(system="category_resolver")
+        self.metrics = global_config["metrics"]
+        self.lock = threading.Lock()
+        self.cache_available = True
+        self.index: Dict[str, str] = getItemCategoryIndex(global_config)
+        self.logger.info(f"Indexed {len(self.index)} catalogued item ids")
+
+    def resolve(self, item_id: str) -> Optional[str]:
+        with self.lock:
+            category_id = self.index.get(item_id)
+        if category_id is not None:
+            self.metrics.timeSeries("category_resolver.catalog_hits").add(1)
+            return category_id
+
+        cached = self._getCached(item_id)
+        if cached is not None:
+            category_id, fetched_at = cached
+            ttl_s = (
+                self.global_config["part_category_cache_ttl_s"]
+                if category_id is not None
+                else self.global_config["part_category_negative_cache_ttl_s"]
+            )
+            if time.time() - fetched_at / 1000.0 < ttl_s:
+                self.metrics.timeSeries("category_resolver.cache_hits").add(1)
+                return category_id
+
+        self.metrics.timeSeries("category_resolver.bricklink_lookups").add(1)
+        try:
+            part_data = fetchPartInfo(item_id, mkAuth())
+        except BricklinkUnavailableError as e:
+            self.logger.warning(f"BrickLink lookup of {item_id} failed: {e}")
+            # a stale answer beats none
+            return cached[0] if cached is not None else None
+
+        category_id = None
+        fetched_category_id = part_data.get("category_id") if part_data else None
+        if fetched_category_id:
+            category_id = str(fetched_category_id)
+        self._saveToCache(item_id, category_id)
+        return category_id
+
+    def _getCached(self, item_id: str) -> Optional[Tuple[Optional[str], int]]:
+        if not self.cache_available:
+            return None
+        try:
+            return getCachedPartCategory(self.global_config, item_id)
+        except sqlite3.OperationalError as e:
+            self._handleCacheError(e)
+            return None
+
+    def _saveToCache(self, item_id: str, category_id: Optional[str]) -> None:
+        if not self.cache_available:
+            return
+        try:
+            savePartCategoryToCache(self.global_config, item_id, category_id)
+        except sqlite3.OperationalError as e:
+            self._handleCacheError(e)
+
+    def _handleCacheError(self, error: sqlite3.OperationalError) -> None:
+        if "no such table" not in str(error):
+            # e.g. the database is locked, only this lookup misses the cache
+            self.logger.warning(f"Part category cache access failed: {error}")
+            return
+        # migration 011 hasn't been applied to this database
+        self.cache_available = False
+        self.logger.warning(
+            f"Part category cache unavailable, looking up every uncatalogued item on BrickLink: {error}"
+        )
+
+
+_resolvers: Dict[str, CategoryResolver] = {}
+_resolvers_lock = threading.Lock()
+
+
+def getCategoryResolver(global_config: GlobalConfig) -> CategoryResolver:
+    # one resolver per database, built on first use
+    with _resolvers_lock:
+        resolver = _resolvers.get(global_config["db_path"])
+        if resolver is None:
+            resolver = CategoryResolver(global_config)
+            _resolvers[global_config["db_path"]] = resolver
+        return resolver
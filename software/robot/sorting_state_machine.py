@@ -13,6 +13,7 @@ from robot.states.waiting_for_object_to_center_under_main_camera import (
 from robot.states.classifying import Classifying
 from robot.states.sending_object_to_bin import SendingObjectToBin
 from robot.states.shared_variables import SharedVariables
+from robot.classification_pipeline import ClassificationPipeline
 from robot.vision_system import SegmentationModelManager
 from robot.irl.config import IRLSystemInterface
 from robot.websocket_manager import WebSocketManager
@@ -37,8 +38,14 @@ class SortingStateMachine:
         self.encoder_manager = encoder_manager
         self.bin_state_tracker = bin_state_tracker
         self.shared_variables = SharedVariables()
+        self.classification_pipeline = ClassificationPipeline(
+            global_config, websocket_manager, bin_state_tracker, self.shared_variables
+        )
         self.current_state = SortingState.GETTING_NEW_OBJECT_FROM_FEEDER
+        self.current_state_started_at = time.time()
         self.logger = vision_system.logger
+        self.metrics = global_config["metrics"]
+        self.vision_events = vision_system.events.subscribe()
 
         self.states_map: Dict[SortingState, IStateMachine] = {
             SortingState.GETTING_NEW_OBJECT_FROM_FEEDER: GettingNewObjectFromFeeder(
@@ -55,7 +62,7 @@ class SortingStateMachine:
                 vision_system,
                 websocket_manager,
                 irl_interface,
-                bin_state_tracker,
+                self.classification_pipeline,
                 self.shared_variables,
             ),
             SortingState.SENDING_OBJECT_TO_BIN: SendingObjectToBin(
@@ -64,6 +71,7 @@ class SortingStateMachine:
                 websocket_manager,
                 irl_interface,
                 encoder_manager,
+                self.classification_pipeline,
                 self.shared_variables,
             ),
         }
@@ -71,8 +79,12 @@ class SortingStateMachine:
     def step(self):
         next_state = None
 
+        step_start = time.time()
         if self.current_state in self.states_map:
             next_state = self.states_map[self.current_state].step()
+        self.metrics.histogram(
+            f"state_machine.{self.current_state.value}.step_s"
+        ).record(time.time() - step_start)
 
         if next_state and next_state != self.current_state:
             self.logger.info(
@@ -82,7 +94,29 @@ class SortingStateMachine:
             if self.current_state in self.states_map:
                 self.states_map[self.current_state].cleanup()
 
+            self._recordTransitionClip(self.current_state, next_state)
+            transition_time = time.time()
+            self.metrics.histogram(
+                f"state_machine.{self.current_state.value}.duration_s"
+            ).record(transition_time - self.current_state_started_at)
             self.current_state = next_state
+            self.current_state_started_at = transition_time
 
+        # steps run as soon as vision sees a change, the step period is only
+        # the deadline for timeouts and conditions that build up over time
         steps_per_second = self.global_config["state_machine_steps_per_second"]
-        time.sleep(1.0 / steps_per_second)
+        self.vision_events.wait(1.0 / steps_per_second)
+
+    def _recordTransitionClip(
+        self, from_state: SortingState, to_state: SortingState
+    ) -> None:
+        if from_state == SortingState.GETTING_NEW_OBJECT_FROM_FEEDER:
+            self.vision_system.recordClip("object_fed")
+        if to_state == SortingState.CLASSIFYING:
+            self.vision_system.recordClip("classifying")
+        elif (
+            to_state == SortingState.GETTING_NEW_OBJECT_FROM_FEEDER
+            and from_state != SortingState.SENDING_OBJECT_TO_BIN
+        ):
+            # every other way back to the feeder is a timeout
+            self.vision_system.recordClip(f"timeout_{from_state.value}")
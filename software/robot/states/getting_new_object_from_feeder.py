@@ -150,107 +150,80 @@ class GettingNewObjectFromFeeder(BaseState):
         current_time = time.time()
         cutoff_time = current_time - window_seconds
 
-        with self.vision_system.detection_lock:
-            # Analyze recent object readings to determine state
-            recent_detections = []
-
-            # remove this in future: log object detections for debugging
-            self.logger.info(
-                f"OBJECT DETECTIONS: Found {len(self.vision_system.object_detections)} total detections"
-            )
-            for i, detection in enumerate(self.vision_system.object_detections):
-                self.logger.info(
-                    f"  Detection {i}: {len(detection.region_readings)} readings"
-                )
-                for j, reading in enumerate(detection.region_readings):
-                    if reading.timestamp >= cutoff_time:
-                        self.logger.info(
-                            f"    Reading {j}: region={reading.region}, timestamp={reading.timestamp}"
-                        )
-
-            for detection in self.vision_system.object_detections:
-                recent_readings = [
-                    reading
-                    for reading in detection.region_readings
-                    if reading.timestamp >= cutoff_time
-                ]
-                if recent_readings:
-                    recent_detections.append(recent_readings)
-
-            if not recent_detections:
-                return None
-
-            # Check for objects on main conveyor - only use direct detection within recent timeframe
-            current_time = time.time()
-            recent_threshold_ms = step_duration_ms  # Within one step
-
-            for readings in recent_detections:
-                for reading in readings:
-                    time_since_reading_ms = (current_time - reading.timestamp) * 1000
-                    if (
-                        reading.region == FeederRegion.MAIN_CONVEYOR
-                        and time_since_reading_ms < recent_threshold_ms
-                    ):
-                        self.logger.info(
-                            f"MAIN CONVEYOR DETECTED: Object on main conveyor {time_since_reading_ms:.1f}ms ago"
-                        )
-                        return FeederState.OBJECT_ON_MAIN_CONVEYOR
-
-            # # Check for objects at exit of second feeder that went MIA (likely on main conveyor)
-            # current_time = time.time()
-            # steps_per_second = self.gc["state_machine_steps_per_second"]
-            # step_duration_ms = (1.0 / steps_per_second) * 1000
-            # disappearance_threshold_ms = step_duration_ms * 3  # 3 steps worth of time
-
-            # for readings in recent_detections:
-            #     exit_readings = [
-            #         reading
-            #         for reading in readings
-            #         if reading.region == FeederRegion.EXIT_OF_SECOND_FEEDER
-            #     ]
-            #     if exit_readings:
-            #         last_exit_time = max(reading.timestamp for reading in exit_readings)
-            #         time_since_exit_ms = (current_time - last_exit_time) * 1000
-
-            #         # If object was at exit recently but no readings after, assume it fell onto main conveyor
-            #         post_exit_readings = [
-            #             reading
-            #             for reading in readings
-            #             if reading.timestamp > last_exit_time
-            #         ]
-            #         if not post_exit_readings and time_since_exit_ms < disappearance_threshold_ms:
-            #             self.logger.info(f"OBJECT DISAPPEARED: Object at exit {time_since_exit_ms:.1f}ms ago, assuming on main conveyor")
-            #             return FeederState.OBJECT_ON_MAIN_CONVEYOR
-
-            # Check for objects at end of second feeder
-            for readings in recent_detections:
-                for reading in readings:
-                    if reading.region == FeederRegion.EXIT_OF_SECOND_FEEDER:
-                        return FeederState.OBJECT_AT_END_OF_SECOND_FEEDER
-
-            # Analyze object locations to determine feeder state
-            objects_on_first_feeder = False
-            objects_on_second_feeder = False
-            objects_under_exit_of_first_feeder = False
-
-            for readings in recent_detections:
-                for reading in readings:
-                    if reading.region == FeederRegion.FIRST_FEEDER_MASK:
-                        objects_on_first_feeder = True
-                    elif reading.region == FeederRegion.SECOND_FEEDER_MASK:
-                        objects_on_second_feeder = True
-                    elif reading.region == FeederRegion.UNDER_EXIT_OF_FIRST_FEEDER:
-                        objects_under_exit_of_first_feeder = True
-
-            # Check dropzone first - clear it before dealing with first feeder
-            if objects_under_exit_of_first_feeder:
-                return FeederState.OBJECT_UNDERNEATH_EXIT_OF_FIRST_FEEDER
-
-            # First feeder empty only if no objects on first feeder AND dropzone is clear
-            if not objects_on_first_feeder:
-                return FeederState.FIRST_FEEDER_EMPTY
-
-            # Objects on first feeder but not in dropzone
-            return FeederState.NO_OBJECT_UNDERNEATH_EXIT_OF_FIRST_FEEDER
-
-        return None
+        recent_detections = list(
+            self.vision_system.object_detections.recentReadings(cutoff_time).values()
+        )
+        if not recent_detections:
+            return None
+
+        # Check for objects on main conveyor - only use direct detection within recent timeframe
+        recent_threshold_ms = step_duration_ms  # Within one step
+
+        for readings in recent_detections:
+            for reading in readings:
+                time_since_reading_ms = (current_time - reading.timestamp) * 1000
+                if (
+                    reading.region == FeederRegion.MAIN_CONVEYOR
+                    and time_since_reading_ms < recent_threshold_ms
+                ):
+                    self.logger.info(
+                        f"MAIN CONVEYOR DETECTED: Object on main conveyor {time_since_reading_ms:.1f}ms ago"
+                    )
+                    return FeederState.OBJECT_ON_MAIN_CONVEYOR
+
+        # # Check for objects at exit of second feeder that went MIA (likely on main conveyor)
+        # current_time = time.time()
+        # steps_per_second = self.gc["state_machine_steps_per_second"]
+        # step_duration_ms = (1.0 / steps_per_second) * 1000
+        # disappearance_threshold_ms = step_duration_ms * 3  # 3 steps worth of time
+
+        # for readings in recent_detections:
+        #     exit_readings = [
+        #         reading
+        #         for reading in readings
+        #         if reading.region == FeederRegion.EXIT_OF_SECOND_FEEDER
+        #     ]
+        #     if exit_readings:
+        #         last_exit_time = max(reading.timestamp for reading in exit_readings)
+        #         time_since_exit_ms = (current_time - last_exit_time) * 1000
+
+        #         # If object was at exit recently but no readings after, assume it fell onto main conveyor
+        #         post_exit_readings = [
+        #             reading
+        #             for reading in readings
+        #             if reading.timestamp > last_exit_time
+        #         ]
+        #         if not post_exit_readings and time_since_exit_ms < disappearance_threshold_ms:
+        #             self.logger.info(f"OBJECT DISAPPEARED: Object at exit {time_since_exit_ms:.1f}ms ago, assuming on main conveyor")
+        #             return FeederState.OBJECT_ON_MAIN_CONVEYOR
+
+        # Check for objects at end of second feeder
+        for readings in recent_detections:
+            for reading in readings:
+                if reading.region == FeederRegion.EXIT_OF_SECOND_FEEDER:
+                    return FeederState.OBJECT_AT_END_OF_SECOND_FEEDER
+
+        # Analyze object locations to determine feeder state
+        objects_on_first_feeder = False
+        objects_on_second_feeder = False
+        objects_under_exit_of_first_feeder = False
+
+        for readings in recent_detections:
+            for reading in readings:
+                if reading.region == FeederRegion.FIRST_FEEDER_MASK:
+                    objects_on_first_feeder = True
+                elif reading.region == FeederRegion.SECOND_FEEDER_MASK:
+                    objects_on_second_feeder = True
+                elif reading.region == FeederRegion.UNDER_EXIT_OF_FIRST_FEEDER:
+                    objects_under_exit_of_first_feeder = True
+
+        # Check dropzone first - clear it before dealing with first feeder
+        if objects_under_exit_of_first_feeder:
+            return FeederState.OBJECT_UNDERNEATH_EXIT_OF_FIRST_FEEDER
+
+        # First feeder empty only if no objects on first feeder AND dropzone is clear
+        if not objects_on_first_feeder:
+            return FeederState.FIRST_FEEDER_EMPTY
+
+        # Objects on first feeder but not in dropzone
+        return FeederState.NO_OBJECT_UNDERNEATH_EXIT_OF_FIRST_FEEDER
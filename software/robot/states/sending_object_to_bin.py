@@ -1,9 +1,12 @@
 import time
+from concurrent.futures import wait
 from typing import Optional
 from robot.states.base_state import BaseState
 from robot.our_types.sorting import SortingState
 from robot.our_types.known_object import KnownObject
 from robot.our_types.bin import BinCoordinates
+from robot.our_types.classify import PendingClassification
+from robot.classification_pipeline import ClassificationPipeline
 from robot.vision_system import SegmentationModelManager
 from robot.irl.config import IRLSystemInterface
 from robot.websocket_manager import WebSocketManager
@@ -11,7 +14,6 @@ from robot.encoder_manager import EncoderManager
 from robot.states.shared_variables import SharedVariables
 from robot.global_config import GlobalConfig
 
-
 DELAY_CHECK_ENCODER_MS = 100
 
 
@@ -23,21 +25,24 @@ class SendingObjectToBin(BaseState):
         websocket_manager: WebSocketManager,
         irl_interface: IRLSystemInterface,
         encoder_manager: EncoderManager,
+        classification_pipeline: ClassificationPipeline,
         shared_variables: SharedVariables,
     ):
         super().__init__(global_config, vision_system, websocket_manager, irl_interface)
         self.encoder_manager = encoder_manager
+        self.classification_pipeline = classification_pipeline
         self.shared_variables = shared_variables
         self.logger = global_config["logger"].ctx(state="SendingObjectToBin")
+        self.metrics = global_config["metrics"]
         self.sequence_complete = False
 
     def step(self) -> Optional[SortingState]:
-        self._setMainConveyorToDefaultSpeed()
-        self._ensureExecutionThreadStarted()
-
+        # checked first, a finished send must not be started again
         if self.sequence_complete:
             return SortingState.GETTING_NEW_OBJECT_FROM_FEEDER
 
+        self._setMainConveyorToDefaultSpeed()
+        self._ensureExecutionThreadStarted()
         return None
 
     def cleanup(self) -> None:
@@ -49,6 +54,7 @@ class SendingObjectToBin(BaseState):
             main_conveyor.setSpeed(main_speed)
 
         self.shared_variables.pending_known_object = None
+        self.shared_variables.pending_classification = None
         self.sequence_complete = False
 
         self.logger.info(
@@ -56,6 +62,25 @@ class SendingObjectToBin(BaseState):
         )
 
     def _executionLoop(self) -> None:
+        # taken once, so the piece's bin is decided and reserved only once
+        pending = self.shared_variables.takePendingClassification()
+        try:
+            self._sendToBin(pending)
+        except Exception as e:
+            self.logger.error(
+                f"SENDING_OBJECT_TO_BIN: Failed, moving on to the next piece: {e}"
+            )
+        finally:
+            self.shared_variables.pending_known_object = None
+            # the state has no timeout, the state machine waits for this
+            self.sequence_complete = True
+
+    def _sendToBin(self, pending: Optional[PendingClassification]) -> None:
+        if pending is not None:
+            self.shared_variables.pending_known_object = self._awaitBinDecision(pending)
+            if self._stop_event.is_set():
+                return
+
         if not (
             self.shared_variables.pending_known_object
             and self.shared_variables.pending_known_object["bin_coordinates"]
@@ -63,7 +88,6 @@ class SendingObjectToBin(BaseState):
             self.logger.warning(
                 "SENDING_OBJECT_TO_BIN: No pending known object or bin coordinates"
             )
-            self.sequence_complete = True
             return
 
         bin_coords = self.shared_variables.pending_known_object["bin_coordinates"]
@@ -71,21 +95,38 @@ class SendingObjectToBin(BaseState):
 
         self._openDoorsForBin(bin_coords)
 
-        if not self.global_config["disable_main_conveyor"]:
-            main_conveyor = self.irl_interface["main_conveyor_dc_motor"]
-            main_speed = self.irl_interface["runtime_params"]["main_conveyor_speed"]
-            EXTRA_SPEED = 100
-            main_conveyor.setSpeed(main_speed + EXTRA_SPEED)
-            self.logger.info("SENDING_OBJECT_TO_BIN: Main conveyor started")
+        if pending is not None:
+            # the belt never stopped, the piece is located from where it was
+            # when its classification was dispatched
+            reference_time = pending.reference_time
+            distance_past_center = pending.distance_past_center_cm
+        else:
+            # the piece is rarely stopped exactly at the camera center
+            distance_past_center = (
+                self.vision_system.getObjectDistancePastCenterCm(
+                    self.shared_variables.pending_known_object["main_camera_id"]
+                )
+                or 0.0
+            )
+
+            if not self.global_config["disable_main_conveyor"]:
+                main_conveyor = self.irl_interface["main_conveyor_dc_motor"]
+                main_speed = self.irl_interface["runtime_params"]["main_conveyor_speed"]
+                EXTRA_SPEED = 100
+                main_conveyor.setSpeed(main_speed + EXTRA_SPEED)
+                self.logger.info("SENDING_OBJECT_TO_BIN: Main conveyor started")
+            reference_time = time.time()
 
-        conveyor_start_timestamp = time.time()
         target_distance = self._getDistanceToDistributionModule(
             bin_coords["distribution_module_idx"]
         )
 
         while not self._stop_event.is_set():
-            distance_traveled = self.encoder_manager.getDistanceTraveledSince(
-                conveyor_start_timestamp
+            distance_traveled = (
+                self.encoder_manager.getExtrapolatedDistanceTraveledSince(
+                    reference_time
+                )
+                + distance_past_center
             )
             self.logger.info(
                 f"SENDING_OBJECT_TO_BIN: Distance traveled: {distance_traveled} cm, target distance {target_distance}"
@@ -120,10 +161,60 @@ class SendingObjectToBin(BaseState):
             return
 
         self._closeBinDoor(bin_coords)
-        self.shared_variables.pending_known_object = None
         self.logger.info("SENDING_OBJECT_TO_BIN: Sequence complete")
 
-        self.sequence_complete = True
+    def _awaitBinDecision(
+        self, pending: PendingClassification
+    ) -> Optional[KnownObject]:
+        # the decision is needed by the time the piece is the conveyor door's
+        # opening time short of the first module, past that it can't be
+        # diverted into any module but the last
+        door_lead_s = self.global_config["classification_door_lead_ms"] / 1000.0
+        first_door_distance = self._getDistanceToDistributionModule(0)
+
+        while not self._stop_event.is_set():
+            done, _ = wait([pending.results], timeout=DELAY_CHECK_ENCODER_MS / 1000)
+            distance_traveled = (
+                self.encoder_manager.getExtrapolatedDistanceTraveledSince(
+                    pending.reference_time
+                )
+                + pending.distance_past_center_cm
+            )
+            deadline_distance = (
+                first_door_distance
+                - self.encoder_manager.getCurrentSpeedCmPerS() * door_lead_s
+            )
+
+            if done:
+                self.metrics.histogram("classification.deadline_slack_cm").record(
+                    deadline_distance - distance_traveled
+                )
+                if distance_traveled < deadline_distance:
+                    try:
+                        return self.classification_pipeline.resolve(pending)
+                    except Exception as e:
+                        self.metrics.timeSeries("classification.failed").add(1)
+                        self.logger.error(
+                            f"SENDING_OBJECT_TO_BIN: Classification of UUID {pending.uuid} failed, "
+                            f"sending to fallback bin: {e}"
+                        )
+                        return self.classification_pipeline.fallback(pending)
+
+            if distance_traveled >= deadline_distance:
+                self.metrics.timeSeries("classification.deadline_missed").add(1)
+                self.logger.warning(
+                    f"SENDING_OBJECT_TO_BIN: No classification for UUID {pending.uuid} "
+                    f"{distance_traveled:.1f} cm past the camera center, sending to fallback bin"
+                )
+                pending.results.add_done_callback(
+                    lambda results: self.logger.info(
+                        f"SENDING_OBJECT_TO_BIN: Classification for UUID {pending.uuid} "
+                        "arrived after its deadline, ignored"
+                    )
+                )
+                return self.classification_pipeline.fallback(pending)
+
+        return None
 
     def _getDistanceToDistributionModule(self, distribution_module_idx: int) -> float:
         if distribution_module_idx < len(self.irl_interface["distribution_modules"]):
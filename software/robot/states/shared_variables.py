@@ -1,8 +1,19 @@
+import threading
 from typing import Optional, List
 from robot.our_types.known_object import KnownObject
+from robot.our_types.classify import PendingClassification
 
 
 class SharedVariables:
     def __init__(self):
         self.pending_known_object: Optional[KnownObject] = None
+        # set instead of pending_known_object when classification is pipelined
+        self.pending_classification: Optional[PendingClassification] = None
         self.all_known_objects: List[KnownObject] = []
+        self.lock = threading.Lock()
+
+    def takePendingClassification(self) -> Optional[PendingClassification]:
+        with self.lock:
+            pending = self.pending_classification
+            self.pending_classification = None
+            return pending
@@ -1,14 +1,26 @@
 import time
+import threading
 from typing import Optional
 from robot.states.base_state import BaseState
 from robot.our_types.sorting import SortingState
+from robot.our_types.vision_system import VisionEvent, VisionEventType
 from robot.vision_system import SegmentationModelManager
 from robot.irl.config import IRLSystemInterface
 from robot.websocket_manager import WebSocketManager
 from robot.global_config import GlobalConfig
 
+# crossings further out than this are left until the trajectory has more samples
+CENTER_STOP_SCHEDULE_HORIZON_S = 1.0
+# a scheduled stop is moved when the prediction shifts by more than this
+CENTER_STOP_RESCHEDULE_TOLERANCE_S = 0.02
+
 
 class WaitingForObjectToCenterUnderMainCamera(BaseState):
+    # Rather than polling until the object happens to be near the center at
+    # a step, the conveyor stop is scheduled on a timer for the time the
+    # object's trajectory crosses the center. Polling is the fallback while
+    # there's no prediction, e.g. before the tracker has learned px per cm,
+    # and the only path unless predicted_center_stop is enabled.
     def __init__(
         self,
         global_config: GlobalConfig,
@@ -23,8 +35,17 @@ class WaitingForObjectToCenterUnderMainCamera(BaseState):
 
         self.timeout_start_ts: Optional[float] = None
 
+        # the timer and the step both set the conveyor speed
+        self.conveyor_lock = threading.Lock()
+        self.center_stop_timer: Optional[threading.Timer] = None
+        self.scheduled_stop_time: Optional[float] = None
+        self.stopped_at_center = threading.Event()
+
     def step(self) -> Optional[SortingState]:
-        self._setMainConveyorToDefaultSpeed()
+        with self.conveyor_lock:
+            if self.stopped_at_center.is_set():
+                return SortingState.CLASSIFYING
+            self._setMainConveyorToDefaultSpeed()
 
         current_time = time.time()
 
@@ -40,11 +61,81 @@ class WaitingForObjectToCenterUnderMainCamera(BaseState):
             )
             return SortingState.GETTING_NEW_OBJECT_FROM_FEEDER
 
+        if self.global_config["predicted_center_stop_enabled"]:
+            self._scheduleCenterStop(current_time)
+
         next_state = self._determineNextStateFromFrameAnalysis()
+        if (
+            next_state == SortingState.CLASSIFYING
+            and self.center_stop_timer is not None
+        ):
+            # the timer stops the belt with the object on center
+            return None
         return next_state
 
     def cleanup(self) -> None:
+        self._cancelCenterStop()
+        self.stopped_at_center.clear()
         self.timeout_start_ts = None
         self.logger.info(
             "CLEANUP: Cleared WAITING_FOR_OBJECT_TO_CENTER_UNDER_MAIN_CAMERA state"
         )
+
+    def _scheduleCenterStop(self, current_time: float) -> None:
+        crossing = self.vision_system.predictNextCenterCrossing()
+        if crossing is None:
+            return
+
+        track_id, crossing_time = crossing
+        stop_time = (
+            crossing_time - self.global_config["main_conveyor_stop_lead_ms"] / 1000.0
+        )
+        if stop_time - current_time > CENTER_STOP_SCHEDULE_HORIZON_S:
+            return
+        if (
+            self.scheduled_stop_time is not None
+            and abs(stop_time - self.scheduled_stop_time)
+            <= CENTER_STOP_RESCHEDULE_TOLERANCE_S
+        ):
+            return
+
+        self._cancelCenterStop()
+        delay = max(0.0, stop_time - current_time)
+        self.logger.info(
+            f"CENTER: Track {track_id} crosses center in {crossing_time - current_time:.3f}s, stopping conveyor in {delay:.3f}s"
+        )
+        self.scheduled_stop_time = stop_time
+        self.center_stop_timer = threading.Timer(
+            delay, self._stopAtCenter, args=(track_id, stop_time)
+        )
+        self.center_stop_timer.daemon = True
+        self.center_stop_timer.start()
+
+    def _cancelCenterStop(self) -> None:
+        with self.conveyor_lock:
+            if self.center_stop_timer is not None:
+                self.center_stop_timer.cancel()
+            self.center_stop_timer = None
+            self.scheduled_stop_time = None
+
+    def _stopAtCenter(self, track_id: str, stop_time: float) -> None:
+        with self.conveyor_lock:
+            # a timer that was cancelled while already firing
+            if self.scheduled_stop_time != stop_time:
+                return
+            # a pipelined classification is made with the belt still running
+            if not (
+                self.global_config["disable_main_conveyor"]
+                or self.global_config["pipelined_classification_enabled"]
+            ):
+                self.irl_interface["main_conveyor_dc_motor"].setSpeed(0)
+            self.stopped_at_center.set()
+        self.logger.info("CENTER: Object reached the center at predicted crossing")
+        # wakes the state machine rather than leaving it to its next step
+        self.vision_system.events.publish(
+            VisionEvent(
+                type=VisionEventType.OBJECT_CENTERED,
+                timestamp=time.time(),
+                track_id=track_id,
+            )
+        )
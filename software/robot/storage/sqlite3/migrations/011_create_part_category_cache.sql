@@ -0,0 +1,10 @@
+-- BrickLink categories of items that aren't in the local catalog, so each is
+-- only looked up once. category_id is NULL when BrickLink has no category for
+-- the item, fetched_at is when it was looked up, for expiry.
+CREATE TABLE part_category_cache (
+    item_id TEXT PRIMARY KEY,
+    category_id TEXT,
+    fetched_at INTEGER,
+    created_at INTEGER,
+    updated_at INTEGER
+);
@@ -2,7 +2,7 @@ import sqlite3
 import json
 import time
 import uuid
-from typing import Optional, Any, Dict
+from typing import Optional, Any, Dict, Tuple
 from robot.global_config import GlobalConfig
 from robot.storage.sqlite3.migrations import getDatabaseConnection
 
@@ -85,3 +85,69 @@ def getMostRecentBinState(global_config: GlobalConfig) -> Optional[Dict[str, Any
             "deleted_at": result[4],
         }
     return None
+
+
+def getItemCategoryIndex(global_config: GlobalConfig) -> Dict[str, str]:
+    # BrickLink category of every catalogued piece kind, by its primary id and
+    # each of its alternate ids
+    conn = getDatabaseConnection(global_config)
+    cursor = conn.cursor()
+
+    cursor.execute("""
+        SELECT pk.primary_id, pk.bricklink_category_id, alt.alternate_id
+        FROM piece_kinds pk
+        LEFT JOIN piece_kind_alternate_ids alt ON alt.kind_primary_id = pk.primary_id
+        WHERE pk.failed_reason IS NULL AND pk.bricklink_category_id IS NOT NULL
+        """)
+
+    item_id_to_category_id: Dict[str, str] = {}
+    for primary_id, category_id, alternate_id in cursor.fetchall():
+        item_id_to_category_id[primary_id] = category_id
+        if alternate_id and alternate_id.strip():
+            item_id_to_category_id[alternate_id.strip()] = category_id
+
+    conn.close()
+    return item_id_to_category_id
+
+
+def getCachedPartCategory(
+    global_config: GlobalConfig, item_id: str
+) -> Optional[Tuple[Optional[str], int]]:
+    # the cached category, None for a negative entry, and when it was fetched
+    conn = getDatabaseConnection(global_config)
+    cursor = conn.cursor()
+
+    cursor.execute(
+        "SELECT category_id, fetched_at FROM part_category_cache WHERE item_id = ?",
+        (item_id,),
+    )
+
+    result = cursor.fetchone()
+    conn.close()
+
+    if result:
+        return result[0], result[1]
+    return None
+
+
+def savePartCategoryToCache(
+    global_config: GlobalConfig, item_id: str, category_id: Optional[str]
+) -> None:
+    conn = getDatabaseConnection(global_config)
+    cursor = conn.cursor()
+
+    current_time = int(time.time() * 1000)
+    cursor.execute(
+        """
+        INSERT INTO part_category_cache (item_id, category_id, fetched_at, created_at, updated_at)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(item_id) DO UPDATE SET
+            category_id = excluded.category_id,
+            fetched_at = excluded.fetched_at,
+            updated_at = excluded.updated_at
+        """,
+        (item_id, category_id, current_time, current_time, current_time),
+    )
+
+    conn.commit()
+    conn.close()
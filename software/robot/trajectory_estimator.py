@@ -0,0 +1,103 @@
+import threading
+from collections import deque
+from typing import Deque, Dict, Optional
+import numpy as np
+from robot.our_types.vision_system import FrameAnalysis
+from robot.frame_analysis import OBJECT_CLASS_ID, indicesForClass
+
+TRAJECTORY_HISTORY_SIZE = 8
+TRAJECTORY_STALE_S = 1.0
+# how many centroid samples the belt speed counts as when fused with them
+TRAJECTORY_BELT_PRIOR_SAMPLES = 3
+MIN_TRAJECTORY_SPEED_PX_PER_S = 1.0
+
+
+class TrackTrajectory:
+    __slots__ = ("capture_times", "center_xs", "last_seen")
+
+    def __init__(self, history_size: int):
+        self.capture_times: Deque[float] = deque(maxlen=history_size)
+        self.center_xs: Deque[float] = deque(maxlen=history_size)
+        self.last_seen = 0.0
+
+
+class TrajectoryEstimator:
+    # Mask centroid x of each main camera track over capture time. The
+    # centroid velocity is fused with the belt velocity from the encoder, the
+    # belt acting as a prior worth a few centroid samples, so a new track is
+    # predicted from the belt and a track that slips or rolls from its own
+    # motion. Positions are smoothed by fitting the samples to that velocity.
+    def __init__(self, history_size: int = TRAJECTORY_HISTORY_SIZE):
+        self.history_size = history_size
+        self.lock = threading.Lock()
+        self.trajectories: Dict[str, TrackTrajectory] = {}
+
+    def update(self, analysis: FrameAnalysis) -> None:
+        timestamp = analysis.capture_timestamp
+        with self.lock:
+            for i in indicesForClass(analysis, OBJECT_CLASS_ID):
+                track_id = analysis.track_ids[i]
+                obj_bbox = analysis.mask_bboxes[i]
+                if track_id is None or obj_bbox is None:
+                    continue
+
+                trajectory = self.trajectories.get(track_id)
+                if trajectory is None:
+                    trajectory = TrackTrajectory(self.history_size)
+                    self.trajectories[track_id] = trajectory
+                elif trajectory.capture_times[-1] >= timestamp:
+                    # the same capture again, when inference was skipped
+                    continue
+                trajectory.capture_times.append(timestamp)
+                trajectory.center_xs.append((obj_bbox[0] + obj_bbox[2]) / 2)
+                trajectory.last_seen = timestamp
+
+            self.trajectories = {
+                track_id: trajectory
+                for track_id, trajectory in self.trajectories.items()
+                if timestamp - trajectory.last_seen <= TRAJECTORY_STALE_S
+            }
+
+    def predictCrossingTime(
+        self, track_id: str, target_x: float, belt_px_per_s: Optional[float]
+    ) -> Optional[float]:
+        # capture-clock time at which the track's centroid reaches target_x,
+        # in the past when it already has, None when it isn't moving
+        with self.lock:
+            trajectory = self.trajectories.get(track_id)
+            if trajectory is None:
+                return None
+            capture_times = np.array(trajectory.capture_times)
+            center_xs = np.array(trajectory.center_xs)
+
+        velocity = self._fusedVelocity(capture_times, center_xs, belt_px_per_s)
+        if velocity is None or abs(velocity) < MIN_TRAJECTORY_SPEED_PX_PER_S:
+            return None
+
+        # the line through the samples' mean with the fused slope, at the
+        # newest sample
+        last_time = capture_times[-1]
+        center_x = center_xs.mean() + velocity * (last_time - capture_times.mean())
+        return float(last_time + (target_x - center_x) / velocity)
+
+    def _fusedVelocity(
+        self,
+        capture_times: np.ndarray,
+        center_xs: np.ndarray,
+        belt_px_per_s: Optional[float],
+    ) -> Optional[float]:
+        observed = None
+        num_intervals = len(capture_times) - 1
+        if num_intervals > 0 and np.ptp(capture_times) > 0:
+            # relative to the mean time, epoch seconds are too large to fit
+            observed = float(
+                np.polyfit(capture_times - capture_times.mean(), center_xs, 1)[0]
+            )
+
+        if belt_px_per_s is None:
+            return observed
+        if observed is None:
+            return belt_px_per_s
+        return (
+            TRAJECTORY_BELT_PRIOR_SAMPLES * belt_px_per_s + num_intervals * observed
+        ) / (TRAJECTORY_BELT_PRIOR_SAMPLES + num_intervals)
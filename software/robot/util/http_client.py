@@ -0,0 +1,113 @@
+import random
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+import requests
+from requests.adapters import HTTPAdapter
+from robot.metrics import MetricsRegistry, defaultMetricsRegistry
+
+HTTP_POOL_SIZE = 8
+HTTP_CONNECT_TIMEOUT_S = 3.05
+HTTP_READ_TIMEOUT_S = 10.0
+HTTP_MAX_ATTEMPTS = 3
+HTTP_RETRY_BACKOFF_S = 0.25
+HTTP_RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class HttpClient:
+    # A keep-alive session for one external service, shared by every thread
+    # that calls it so connections are reused instead of paying TCP and TLS
+    # setup per request. Each call is bounded by a deadline across all its
+    # attempts; connection errors, timeouts and retryable statuses are retried
+    # with exponential backoff and full jitter.
+    def __init__(
+        self,
+        name: str,
+        metrics: Optional[MetricsRegistry] = None,
+        pool_size: int = HTTP_POOL_SIZE,
+        max_attempts: int = HTTP_MAX_ATTEMPTS,
+    ):
+        self.name = name
+        self.metrics = metrics or defaultMetricsRegistry()
+        self.max_attempts = max_attempts
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        deadline_s: Optional[float] = None,
+        timeout: Tuple[float, float] = (HTTP_CONNECT_TIMEOUT_S, HTTP_READ_TIMEOUT_S),
+        **kwargs: Any,
+    ) -> requests.Response:
+        # raises the last error, or returns the last response when every
+        # attempt got a retryable status
+        start_time = time.time()
+        deadline = start_time + (deadline_s if deadline_s is not None else sum(timeout))
+        prefix = f"http.{self.name}"
+
+        attempt = 0
+        while True:
+            attempt += 1
+            remaining = deadline - time.time()
+            attempt_timeout = (
+                min(timeout[0], remaining),
+                min(timeout[1], remaining),
+            )
+            attempt_start = time.time()
+            try:
+                response = self.session.request(
+                    method, url, timeout=attempt_timeout, **kwargs
+                )
+                error: Optional[Exception] = None
+            except (requests.ConnectionError, requests.Timeout) as e:
+                response = None
+                error = e
+            self.metrics.histogram(f"{prefix}.attempt_s").record(
+                time.time() - attempt_start
+            )
+
+            retryable = error is not None or (
+                response is not None and response.status_code in HTTP_RETRY_STATUSES
+            )
+            backoff = random.uniform(0, HTTP_RETRY_BACKOFF_S * 2 ** (attempt - 1))
+            if (
+                not retryable
+                or attempt >= self.max_attempts
+                or time.time() + backoff >= deadline
+            ):
+                break
+
+            self.metrics.timeSeries(f"{prefix}.retries").add(1)
+            time.sleep(backoff)
+
+        self.metrics.histogram(f"{prefix}.request_s").record(time.time() - start_time)
+        if error is not None:
+            self.metrics.timeSeries(f"{prefix}.errors").add(1)
+            raise error
+        assert response is not None
+        return response
+
+
+_clients: Dict[str, HttpClient] = {}
+_clients_lock = threading.Lock()
+
+
+def getHttpClient(name: str) -> HttpClient:
+    # one shared client per service, created on first use
+    with _clients_lock:
+        client = _clients.get(name)
+        if client is None:
+            client = HttpClient(name)
+            _clients[name] = client
+        return client
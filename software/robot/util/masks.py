@@ -0,0 +1,124 @@
+import cv2
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+
+def buildDistanceMap(mask: np.ndarray) -> Optional[np.ndarray]:
+    if not mask.any():
+        return None
+
+    # distanceTransform measures the distance to the nearest zero pixel, so the
+    # mask pixels are the zeros
+    inverted = np.logical_not(mask).astype(np.uint8)
+    return cv2.distanceTransform(inverted, cv2.DIST_L2, cv2.DIST_MASK_PRECISE)
+
+
+def minDistanceFromBoundingBox(
+    bbox: Tuple[int, int, int, int], distance_map: np.ndarray
+) -> float:
+    height, width = distance_map.shape
+    x1, y1, x2, y2 = bbox
+    x1 = max(0, min(int(x1), width - 1))
+    y1 = max(0, min(int(y1), height - 1))
+    x2 = max(x1, min(int(x2), width - 1))
+    y2 = max(y1, min(int(y2), height - 1))
+
+    # the closest point of the box to any mask pixel is itself a pixel of the box
+    return float(distance_map[y1 : y2 + 1, x1 : x2 + 1].min())
+
+
+def buildRegionLabelRaster(
+    masks_by_class: Dict[str, List[np.ndarray]], region_names: List[str]
+) -> Optional[np.ndarray]:
+    # one uint8 per pixel with bit k set where region_names[k] is present, so
+    # overlapping regions don't hide each other
+    raster: Optional[np.ndarray] = None
+    for bit, name in enumerate(region_names):
+        for mask in masks_by_class.get(name, []):
+            if raster is None:
+                raster = np.zeros(mask.shape, dtype=np.uint8)
+            np.bitwise_or(raster, np.uint8(1 << bit), out=raster, where=mask)
+    return raster
+
+
+def regionProximities(
+    object_mask: np.ndarray,
+    object_bbox: Tuple[int, int, int, int],
+    label_raster: np.ndarray,
+    num_regions: int,
+    proximity_px: int,
+) -> np.ndarray:
+    # fraction of the object mask dilated by proximity_px that lands on each
+    # region. only the bbox grown by proximity_px can be reached by the
+    # dilation, so everything happens inside that window
+    height, width = label_raster.shape
+    x1, y1, x2, y2 = object_bbox
+    x1 = max(0, int(x1) - proximity_px)
+    y1 = max(0, int(y1) - proximity_px)
+    x2 = min(width - 1, int(x2) + proximity_px)
+    y2 = min(height - 1, int(y2) + proximity_px)
+
+    proximities = np.zeros(num_regions, dtype=np.float64)
+    if x2 < x1 or y2 < y1:
+        return proximities
+
+    kernel = np.ones((proximity_px * 2 + 1, proximity_px * 2 + 1), np.uint8)
+    window = object_mask[y1 : y2 + 1, x1 : x2 + 1].astype(np.uint8)
+    dilated = cv2.dilate(window, kernel, iterations=1).astype(bool)
+
+    total_dilated_pixels = np.count_nonzero(dilated)
+    if total_dilated_pixels == 0:
+        return proximities
+
+    labels = label_raster[y1 : y2 + 1, x1 : x2 + 1][dilated]
+    counts = np.bincount(labels, minlength=1 << num_regions)
+    bins = np.arange(len(counts))
+    for bit in range(num_regions):
+        proximities[bit] = counts[(bins >> bit) & 1 == 1].sum()
+
+    return proximities / total_dilated_pixels
+
+
+def letterboxTransform(
+    source_shape: Tuple[int, int], letterboxed_shape: Tuple[int, int]
+) -> Tuple[float, int, int]:
+    # gain and padding the model used to fit source_shape into letterboxed_shape:
+    # letterboxed = source * gain + pad
+    source_height, source_width = source_shape
+    letterboxed_height, letterboxed_width = letterboxed_shape
+    gain = min(letterboxed_height / source_height, letterboxed_width / source_width)
+    pad_x = int(round((letterboxed_width - source_width * gain) / 2 - 0.1))
+    pad_y = int(round((letterboxed_height - source_height * gain) / 2 - 0.1))
+    return gain, pad_x, pad_y
+
+
+def maskBoxToFrame(
+    bbox: Tuple[int, int, int, int],
+    mask_shape: Tuple[int, int],
+    frame_shape: Tuple[int, int],
+) -> Tuple[int, int, int, int]:
+    gain, pad_x, pad_y = letterboxTransform(frame_shape, mask_shape)
+    frame_height, frame_width = frame_shape
+    x1, y1, x2, y2 = bbox
+    return (
+        max(0, int((x1 - pad_x) / gain)),
+        max(0, int((y1 - pad_y) / gain)),
+        min(frame_width - 1, int((x2 + 1 - pad_x) / gain)),
+        min(frame_height - 1, int((y2 + 1 - pad_y) / gain)),
+    )
+
+
+def scaleMaskToFrame(mask: np.ndarray, frame_shape: Tuple[int, int]) -> np.ndarray:
+    # masks come out of the model letterboxed to its input size, strip the
+    # padding before resizing back to the frame
+    mask_height, mask_width = mask.shape
+    frame_height, frame_width = frame_shape
+    _, pad_x, pad_y = letterboxTransform(frame_shape, (mask_height, mask_width))
+
+    cropped = mask[pad_y : mask_height - pad_y, pad_x : mask_width - pad_x]
+    scaled = cv2.resize(
+        cropped.astype(np.uint8),
+        (frame_width, frame_height),
+        interpolation=cv2.INTER_NEAREST,
+    )
+    return scaled.astype(bool)
@@ -0,0 +1,264 @@
+import os
+import csv
+import queue
+import threading
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Deque, List, Optional, TextIO, Tuple
+import cv2
+import numpy as np
+from robot.global_config import GlobalConfig
+from robot.our_types.camera import ClipRequest
+
+RECORDER_QUEUE_POLL_INTERVAL_S = 0.2
+RECORDER_SHUTDOWN_TIMEOUT_S = 10.0
+# container frame rate, the real capture times are in the timestamp sidecar
+RECORDER_NOMINAL_FPS = 10.0
+CLIP_JPEG_QUALITY = 85
+
+
+class VideoFile:
+    # An MJPG file plus a csv sidecar with the capture timestamp of each frame
+    def __init__(self, path_stem: str, frame_size: Tuple[int, int]):
+        self.frame_size = frame_size
+        self.frame_count = 0
+
+        fourcc = cv2.VideoWriter_fourcc("M", "J", "P", "G")
+        self.writer = cv2.VideoWriter(
+            f"{path_stem}.avi", fourcc, RECORDER_NOMINAL_FPS, frame_size
+        )
+        self.timestamps_file: TextIO = open(f"{path_stem}.csv", "w", newline="")
+        self.timestamps_csv = csv.writer(self.timestamps_file)
+        self.timestamps_csv.writerow(["frame", "capture_timestamp"])
+
+    def write(self, frame: np.ndarray, capture_time: float) -> None:
+        self.writer.write(frame)
+        self.timestamps_csv.writerow([self.frame_count, f"{capture_time:.6f}"])
+        self.frame_count += 1
+
+    def close(self) -> None:
+        self.writer.release()
+        self.timestamps_file.close()
+
+
+class BackgroundRecorder(ABC):
+    # Takes frames from the vision loop through a bounded queue and hands them
+    # to _handleFrame on a writer thread. When the writer falls behind, new
+    # frames are dropped and counted rather than making the caller wait. A
+    # frame that fails to write is counted and skipped, the next may succeed.
+    def __init__(
+        self,
+        global_config: GlobalConfig,
+        stream_name: str,
+        output_dir: str,
+        queue_size: int,
+    ):
+        self.logger = global_config["logger"].ctx(
+            system="video_recorder", stream=stream_name
+        )
+        self.stream_name = stream_name
+        self.output_dir = output_dir
+
+        self.frames: "queue.Queue[Tuple[np.ndarray, float]]" = queue.Queue(
+            maxsize=queue_size
+        )
+        self.running = False
+        self.thread: Optional[threading.Thread] = None
+
+        self.frames_written = 0
+        self.dropped_frames = 0
+        self.failed_frames = 0
+        self.last_error: Optional[str] = None
+
+    def start(self) -> None:
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.running = True
+        self.thread = threading.Thread(
+            target=self._writeLoop, name=f"recorder_{self.stream_name}", daemon=True
+        )
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.running = False
+        if self.thread:
+            self.thread.join(RECORDER_SHUTDOWN_TIMEOUT_S)
+            self.thread = None
+        self.logger.info(
+            f"Recorded {self.frames_written} frames, dropped {self.dropped_frames}, "
+            f"failed to write {self.failed_frames}"
+        )
+
+    def write(self, frame: np.ndarray, capture_time: float) -> bool:
+        if not self.running:
+            return False
+        if self.frames.full():
+            self.dropped_frames += 1
+            return False
+
+        # callers reuse their frame buffers, so the queue holds its own copy
+        try:
+            self.frames.put_nowait((frame.copy(), capture_time))
+        except queue.Full:
+            self.dropped_frames += 1
+            return False
+        return True
+
+    def _writeLoop(self) -> None:
+        try:
+            # keep draining after stop so queued frames still reach the file
+            while self.running or not self.frames.empty():
+                try:
+                    frame, capture_time = self.frames.get(
+                        timeout=RECORDER_QUEUE_POLL_INTERVAL_S
+                    )
+                except queue.Empty:
+                    continue
+
+                try:
+                    self._handleFrame(frame, capture_time)
+                except Exception as e:
+                    self.failed_frames += 1
+                    # a full disk fails every frame, log each new error once
+                    if str(e) != self.last_error:
+                        self.last_error = str(e)
+                        self.logger.error(
+                            f"Error writing {self.stream_name} recording: {e}"
+                        )
+        finally:
+            try:
+                self._finish()
+            except Exception as e:
+                self.logger.error(f"Error closing {self.stream_name} recording: {e}")
+
+    @abstractmethod
+    def _handleFrame(self, frame: np.ndarray, capture_time: float) -> None:
+        pass
+
+    def _finish(self) -> None:
+        pass
+
+
+class VideoRecorder(BackgroundRecorder):
+    # Continuous recording of one stream into time-segmented files
+    def __init__(self, global_config: GlobalConfig, stream_name: str, output_dir: str):
+        super().__init__(
+            global_config,
+            stream_name,
+            output_dir,
+            global_config["recording_queue_size"],
+        )
+        self.segment_duration_s = global_config["recording_segment_s"]
+        self.segment_index = 0
+        self.segment_start_time = 0.0
+        self.segment: Optional[VideoFile] = None
+
+    def _handleFrame(self, frame: np.ndarray, capture_time: float) -> None:
+        frame_size = (frame.shape[1], frame.shape[0])
+        if (
+            self.segment is None
+            or capture_time - self.segment_start_time >= self.segment_duration_s
+            or self.segment.frame_size != frame_size
+        ):
+            self._finish()
+            self.segment_index += 1
+            self.segment_start_time = capture_time
+            self.segment = VideoFile(
+                os.path.join(
+                    self.output_dir, f"{self.stream_name}_{self.segment_index:04d}"
+                ),
+                frame_size,
+            )
+
+        self.segment.write(frame, capture_time)
+        self.frames_written += 1
+
+    def _finish(self) -> None:
+        if self.segment is not None:
+            self.segment.close()
+            self.segment = None
+
+
+class ClipRecorder(BackgroundRecorder):
+    # Keeps the last few seconds of one stream in memory as JPEGs and only
+    # touches the disk for clip requests. A clip is written once a frame past
+    # its end time arrives, from whatever part of it is still in the ring.
+    def __init__(self, global_config: GlobalConfig, stream_name: str, output_dir: str):
+        super().__init__(
+            global_config,
+            stream_name,
+            output_dir,
+            global_config["clip_recording_queue_size"],
+        )
+        self.ring_duration_s = (
+            global_config["clip_pre_roll_s"] + global_config["clip_post_roll_s"]
+        )
+        self.ring: Deque[Tuple[bytes, float]] = deque()
+        self.pending_clips: List[ClipRequest] = []
+        self.clips_lock = threading.Lock()
+        self.clips_written = 0
+
+    def requestClip(self, clip: ClipRequest) -> None:
+        with self.clips_lock:
+            self.pending_clips.append(clip)
+
+    def _handleFrame(self, frame: np.ndarray, capture_time: float) -> None:
+        ok, buffer = cv2.imencode(
+            ".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, CLIP_JPEG_QUALITY]
+        )
+        if ok:
+            self.ring.append((buffer.tobytes(), capture_time))
+        while self.ring and self.ring[0][1] < capture_time - self.ring_duration_s:
+            self.ring.popleft()
+
+        with self.clips_lock:
+            finished = [c for c in self.pending_clips if capture_time >= c.end_time]
+            self.pending_clips = [
+                c for c in self.pending_clips if capture_time < c.end_time
+            ]
+        for clip in finished:
+            self._writeClip(clip)
+
+    def _finish(self) -> None:
+        # save what there is of clips that were still waiting for post-roll
+        with self.clips_lock:
+            unfinished = self.pending_clips
+            self.pending_clips = []
+        for clip in unfinished:
+            self._writeClip(clip)
+
+    def _writeClip(self, clip: ClipRequest) -> None:
+        frames = [
+            (jpeg, capture_time)
+            for jpeg, capture_time in self.ring
+            if clip.start_time <= capture_time <= clip.end_time
+        ]
+        if not frames:
+            return
+
+        clip_dir = os.path.join(self.output_dir, clipName(clip))
+        os.makedirs(clip_dir, exist_ok=True)
+        video: Optional[VideoFile] = None
+        try:
+            for jpeg, capture_time in frames:
+                frame = cv2.imdecode(
+                    np.frombuffer(jpeg, dtype=np.uint8), cv2.IMREAD_COLOR
+                )
+                if frame is None:
+                    continue
+                if video is None:
+                    video = VideoFile(
+                        os.path.join(clip_dir, self.stream_name),
+                        (frame.shape[1], frame.shape[0]),
+                    )
+                video.write(frame, capture_time)
+                self.frames_written += 1
+        finally:
+            if video is not None:
+                video.close()
+
+        self.clips_written += 1
+        self.logger.info(f"Saved {len(frames)} frame clip to {clip_dir}")
+
+
+def clipName(clip: ClipRequest) -> str:
+    return f"{int(clip.trigger_time * 1000)}_{clip.event}_{clip.tag or 'untagged'}"
@@ -0,0 +1,57 @@
+import threading
+from collections import deque
+from typing import Deque, List, Optional
+from robot.our_types.vision_system import VisionEvent
+
+VISION_EVENT_QUEUE_SIZE = 64
+
+
+class VisionEventSubscription:
+    # Events published since the subscriber last waited. The queue is
+    # bounded, a subscriber that stops waiting loses the oldest events
+    # rather than growing it.
+    def __init__(self, queue_size: int):
+        self.condition = threading.Condition()
+        self.events: Deque[VisionEvent] = deque(maxlen=queue_size)
+
+    def wait(self, timeout: Optional[float]) -> List[VisionEvent]:
+        # blocks until there's an event or the timeout passes, then takes
+        # everything queued
+        with self.condition:
+            if not self.events:
+                self.condition.wait(timeout)
+            events = list(self.events)
+            self.events.clear()
+        return events
+
+    def _push(self, event: VisionEvent) -> None:
+        with self.condition:
+            self.events.append(event)
+            self.condition.notify_all()
+
+
+class VisionEventBus:
+    # Fans out events from the vision threads to whoever is blocked waiting
+    # on them, so consumers react as soon as a frame shows a change instead
+    # of polling the latest results on a fixed period.
+    def __init__(self, queue_size: int = VISION_EVENT_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self.lock = threading.Lock()
+        self.subscriptions: List[VisionEventSubscription] = []
+
+    def subscribe(self) -> VisionEventSubscription:
+        subscription = VisionEventSubscription(self.queue_size)
+        with self.lock:
+            self.subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: VisionEventSubscription) -> None:
+        with self.lock:
+            if subscription in self.subscriptions:
+                self.subscriptions.remove(subscription)
+
+    def publish(self, event: VisionEvent) -> None:
+        with self.lock:
+            subscriptions = list(self.subscriptions)
+        for subscription in subscriptions:
+            subscription._push(event)
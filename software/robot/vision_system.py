@@ -1,33 +1,53 @@
 import time
 import threading
+import dataclasses
 import numpy as np
 import cv2
 import os
-from typing import Optional, Dict, List, Tuple, Any
-from ultralytics import YOLO
-import logging
-
-logging.getLogger("ultralytics").setLevel(logging.WARNING)
+from collections import deque
+from typing import Optional, Deque, Dict, List, Tuple, Any, Callable
 from robot.global_config import GlobalConfig
 from robot.irl.config import IRLSystemInterface
 from robot.our_types import CameraType
+from robot.our_types.camera import ClipRequest
+from robot.frame_history import FrameHistory
+from robot.inference_worker import SegmentationInference, buildInference
+from robot.frame_change_gate import FrameChangeGate
+from robot.frame_trace import FrameTrace, recordFrameTrace, stageLatencySummary
+from robot.object_detection_store import ObjectDetectionStore
+from robot.trajectory_estimator import TrajectoryEstimator
+from robot.vision_events import VisionEventBus
+from robot.video_recorder import BackgroundRecorder, VideoRecorder, ClipRecorder
+from robot.frame_analysis import (
+    OBJECT_CLASS_ID,
+    REGION_CLASS_IDS,
+    className,
+    renderFrameAnalysis,
+    remapAnalysisFromCrop,
+    masksByClass,
+    indicesForClass,
+    indexForTrackId,
+)
 from robot.our_types.vision_system import (
     MainCameraState,
     CameraPerformanceMetrics,
     FeederRegion,
-    RegionReading,
-    ObjectDetection,
+    FrameAnalysis,
+    SceneRegions,
+    MaskTrack,
+    VisionEvent,
+    VisionEventType,
+)
+from robot.our_types.observation import BoundingBox
+from robot.util.masks import (
+    buildDistanceMap,
+    buildRegionLabelRaster,
+    maskBoxToFrame,
+    minDistanceFromBoundingBox,
+    regionProximities,
 )
 from robot.websocket_manager import WebSocketManager
-
-# YOLO model class definitions
-YOLO_CLASSES = {
-    0: "object",
-    1: "first_feeder",
-    2: "second_feeder",
-    3: "main_conveyor",
-    4: "feeder_conveyor",
-}
+from robot.encoder_manager import EncoderManager
 
 # Vision analysis constants
 SECOND_FEEDER_DISTANCE_THRESHOLD = 40
@@ -39,6 +59,397 @@ FIRST_FEEDER_PROXIMITY_THRESHOLD = 0.5
 OBJECT_CENTER_THRESHOLD = 0.4
 RIGHT_SIDE_THRESHOLD = 0.3
 MARGIN_FOR_MAIN_CONVEYOR_BOUNDING_BOX_PX = -20
+MASK_EDGE_PROXIMITY_PX = 12
+OBJECT_DETECTION_RETENTION_S = 5.0
+
+REGION_NAMES = [className(class_id) for class_id in REGION_CLASS_IDS]
+
+# cropping to the conveyor band isn't worth it when the band is most of the frame
+MAIN_CAMERA_ROI_MAX_FRAME_FRACTION = 0.9
+
+# Mask tracker association, distances are in mask pixels
+TRACK_IOU_THRESHOLD = 0.2
+TRACK_CENTROID_GATE_PX = 40
+TRACK_MAX_MISSES = 5
+TRACK_MAX_AGE_S = 1.0
+TRACK_VELOCITY_SMOOTHING = 0.5
+PX_PER_CM_SMOOTHING = 0.1
+MIN_BELT_SPEED_FOR_PRIOR_CM_PER_S = 0.5
+PENDING_VELOCITY_SAMPLES_SIZE = 256
+
+# how long a vision loop waits for a fresh frame before re-checking running
+FRAME_WAIT_TIMEOUT_S = 0.5
+
+
+class StaticSceneCache:
+    # The feeders and conveyors don't move, so their masks are learned by
+    # voting over a warm-up window of full segmentations. Once learned, only
+    # objects need to be segmented per frame. A full segmentation is still run
+    # every refresh interval to check the learned masks haven't drifted.
+    def __init__(
+        self,
+        global_config: GlobalConfig,
+        camera_name: str,
+        build_regions: Callable[[Dict[str, List[np.ndarray]]], SceneRegions],
+    ):
+        self.logger = global_config["logger"].ctx(
+            system="static_scene_cache", camera=camera_name
+        )
+        self.build_regions = build_regions
+        self.warmup_frames = global_config["static_scene_warmup_frames"]
+        self.refresh_interval_ms = global_config["static_scene_refresh_interval_ms"]
+        self.drift_iou_threshold = global_config["static_scene_drift_iou_threshold"]
+
+        self.votes: Optional[np.ndarray] = None  # (len(REGION_CLASS_IDS), H, W)
+        self.warmup_count = 0
+        self.region_masks: Dict[int, np.ndarray] = {}
+        self.regions: Optional[SceneRegions] = None
+        self.last_refresh_time = 0.0
+
+    def needsFullFrame(self, current_time: float) -> bool:
+        if self.regions is None:
+            return True
+        elapsed_ms = (current_time - self.last_refresh_time) * 1000
+        return elapsed_ms >= self.refresh_interval_ms
+
+    def update(self, analysis: FrameAnalysis) -> None:
+        # the mask resolution is unknown until the model segments something
+        if len(analysis.class_ids) == 0:
+            return
+
+        class_masks: Dict[int, np.ndarray] = {}
+        for class_id in REGION_CLASS_IDS:
+            indices = indicesForClass(analysis, class_id)
+            if indices:
+                class_masks[class_id] = np.any(analysis.masks[indices], axis=0)
+
+        if self.regions is None:
+            self._accumulate(class_masks, analysis.masks.shape[1:3], analysis.timestamp)
+        else:
+            self._checkDrift(class_masks, analysis.timestamp)
+
+    def _accumulate(
+        self,
+        class_masks: Dict[int, np.ndarray],
+        mask_shape: Tuple[int, int],
+        timestamp: float,
+    ) -> None:
+        if self.votes is None or self.votes.shape[1:] != mask_shape:
+            self.votes = np.zeros((len(REGION_CLASS_IDS), *mask_shape), np.uint16)
+            self.warmup_count = 0
+
+        for k, class_id in enumerate(REGION_CLASS_IDS):
+            if class_id in class_masks:
+                self.votes[k] += class_masks[class_id]
+        self.warmup_count += 1
+
+        if self.warmup_count < self.warmup_frames:
+            return
+
+        # a pixel belongs to a region if it was segmented in most warm-up frames
+        learned = self.votes * 2 > self.warmup_count
+        self.region_masks = {
+            class_id: learned[k]
+            for k, class_id in enumerate(REGION_CLASS_IDS)
+            if learned[k].any()
+        }
+        self.regions = self.build_regions(
+            {
+                className(class_id): [mask]
+                for class_id, mask in self.region_masks.items()
+            }
+        )
+        self.votes = None
+        self.warmup_count = 0
+        self.last_refresh_time = timestamp
+
+        self.logger.info(
+            f"Learned static scene regions: {[className(c) for c in self.region_masks]}"
+        )
+
+    def _checkDrift(self, class_masks: Dict[int, np.ndarray], timestamp: float) -> None:
+        self.last_refresh_time = timestamp
+
+        for class_id, learned_mask in self.region_masks.items():
+            current_mask = class_masks.get(class_id)
+            # a region missing from one frame is a missed detection, not a moved machine
+            if current_mask is None:
+                continue
+
+            iou = 0.0
+            if current_mask.shape == learned_mask.shape:
+                union = np.count_nonzero(current_mask | learned_mask)
+                intersection = np.count_nonzero(current_mask & learned_mask)
+                iou = intersection / union if union else 1.0
+
+            if iou < self.drift_iou_threshold:
+                self.logger.warning(
+                    f"Static scene drifted: {className(class_id)} iou={iou:.3f} < threshold={self.drift_iou_threshold}, relearning"
+                )
+                self.region_masks = {}
+                self.regions = None
+                return
+
+
+class MaskTracker:
+    # Gives objects stable track ids across frames from plain per-frame
+    # detections. Each track's position is predicted forward, from the belt
+    # speed when it is known and the track's own velocity otherwise, then
+    # detections are matched greedily by mask IoU against the predicted
+    # position, with a centroid distance fallback for masks that changed
+    # shape. Tracks survive a few missed frames before they are dropped.
+    def __init__(self, global_config: GlobalConfig, camera_name: str):
+        self.logger = global_config["logger"].ctx(
+            system="mask_tracker", camera=camera_name
+        )
+        self.tracks: Dict[str, MaskTrack] = {}
+        self.next_track_id = 1
+        self.mask_shape: Optional[Tuple[int, int]] = None
+        # signed mask px moved per cm of belt travel, learned from matched tracks
+        self.px_per_cm: Optional[float] = None
+        # capture time and x velocity of matched tracks, waiting for the
+        # encoder sample that measured the belt while they moved
+        self.pending_velocity_samples: Deque[Tuple[float, float]] = deque(
+            maxlen=PENDING_VELOCITY_SAMPLES_SIZE
+        )
+        self.last_belt_sample_time: Optional[float] = None
+
+    def update(
+        self,
+        analysis: FrameAnalysis,
+        belt_speed_cm_per_s: Optional[float] = None,
+        belt_speed_sample: Optional[Tuple[float, float]] = None,
+    ) -> FrameAnalysis:
+        # belt_speed_sample is the latest encoder (timestamp, speed), px per
+        # cm is only learned when there is one
+        # motion is measured between capture times, inference latency varies
+        timestamp = analysis.capture_timestamp
+        detections = [
+            i
+            for i in indicesForClass(analysis, OBJECT_CLASS_ID)
+            if analysis.mask_bboxes[i] is not None
+        ]
+
+        mask_shape = (analysis.masks.shape[1], analysis.masks.shape[2])
+        if detections and mask_shape != self.mask_shape:
+            self.tracks = {}
+            self.mask_shape = mask_shape
+
+        predicted = {
+            track_id: self._predictDisplacement(track, timestamp, belt_speed_cm_per_s)
+            for track_id, track in self.tracks.items()
+        }
+
+        matches: Dict[int, str] = {}
+        iou_pairs = []
+        for track_id, track in self.tracks.items():
+            dx, dy = predicted[track_id]
+            for i in detections:
+                iou = self._shiftedMaskIoU(track, analysis, i, dx, dy)
+                if iou >= TRACK_IOU_THRESHOLD:
+                    iou_pairs.append((iou, track_id, i))
+        for _, track_id, i in sorted(iou_pairs, reverse=True):
+            if i not in matches and track_id not in matches.values():
+                matches[i] = track_id
+
+        distance_pairs = []
+        for track_id, track in self.tracks.items():
+            if track_id in matches.values():
+                continue
+            dx, dy = predicted[track_id]
+            for i in detections:
+                if i in matches:
+                    continue
+                bbox = analysis.mask_bboxes[i]
+                assert bbox is not None
+                cx, cy = self._centroid(analysis.masks[i], bbox)
+                distance = float(
+                    np.hypot(cx - track.centroid[0] - dx, cy - track.centroid[1] - dy)
+                )
+                if distance <= TRACK_CENTROID_GATE_PX:
+                    distance_pairs.append((distance, track_id, i))
+        for _, track_id, i in sorted(distance_pairs):
+            if i not in matches and track_id not in matches.values():
+                matches[i] = track_id
+
+        track_ids: List[Optional[str]] = [None] * len(analysis.class_ids)
+        for i in detections:
+            if i in matches:
+                self._updateTrack(
+                    self.tracks[matches[i]], analysis, i, belt_speed_sample is not None
+                )
+                track_ids[i] = matches[i]
+            else:
+                track_ids[i] = self._startTrack(analysis, i)
+
+        matched_track_ids = set(track_ids)
+        for track_id, track in list(self.tracks.items()):
+            if track_id in matched_track_ids:
+                continue
+            track.misses += 1
+            if (
+                track.misses > TRACK_MAX_MISSES
+                or timestamp - track.last_seen > TRACK_MAX_AGE_S
+            ):
+                del self.tracks[track_id]
+
+        if belt_speed_sample is not None:
+            self._learnPxPerCm(belt_speed_sample)
+
+        return dataclasses.replace(analysis, track_ids=track_ids)
+
+    def _learnPxPerCm(self, belt_speed_sample: Tuple[float, float]) -> None:
+        # An encoder speed is the mean since the previous poll, about a second
+        # apart, so it only describes frames captured between the two polls.
+        # Dividing by a speed from before the frame would, once the belt
+        # stops, take the stopped pieces for a belt that moves them 0 px/cm.
+        sampled_at, speed_cm_per_s = belt_speed_sample
+        while (
+            self.pending_velocity_samples
+            and self.pending_velocity_samples[0][0] <= sampled_at
+        ):
+            capture_time, vx = self.pending_velocity_samples.popleft()
+            if (
+                self.last_belt_sample_time is not None
+                and capture_time <= self.last_belt_sample_time
+            ):
+                # from an interval whose sample was never seen
+                continue
+            if speed_cm_per_s < MIN_BELT_SPEED_FOR_PRIOR_CM_PER_S:
+                continue
+
+            sample = vx / speed_cm_per_s
+            if self.px_per_cm is None:
+                self.px_per_cm = sample
+            else:
+                self.px_per_cm = (
+                    PX_PER_CM_SMOOTHING * sample
+                    + (1 - PX_PER_CM_SMOOTHING) * self.px_per_cm
+                )
+        self.last_belt_sample_time = sampled_at
+
+    def predictDisplacement(
+        self,
+        track_id: Optional[str],
+        since: float,
+        until: float,
+        belt_speed_cm_per_s: Optional[float],
+    ) -> Tuple[float, float]:
+        # mask px the track is expected to move between two times
+        dt = until - since
+        track = self.tracks.get(track_id) if track_id is not None else None
+        if track is not None:
+            return self._displacementOver(track, dt, belt_speed_cm_per_s)
+        if belt_speed_cm_per_s is not None and self.px_per_cm is not None:
+            return belt_speed_cm_per_s * self.px_per_cm * dt, 0.0
+        return 0.0, 0.0
+
+    def _predictDisplacement(
+        self,
+        track: MaskTrack,
+        timestamp: float,
+        belt_speed_cm_per_s: Optional[float],
+    ) -> Tuple[float, float]:
+        return self._displacementOver(
+            track, timestamp - track.last_seen, belt_speed_cm_per_s
+        )
+
+    def _displacementOver(
+        self, track: MaskTrack, dt: float, belt_speed_cm_per_s: Optional[float]
+    ) -> Tuple[float, float]:
+        if belt_speed_cm_per_s is not None and self.px_per_cm is not None:
+            return belt_speed_cm_per_s * self.px_per_cm * dt, 0.0
+        return track.velocity[0] * dt, track.velocity[1] * dt
+
+    def _shiftedMaskIoU(
+        self, track: MaskTrack, analysis: FrameAnalysis, i: int, dx: float, dy: float
+    ) -> float:
+        # IoU of the detection with the track's mask moved by (dx, dy), only
+        # evaluated where the two bounding boxes overlap
+        detection_bbox = analysis.mask_bboxes[i]
+        assert detection_bbox is not None
+        sx, sy = int(round(dx)), int(round(dy))
+        x1 = max(detection_bbox[0], track.bbox[0] + sx)
+        y1 = max(detection_bbox[1], track.bbox[1] + sy)
+        x2 = min(detection_bbox[2], track.bbox[2] + sx)
+        y2 = min(detection_bbox[3], track.bbox[3] + sy)
+        if x1 > x2 or y1 > y2:
+            return 0.0
+
+        detection_mask = analysis.masks[i]
+        intersection = np.count_nonzero(
+            detection_mask[y1 : y2 + 1, x1 : x2 + 1]
+            & track.mask[y1 - sy : y2 - sy + 1, x1 - sx : x2 - sx + 1]
+        )
+        dx1, dy1, dx2, dy2 = detection_bbox
+        detection_area = np.count_nonzero(detection_mask[dy1 : dy2 + 1, dx1 : dx2 + 1])
+        union = detection_area + track.area - intersection
+        return intersection / union if union else 0.0
+
+    def _centroid(
+        self, mask: np.ndarray, bbox: Tuple[int, int, int, int]
+    ) -> Tuple[float, float]:
+        x1, y1, x2, y2 = bbox
+        ys, xs = np.nonzero(mask[y1 : y2 + 1, x1 : x2 + 1])
+        return float(xs.mean()) + x1, float(ys.mean()) + y1
+
+    def _startTrack(self, analysis: FrameAnalysis, i: int) -> str:
+        track_id = str(self.next_track_id)
+        self.next_track_id += 1
+
+        mask = analysis.masks[i]
+        bbox = analysis.mask_bboxes[i]
+        assert bbox is not None
+        self.tracks[track_id] = MaskTrack(
+            track_id=track_id,
+            mask=mask,
+            bbox=bbox,
+            area=int(
+                np.count_nonzero(mask[bbox[1] : bbox[3] + 1, bbox[0] : bbox[2] + 1])
+            ),
+            centroid=self._centroid(mask, bbox),
+            velocity=(0.0, 0.0),
+            last_seen=analysis.capture_timestamp,
+        )
+        return track_id
+
+    def _updateTrack(
+        self,
+        track: MaskTrack,
+        analysis: FrameAnalysis,
+        i: int,
+        learn_px_per_cm: bool,
+    ) -> None:
+        mask = analysis.masks[i]
+        bbox = analysis.mask_bboxes[i]
+        assert bbox is not None
+        centroid = self._centroid(mask, bbox)
+
+        dt = analysis.capture_timestamp - track.last_seen
+        if dt > 0:
+            vx = (centroid[0] - track.centroid[0]) / dt
+            vy = (centroid[1] - track.centroid[1]) / dt
+            if track.observations == 1:
+                track.velocity = (vx, vy)
+            else:
+                a = TRACK_VELOCITY_SMOOTHING
+                track.velocity = (
+                    a * vx + (1 - a) * track.velocity[0],
+                    a * vy + (1 - a) * track.velocity[1],
+                )
+
+            if learn_px_per_cm:
+                self.pending_velocity_samples.append((analysis.capture_timestamp, vx))
+
+        track.mask = mask
+        track.bbox = bbox
+        track.area = int(
+            np.count_nonzero(mask[bbox[1] : bbox[3] + 1, bbox[0] : bbox[2] + 1])
+        )
+        track.centroid = centroid
+        track.last_seen = analysis.capture_timestamp
+        track.observations += 1
+        track.misses = 0
 
 
 class SegmentationModelManager:
@@ -47,11 +458,13 @@ class SegmentationModelManager:
         global_config: GlobalConfig,
         irl_interface: IRLSystemInterface,
         websocket_manager: WebSocketManager,
+        encoder_manager: EncoderManager,
     ) -> None:
         self.global_config = global_config
         self.irl_interface = irl_interface
         self.logger = global_config["logger"].ctx(system="vision_system")
         self.websocket_manager = websocket_manager
+        self.encoder_manager = encoder_manager
 
         self.main_camera = irl_interface["main_camera"]
         self.feeder_camera = irl_interface["feeder_camera"]
@@ -76,41 +489,75 @@ class SegmentationModelManager:
                 "No YOLO model path found: 'main_camera_yolo_weights_path' is missing or empty in global_config"
             )
 
-        self.latest_main_results = None
-        self.latest_feeder_results = None
+        self.latest_main_analysis: Optional[FrameAnalysis] = None
+        self.latest_feeder_analysis: Optional[FrameAnalysis] = None
+        self.latest_main_regions: Optional[SceneRegions] = None
+        self.latest_feeder_regions: Optional[SceneRegions] = None
         self.results_lock = threading.Lock()
 
+        # Learned feeder and conveyor geometry, so per frame only objects are segmented
+        self.main_scene: Optional[StaticSceneCache] = None
+        self.feeder_scene: Optional[StaticSceneCache] = None
+        if global_config["static_scene_cache_enabled"]:
+            self.main_scene = StaticSceneCache(
+                global_config, "main_camera", self._buildSceneRegions
+            )
+            self.feeder_scene = StaticSceneCache(
+                global_config, "feeder_camera", self._buildSceneRegions
+            )
+
+        # Track ids are assigned here rather than by the model. Not behind an
+        # --enable flag: model.track(persist=False) rebuilt its tracker on every
+        # call, and the worker process and crop paths only return predictions
+        self.main_tracker = MaskTracker(global_config, "main_camera")
+        self.feeder_tracker = MaskTracker(global_config, "feeder_camera")
+        self.main_trajectories = TrajectoryEstimator()
+
+        # Changes the state machine reacts to, published as frames show them
+        self.events = VisionEventBus()
+        self.last_main_camera_state = MainCameraState.NO_OBJECT_UNDER_CAMERA
+
         # Frame tracking for classification
-        self.main_camera_frames: List[Tuple[np.ndarray, Any]] = []
-        self.frame_history_lock = threading.Lock()
-        self.max_frame_history = 30
+        self.main_camera_frames = FrameHistory(
+            global_config["main_camera_frame_history_size"],
+            global_config["main_camera_frame_history_jpeg_size"],
+        )
 
         self.running = False
         self.main_thread = None
         self.feeder_thread = None
 
         # Performance tracking
-        self.main_frame_times = []
-        self.feeder_frame_times = []
-        self.main_processing_times = []
-        self.feeder_processing_times = []
-        self.performance_lock = threading.Lock()
+        self.metrics = global_config["metrics"]
 
         # Object detection tracking
-        self.object_detections: List[ObjectDetection] = []
-        self.detection_lock = threading.Lock()
-
-        # Video recording
-        self.main_camera_raw_writer = None
-        self.main_camera_annotated_writer = None
-        self.feeder_camera_raw_writer = None
-        self.feeder_camera_annotated_writer = None
+        self.object_detections = ObjectDetectionStore(OBJECT_DETECTION_RETENTION_S)
+
+        # Video recording, written off the vision loop
+        self.main_camera_raw_recorder: Optional[VideoRecorder] = None
+        self.main_camera_annotated_recorder: Optional[VideoRecorder] = None
+        self.feeder_camera_raw_recorder: Optional[VideoRecorder] = None
+        self.feeder_camera_annotated_recorder: Optional[VideoRecorder] = None
+
+        # Clip recording, a pre-roll ring per camera saved around events
+        self.main_camera_clip_recorder: Optional[ClipRecorder] = None
+        self.feeder_camera_clip_recorder: Optional[ClipRecorder] = None
+        self.recent_clips: List[ClipRequest] = []
+        self.clips_lock = threading.Lock()
+
+        # Annotated previews, drawn on demand
+        self.last_annotation_times: Dict[CameraType, float] = {
+            CameraType.MAIN_CAMERA: 0.0,
+            CameraType.FEEDER_CAMERA: 0.0,
+        }
 
     def start(self) -> None:
         self.running = True
 
-        if self.global_config["recording_enabled"]:
-            self._initializeVideoWriters()
+        self._startVideoRecorders()
+
+        self.main_camera.startGrabbing()
+        self.feeder_camera.startGrabbing()
 
         self.main_thread = threading.Thread(target=self._trackMainCamera, daemon=True)
 
@@ -128,109 +575,185 @@ class SegmentationModelManager:
         if self.feeder_thread:
             self.feeder_thread.join()
 
-        if self.global_config["recording_enabled"]:
-            self._cleanupVideoWriters()
+        self.main_camera.stopGrabbing()
+        self.feeder_camera.stopGrabbing()
 
-    def _initializeVideoWriters(self) -> None:
+        self._stopVideoRecorders()
+
+    def _startVideoRecorders(self) -> None:
         recordings_dir = os.path.join(self.global_config["run_blob_dir"], "recordings")
-        os.makedirs(recordings_dir, exist_ok=True)
-
-        fourcc = cv2.VideoWriter_fourcc("M", "J", "P", "G")
-        fps = 10.0  # Approximate based on 0.1s sleep
-        frame_size = (1920, 1080)  # Full 1080p resolution
-
-        self.main_camera_raw_writer = cv2.VideoWriter(
-            os.path.join(recordings_dir, "main_camera_raw.avi"), fourcc, fps, frame_size
-        )
-        self.main_camera_annotated_writer = cv2.VideoWriter(
-            os.path.join(recordings_dir, "main_camera_annotated.avi"),
-            fourcc,
-            fps,
-            frame_size,
-        )
-        self.feeder_camera_raw_writer = cv2.VideoWriter(
-            os.path.join(recordings_dir, "feeder_camera_raw.avi"),
-            fourcc,
-            fps,
-            frame_size,
-        )
-        self.feeder_camera_annotated_writer = cv2.VideoWriter(
-            os.path.join(recordings_dir, "feeder_camera_annotated.avi"),
-            fourcc,
-            fps,
-            frame_size,
-        )
-
-    def _cleanupVideoWriters(self) -> None:
-        if self.main_camera_raw_writer:
-            self.main_camera_raw_writer.release()
-        if self.main_camera_annotated_writer:
-            self.main_camera_annotated_writer.release()
-        if self.feeder_camera_raw_writer:
-            self.feeder_camera_raw_writer.release()
-        if self.feeder_camera_annotated_writer:
-            self.feeder_camera_annotated_writer.release()
+
+        if self.global_config["recording_enabled"]:
+            self.main_camera_raw_recorder = VideoRecorder(
+                self.global_config, "main_camera_raw", recordings_dir
+            )
+            self.main_camera_annotated_recorder = VideoRecorder(
+                self.global_config, "main_camera_annotated", recordings_dir
+            )
+            self.feeder_camera_raw_recorder = VideoRecorder(
+                self.global_config, "feeder_camera_raw", recordings_dir
+            )
+            self.feeder_camera_annotated_recorder = VideoRecorder(
+                self.global_config, "feeder_camera_annotated", recordings_dir
+            )
+
+        if self.global_config["clip_recording_enabled"]:
+            clips_dir = os.path.join(recordings_dir, "clips")
+            self.main_camera_clip_recorder = ClipRecorder(
+                self.global_config, "main_camera", clips_dir
+            )
+            self.feeder_camera_clip_recorder = ClipRecorder(
+                self.global_config, "feeder_camera", clips_dir
+            )
+
+        for recorder in self._videoRecorders():
+            recorder.start()
+
+    def _stopVideoRecorders(self) -> None:
+        for recorder in self._videoRecorders():
+            recorder.stop()
+
+    def _videoRecorders(self) -> List[BackgroundRecorder]:
+        recorders: List[Optional[BackgroundRecorder]] = [
+            self.main_camera_raw_recorder,
+            self.main_camera_annotated_recorder,
+            self.feeder_camera_raw_recorder,
+            self.feeder_camera_annotated_recorder,
+            self.main_camera_clip_recorder,
+            self.feeder_camera_clip_recorder,
+        ]
+        return [recorder for recorder in recorders if recorder is not None]
+
+    def recordClip(self, event: str) -> None:
+        # both cameras save the pre-roll before now and the post-roll after it
+        clip_recorders = [
+            recorder
+            for recorder in [
+                self.main_camera_clip_recorder,
+                self.feeder_camera_clip_recorder,
+            ]
+            if recorder is not None
+        ]
+        if not clip_recorders:
+            return
+
+        current_time = time.time()
+        clip = ClipRequest(
+            event=event,
+            trigger_time=current_time,
+            start_time=current_time - self.global_config["clip_pre_roll_s"],
+            end_time=current_time + self.global_config["clip_post_roll_s"],
+        )
+        with self.clips_lock:
+            self.recent_clips = [
+                c for c in self.recent_clips if c.end_time > current_time
+            ]
+            self.recent_clips.append(clip)
+        for recorder in clip_recorders:
+            recorder.requestClip(clip)
+
+    def tagRecentClips(self, tag: str) -> None:
+        # clips are named when their post-roll ends, so a tag can only be
+        # added to ones still recording
+        current_time = time.time()
+        with self.clips_lock:
+            for clip in self.recent_clips:
+                if clip.tag is None and clip.end_time > current_time:
+                    clip.tag = tag
 
     def _trackMainCamera(self) -> None:
-        model = YOLO(self.main_model_path)
-        if self.global_config.get("tensor_device"):
-            model.to(self.global_config["tensor_device"])
+        inference = buildInference(
+            self.global_config, "main_camera", self.main_model_path
+        )
+        gate = self._buildFrameChangeGate()
+        analysis: Optional[FrameAnalysis] = None
         frame_count = 0
+        last_sequence = 0
         try:
             while self.running:
-                frame_count += 1
-                frame = self.main_camera.captureFrame()
-
-                if frame is not None:
-                    # Record raw frame
-                    if (
-                        self.global_config["recording_enabled"]
-                        and self.main_camera_raw_writer
-                    ):
-                        if frame.shape[:2] != (1080, 1920):  # height, width
-                            frame_resized = cv2.resize(frame, (1920, 1080))
-                            self.main_camera_raw_writer.write(frame_resized)
-                        else:
-                            self.main_camera_raw_writer.write(frame)
+                # run back-to-back on the freshest frame instead of a fixed sleep
+                captured = self.main_camera.readLatestFrame(
+                    last_sequence, FRAME_WAIT_TIMEOUT_S
+                )
 
-                    start_time = time.time()
-                    results = model.track(
-                        frame,
-                        persist=False,  # Persist true is really bad in this situation. if it misses the first few frames of segmentation, it'll never find the object as it crosses the frame
+                if captured is not None:
+                    frame_count += 1
+                    dropped_frames = (
+                        captured.sequence - last_sequence - 1 if last_sequence else 0
                     )
-                    # results = model(frame)
-                    processing_time = time.time() - start_time
+                    last_sequence = captured.sequence
+                    trace = FrameTrace(captured.timestamp)
 
-                    self._trackPerformance(CameraType.MAIN_CAMERA, processing_time)
+                    # copy into the next preallocated history slot
+                    frame = self.main_camera_frames.store(captured.frame)
+                    trace.mark("capture")
 
-                    with self.results_lock:
-                        self.latest_main_results = results
+                    # Record raw frame
+                    if self.main_camera_raw_recorder:
+                        self.main_camera_raw_recorder.write(frame, captured.timestamp)
+                    if self.main_camera_clip_recorder:
+                        self.main_camera_clip_recorder.write(frame, captured.timestamp)
+                    trace.mark("recording")
 
-                    # Store frame and results for classification
-                    with self.frame_history_lock:
-                        self.main_camera_frames.append((frame.copy(), results))
-                        if len(self.main_camera_frames) > self.max_frame_history:
-                            self.main_camera_frames.pop(0)
+                    start_time = time.time()
+                    full_frame = self._needsFullFrame(self.main_scene, start_time)
+                    if (
+                        gate is None
+                        or analysis is None
+                        or gate.shouldInfer(frame, start_time, force=full_frame)
+                    ):
+                        inferred = self._inferMainCamera(
+                            inference, frame, full_frame, captured.timestamp
+                        )
+                        if inferred is None:
+                            # the worker is busy or gone, this frame goes unanalyzed
+                            continue
+                        trace.mark("inference")
+                        # objects on the main camera ride the belt
+                        analysis = self.main_tracker.update(
+                            inferred,
+                            self.encoder_manager.getCurrentSpeedCmPerS(),
+                            self.encoder_manager.getLatestSpeedSample(),
+                        )
+                        self.main_trajectories.update(analysis)
+                        trace.mark("post_processing")
+                        processing_time = time.time() - start_time
 
-                    if results and len(results) > 0:
-                        annotated_frame = results[0].plot()
+                        self._trackPerformance(
+                            CameraType.MAIN_CAMERA, processing_time, dropped_frames
+                        )
                     else:
-                        annotated_frame = frame
+                        # nothing changed where pieces can be, so the last results
+                        # still describe this frame
+                        analysis = dataclasses.replace(
+                            analysis,
+                            timestamp=start_time,
+                            capture_timestamp=captured.timestamp,
+                        )
 
-                    # Record annotated frame
-                    if (
-                        self.global_config["recording_enabled"]
-                        and self.main_camera_annotated_writer
-                    ):
-                        if annotated_frame.shape[:2] != (1080, 1920):  # height, width
-                            annotated_resized = cv2.resize(
-                                annotated_frame, (1920, 1080)
-                            )
-                            self.main_camera_annotated_writer.write(annotated_resized)
-                        else:
-                            self.main_camera_annotated_writer.write(annotated_frame)
+                    regions = self._sceneRegionsForFrame(
+                        self.main_scene, analysis, full_frame
+                    )
+                    if gate is not None:
+                        gate.setRegionOfInterest(regions.label_raster)
+                    with self.results_lock:
+                        self.latest_main_analysis = analysis
+                        self.latest_main_regions = regions
+
+                    # Store frame and its analysis for classification
+                    self.main_camera_frames.commit(analysis)
+                    self._publishMainCameraEvents(analysis)
+                    trace.mark("analysis")
 
-                    self._broadcastFrame(CameraType.MAIN_CAMERA, annotated_frame)
+                    self._publishAnnotatedFrame(
+                        CameraType.MAIN_CAMERA,
+                        frame,
+                        analysis,
+                        captured.timestamp,
+                        self.main_camera_annotated_recorder,
+                        trace,
+                    )
+                    recordFrameTrace(self.metrics, CameraType.MAIN_CAMERA.value, trace)
 
                     # Broadcast performance metrics every 30 frames
                     if frame_count % 30 == 0:
@@ -240,67 +763,100 @@ class SegmentationModelManager:
                         self.websocket_manager.broadcast_camera_performance(
                             CameraType.MAIN_CAMERA, metrics
                         )
-
-                time.sleep(0.1)
         except Exception as e:
             self.logger.error(f"Error in main camera tracking: {e}")
+        finally:
+            inference.close()
 
     def _trackFeederCamera(self) -> None:
-        model = YOLO(self.feeder_model_path)
-        if self.global_config.get("tensor_device"):
-            model.to(self.global_config["tensor_device"])
+        inference = buildInference(
+            self.global_config, "feeder_camera", self.feeder_model_path
+        )
+        gate = self._buildFrameChangeGate()
+        analysis: Optional[FrameAnalysis] = None
         frame_count = 0
+        last_sequence = 0
         try:
             while self.running:
-                frame_count += 1
-                frame = self.feeder_camera.captureFrame()
+                captured = self.feeder_camera.readLatestFrame(
+                    last_sequence, FRAME_WAIT_TIMEOUT_S
+                )
+
+                if captured is not None:
+                    frame_count += 1
+                    dropped_frames = (
+                        captured.sequence - last_sequence - 1 if last_sequence else 0
+                    )
+                    last_sequence = captured.sequence
+                    trace = FrameTrace(captured.timestamp)
+                    frame = captured.frame
+                    trace.mark("capture")
 
-                if frame is not None:
                     # Record raw frame
+                    if self.feeder_camera_raw_recorder:
+                        self.feeder_camera_raw_recorder.write(frame, captured.timestamp)
+                    if self.feeder_camera_clip_recorder:
+                        self.feeder_camera_clip_recorder.write(
+                            frame, captured.timestamp
+                        )
+                    trace.mark("recording")
+
+                    start_time = time.time()
+                    full_frame = self._needsFullFrame(self.feeder_scene, start_time)
                     if (
-                        self.global_config["recording_enabled"]
-                        and self.feeder_camera_raw_writer
+                        gate is None
+                        or analysis is None
+                        or gate.shouldInfer(frame, start_time, force=full_frame)
                     ):
-                        if frame.shape[:2] != (1080, 1920):  # height, width
-                            frame_resized = cv2.resize(frame, (1920, 1080))
-                            self.feeder_camera_raw_writer.write(frame_resized)
-                        else:
-                            self.feeder_camera_raw_writer.write(frame)
+                        inferred = inference.infer(
+                            frame,
+                            None if full_frame else [OBJECT_CLASS_ID],
+                            captured.timestamp,
+                        )
+                        if inferred is None:
+                            # the worker is busy or gone, this frame goes unanalyzed
+                            continue
+                        trace.mark("inference")
+                        analysis = self.feeder_tracker.update(inferred)
+                        trace.mark("post_processing")
+                        processing_time = time.time() - start_time
+
+                        self._trackPerformance(
+                            CameraType.FEEDER_CAMERA, processing_time, dropped_frames
+                        )
+                    else:
+                        # nothing changed where pieces can be, so the last results
+                        # still describe this frame
+                        analysis = dataclasses.replace(
+                            analysis,
+                            timestamp=start_time,
+                            capture_timestamp=captured.timestamp,
+                        )
 
-                    start_time = time.time()
-                    results = model.track(
-                        frame,
-                        persist=False,
+                    regions = self._sceneRegionsForFrame(
+                        self.feeder_scene, analysis, full_frame
                     )
-                    processing_time = time.time() - start_time
-
-                    self._trackPerformance(CameraType.FEEDER_CAMERA, processing_time)
-
+                    if gate is not None:
+                        gate.setRegionOfInterest(regions.label_raster)
                     with self.results_lock:
-                        self.latest_feeder_results = results
+                        self.latest_feeder_analysis = analysis
+                        self.latest_feeder_regions = regions
 
                     # Update object detections tracking
-                    self._updateObjectDetections()
+                    self._updateObjectDetections(analysis, regions)
+                    trace.mark("analysis")
 
-                    if results and len(results) > 0:
-                        annotated_frame = results[0].plot()
-                    else:
-                        annotated_frame = frame
-
-                    # Record annotated frame
-                    if (
-                        self.global_config["recording_enabled"]
-                        and self.feeder_camera_annotated_writer
-                    ):
-                        if annotated_frame.shape[:2] != (1080, 1920):  # height, width
-                            annotated_resized = cv2.resize(
-                                annotated_frame, (1920, 1080)
-                            )
-                            self.feeder_camera_annotated_writer.write(annotated_resized)
-                        else:
-                            self.feeder_camera_annotated_writer.write(annotated_frame)
-
-                    self._broadcastFrame(CameraType.FEEDER_CAMERA, annotated_frame)
+                    self._publishAnnotatedFrame(
+                        CameraType.FEEDER_CAMERA,
+                        frame,
+                        analysis,
+                        captured.timestamp,
+                        self.feeder_camera_annotated_recorder,
+                        trace,
+                    )
+                    recordFrameTrace(
+                        self.metrics, CameraType.FEEDER_CAMERA.value, trace
+                    )
 
                     # Broadcast performance metrics every 30 frames
                     if frame_count % 30 == 0:
@@ -310,147 +866,236 @@ class SegmentationModelManager:
                         self.websocket_manager.broadcast_camera_performance(
                             CameraType.FEEDER_CAMERA, metrics
                         )
-
-                time.sleep(0.1)
         except Exception as e:
             self.logger.error(f"Error in feeder camera tracking: {e}")
+        finally:
+            inference.close()
 
-    def _broadcastFrame(self, camera_type: CameraType, frame: np.ndarray) -> None:
-        self.websocket_manager.broadcast_frame(camera_type, frame)
-
-    def _trackPerformance(
-        self, camera_type: CameraType, processing_time: float
-    ) -> None:
-        current_time = time.time()
-
-        with self.performance_lock:
-            if camera_type == CameraType.MAIN_CAMERA:
-                self.main_frame_times.append(current_time)
-                self.main_processing_times.append(processing_time)
-
-                # Keep only last 5 seconds of data
-                cutoff_time = current_time - 5.0
-                while self.main_frame_times and self.main_frame_times[0] < cutoff_time:
-                    self.main_frame_times.pop(0)
-                    self.main_processing_times.pop(0)
-
-            else:  # FEEDER_CAMERA
-                self.feeder_frame_times.append(current_time)
-                self.feeder_processing_times.append(processing_time)
-
-                # Keep only last 5 seconds of data
-                cutoff_time = current_time - 5.0
-                while (
-                    self.feeder_frame_times and self.feeder_frame_times[0] < cutoff_time
-                ):
-                    self.feeder_frame_times.pop(0)
-                    self.feeder_processing_times.pop(0)
-
-    def _calculatePerformanceMetrics(
-        self, camera_type: CameraType
-    ) -> CameraPerformanceMetrics:
-        current_time = time.time()
+    def _inferMainCamera(
+        self,
+        inference: SegmentationInference,
+        frame: np.ndarray,
+        full_frame: bool,
+        capture_time: float,
+    ) -> Optional[FrameAnalysis]:
+        if full_frame:
+            return inference.infer(frame, None, capture_time)
+
+        crop = self._mainCameraCrop((frame.shape[0], frame.shape[1]))
+        if crop is None:
+            return inference.infer(frame, [OBJECT_CLASS_ID], capture_time)
+
+        (x1, y1, x2, y2), mask_shape = crop
+        crop_analysis = inference.infer(
+            np.ascontiguousarray(frame[y1 : y2 + 1, x1 : x2 + 1]),
+            [OBJECT_CLASS_ID],
+            capture_time,
+        )
+        if crop_analysis is None:
+            return None
+        return remapAnalysisFromCrop(
+            crop_analysis, (x1, y1), (frame.shape[0], frame.shape[1]), mask_shape
+        )
 
-        with self.performance_lock:
-            if camera_type == CameraType.MAIN_CAMERA:
-                frame_times = self.main_frame_times
-                processing_times = self.main_processing_times
-            else:
-                frame_times = self.feeder_frame_times
-                processing_times = self.feeder_processing_times
+    def _mainCameraCrop(
+        self, frame_shape: Tuple[int, int]
+    ) -> Optional[Tuple[Tuple[int, int, int, int], Tuple[int, int]]]:
+        # Crop to the learned conveyor band plus a margin, only objects on the
+        # band matter for the main camera decisions
+        if not self.global_config["main_camera_roi_enabled"]:
+            return None
+        regions = self.main_scene.regions if self.main_scene else None
+        if regions is None or regions.label_raster is None:
+            return None
 
-            if len(frame_times) < 2:
-                return CameraPerformanceMetrics(
-                    fps_1s=0.0, fps_5s=0.0, latency_1s=0.0, latency_5s=0.0
-                )
+        band_bboxes = [
+            bbox for bbox in regions.bboxes_by_class.get("main_conveyor", []) if bbox
+        ]
+        if not band_bboxes:
+            return None
 
-            # Calculate FPS for 1s and 5s windows
-            cutoff_1s = current_time - 1.0
-            cutoff_5s = current_time - 5.0
+        mask_shape = (regions.label_raster.shape[0], regions.label_raster.shape[1])
+        x1, y1, x2, y2 = maskBoxToFrame(
+            (
+                min(bbox[0] for bbox in band_bboxes),
+                min(bbox[1] for bbox in band_bboxes),
+                max(bbox[2] for bbox in band_bboxes),
+                max(bbox[3] for bbox in band_bboxes),
+            ),
+            mask_shape,
+            frame_shape,
+        )
+        margin_px = self.global_config["main_camera_roi_margin_px"]
+        frame_height, frame_width = frame_shape
+        crop_rect = (
+            max(0, x1 - margin_px),
+            max(0, y1 - margin_px),
+            min(frame_width - 1, x2 + margin_px),
+            min(frame_height - 1, y2 + margin_px),
+        )
 
-            frames_1s = sum(1 for t in frame_times if t >= cutoff_1s)
-            frames_5s = len(frame_times)
+        crop_area = (crop_rect[2] - crop_rect[0] + 1) * (
+            crop_rect[3] - crop_rect[1] + 1
+        )
+        if crop_area >= frame_height * frame_width * MAIN_CAMERA_ROI_MAX_FRAME_FRACTION:
+            return None
+        return crop_rect, mask_shape
 
-            fps_1s = frames_1s / 1.0 if frames_1s > 0 else 0.0
-            fps_5s = frames_5s / 5.0 if frames_5s > 0 else 0.0
+    def _buildFrameChangeGate(self) -> Optional[FrameChangeGate]:
+        if not self.global_config["frame_change_gate_enabled"]:
+            return None
+        return FrameChangeGate(self.global_config)
 
-            # Calculate average latency for 1s and 5s windows
-            processing_1s = [
-                p for i, p in enumerate(processing_times) if frame_times[i] >= cutoff_1s
-            ]
-            processing_5s = processing_times
+    def _needsFullFrame(
+        self, scene: Optional[StaticSceneCache], current_time: float
+    ) -> bool:
+        return scene is None or scene.needsFullFrame(current_time)
 
-            latency_1s = (
-                sum(processing_1s) / len(processing_1s) * 1000 if processing_1s else 0.0
-            )
-            latency_5s = (
-                sum(processing_5s) / len(processing_5s) * 1000 if processing_5s else 0.0
-            )
+    def _sceneRegionsForFrame(
+        self,
+        scene: Optional[StaticSceneCache],
+        analysis: FrameAnalysis,
+        full_frame: bool,
+    ) -> SceneRegions:
+        if scene is not None:
+            if full_frame:
+                scene.update(analysis)
+            if scene.regions is not None:
+                return scene.regions
+
+        # not learned yet, fall back to this frame's own region masks
+        masks_by_class = masksByClass(analysis)
+        masks_by_class.pop(className(OBJECT_CLASS_ID), None)
+        return self._buildSceneRegions(masks_by_class)
+
+    def _buildSceneRegions(
+        self, masks_by_class: Dict[str, List[np.ndarray]]
+    ) -> SceneRegions:
+        bboxes_by_class = {
+            name: [self._getBoundingBoxFromMask(mask) for mask in masks]
+            for name, masks in masks_by_class.items()
+        }
+
+        main_conveyor_bboxes_with_margin = []
+        for mask, bbox in zip(
+            masks_by_class.get("main_conveyor", []),
+            bboxes_by_class.get("main_conveyor", []),
+        ):
+            if bbox:
+                main_conveyor_bboxes_with_margin.append(
+                    self._applyMarginToBoundingBox(
+                        bbox,
+                        MARGIN_FOR_MAIN_CONVEYOR_BOUNDING_BOX_PX,
+                        (mask.shape[0], mask.shape[1]),
+                    )
+                )
 
-            return CameraPerformanceMetrics(
-                fps_1s=fps_1s,
-                fps_5s=fps_5s,
-                latency_1s=latency_1s,
-                latency_5s=latency_5s,
-            )
+        return SceneRegions(
+            masks_by_class=masks_by_class,
+            bboxes_by_class=bboxes_by_class,
+            main_conveyor_bboxes_with_margin=main_conveyor_bboxes_with_margin,
+            label_raster=buildRegionLabelRaster(masks_by_class, REGION_NAMES),
+            first_feeder_distance_maps={},
+        )
 
-    def _getMainCameraResults(self) -> Any:
-        with self.results_lock:
-            return self.latest_main_results
+    def _publishAnnotatedFrame(
+        self,
+        camera_type: CameraType,
+        frame: np.ndarray,
+        analysis: FrameAnalysis,
+        capture_time: float,
+        annotated_recorder: Optional[VideoRecorder],
+        trace: FrameTrace,
+    ) -> None:
+        # drawing is only for people watching, so it happens when someone is
+        # and no more often than the preview rate
+        live_view = self.websocket_manager.has_active_connections()
+        recording = annotated_recorder is not None
+        if not live_view and not recording:
+            return
 
-    def _getFeederCameraResults(self) -> Any:
-        with self.results_lock:
-            return self.latest_feeder_results
+        current_time = time.time()
+        min_interval = 1.0 / self.global_config["annotated_preview_max_fps"]
+        if current_time - self.last_annotation_times[camera_type] < min_interval:
+            return
+        self.last_annotation_times[camera_type] = current_time
 
-    def _masksOverlap(self, mask1: np.ndarray, mask2: np.ndarray) -> bool:
-        overlap = np.logical_and(mask1, mask2)
-        return bool(np.any(overlap))
+        preview_size = self._previewSize((frame.shape[0], frame.shape[1]))
+        preview = cv2.resize(frame, preview_size, interpolation=cv2.INTER_AREA)
+        annotated_frame = renderFrameAnalysis(preview, analysis)
+        trace.mark("annotation")
 
-    def _getDetectedMasksByClass(self) -> Dict[str, List[np.ndarray]]:
-        results = self._getFeederCameraResults()
-        if not results or len(results) == 0:
-            return {}
+        if annotated_recorder is not None:
+            annotated_recorder.write(annotated_frame, capture_time)
+            trace.mark("recording")
+        if live_view:
+            self._broadcastFrame(camera_type, annotated_frame)
+            trace.mark("broadcast")
 
-        masks_by_class: Dict[str, List[np.ndarray]] = {}
+    def _previewSize(self, frame_shape: Tuple[int, int]) -> Tuple[int, int]:
+        height, width = frame_shape
+        preview_width = min(width, self.global_config["annotated_preview_width"])
+        return preview_width, round(height * preview_width / width)
 
-        for result in results:
-            if result.masks is not None:
-                for i, mask in enumerate(result.masks):
-                    class_id = int(result.boxes[i].cls.item())
-                    class_name = YOLO_CLASSES.get(class_id, f"unknown_{class_id}")
-                    mask_data = (
-                        mask.data[0].cpu().numpy()
-                    )  # Get the mask as numpy array
+    def _broadcastFrame(self, camera_type: CameraType, frame: np.ndarray) -> None:
+        self.websocket_manager.broadcast_frame(camera_type, frame)
 
-                    if class_name not in masks_by_class:
-                        masks_by_class[class_name] = []
-                    masks_by_class[class_name].append(mask_data)
+    def _trackPerformance(
+        self, camera_type: CameraType, processing_time: float, dropped_frames: int
+    ) -> None:
+        current_time = time.time()
+        prefix = f"vision.{camera_type.value}"
+        self.metrics.timeSeries(f"{prefix}.latency_s").add(
+            processing_time, current_time
+        )
+        self.metrics.timeSeries(f"{prefix}.dropped_frames").add(
+            dropped_frames, current_time
+        )
+        self.metrics.histogram(f"{prefix}.latency_s").record(processing_time)
 
-        return masks_by_class
+    def _calculatePerformanceMetrics(
+        self, camera_type: CameraType
+    ) -> CameraPerformanceMetrics:
+        current_time = time.time()
+        prefix = f"vision.{camera_type.value}"
+        latencies = self.metrics.timeSeries(f"{prefix}.latency_s")
+        dropped_frames = self.metrics.timeSeries(f"{prefix}.dropped_frames")
+
+        # one latency sample per inferred frame
+        return CameraPerformanceMetrics(
+            fps_1s=latencies.windowRate(1.0, current_time),
+            fps_5s=latencies.windowRate(5.0, current_time),
+            latency_1s=latencies.windowMean(1.0, current_time) * 1000,
+            latency_5s=latencies.windowMean(5.0, current_time) * 1000,
+            dropped_frames_5s=int(dropped_frames.windowSum(5.0, current_time)),
+            stage_latency_ms=stageLatencySummary(self.metrics, camera_type.value, 5.0),
+        )
 
-    def _getDetectedMasks(self) -> Dict[str, List[Tuple[np.ndarray, Optional[str]]]]:
-        results = self._getFeederCameraResults()
-        if not results or len(results) == 0:
-            return {}
+    def getPerformanceReport(self) -> Dict[str, CameraPerformanceMetrics]:
+        return {
+            camera_type.value: self._calculatePerformanceMetrics(camera_type)
+            for camera_type in [CameraType.MAIN_CAMERA, CameraType.FEEDER_CAMERA]
+        }
 
-        masks_by_class: Dict[str, List[Tuple[np.ndarray, Optional[str]]]] = {}
+    def getMainCameraAnalysis(self) -> Optional[FrameAnalysis]:
+        with self.results_lock:
+            return self.latest_main_analysis
 
-        for result in results:
-            if result.masks is not None:
-                for i, mask in enumerate(result.masks):
-                    class_id = int(result.boxes[i].cls.item())
-                    class_name = YOLO_CLASSES.get(class_id, f"unknown_{class_id}")
-                    mask_data = mask.data[0].cpu().numpy()
+    def getFeederCameraAnalysis(self) -> Optional[FrameAnalysis]:
+        with self.results_lock:
+            return self.latest_feeder_analysis
 
-                    track_id = None
-                    if result.boxes.id is not None and i < len(result.boxes.id):
-                        track_id = str(int(result.boxes.id[i].item()))
+    def getMainCameraRegions(self) -> Optional[SceneRegions]:
+        with self.results_lock:
+            return self.latest_main_regions
 
-                    if class_name not in masks_by_class:
-                        masks_by_class[class_name] = []
-                    masks_by_class[class_name].append((mask_data, track_id))
+    def getFeederCameraRegions(self) -> Optional[SceneRegions]:
+        with self.results_lock:
+            return self.latest_feeder_regions
 
-        return masks_by_class
+    def _masksOverlap(self, mask1: np.ndarray, mask2: np.ndarray) -> bool:
+        overlap = np.logical_and(mask1, mask2)
+        return bool(np.any(overlap))
 
     def _getBoundingBoxFromMask(
         self, mask: np.ndarray
@@ -524,91 +1169,59 @@ class SegmentationModelManager:
         return intersection_area / bbox1_area
 
     def _calculateMinDistanceToMask(
-        self, obj_bbox: Optional[Tuple[int, int, int, int]], mask: Optional[np.ndarray]
+        self,
+        obj_bbox: Optional[Tuple[int, int, int, int]],
+        distance_map: Optional[np.ndarray],
     ) -> float:
-        if obj_bbox is None or mask is None:
+        if obj_bbox is None or distance_map is None:
             return float("inf")
 
-        # Get object bounding box coordinates
-        x1_obj, y1_obj, x2_obj, y2_obj = obj_bbox
-
-        # Find all pixels in the mask
-        mask_pixels = np.where(mask)
-        if len(mask_pixels[0]) == 0:
-            return float("inf")
-
-        # Convert to (y, x) coordinates
-        mask_y, mask_x = mask_pixels
-
-        # Calculate minimum distance from bounding box to any mask pixel
-        min_distance = float("inf")
+        return minDistanceFromBoundingBox(obj_bbox, distance_map)
 
-        for my, mx in zip(mask_y, mask_x):
-            # Distance from point to rectangle
-            dx = max(x1_obj - mx, 0, mx - x2_obj)
-            dy = max(y1_obj - my, 0, my - y2_obj)
-            distance = np.sqrt(dx * dx + dy * dy)
-            min_distance = min(min_distance, distance)
-
-        return min_distance
-
-    def _calculateMaskEdgeProximity(
-        self, object_mask: np.ndarray, target_mask: np.ndarray, proximity_px: int = 12
-    ) -> float:
-        if object_mask.shape != target_mask.shape:
+    def _calculateRegionProximities(
+        self,
+        object_mask: np.ndarray,
+        object_bbox: Optional[Tuple[int, int, int, int]],
+        regions: SceneRegions,
+    ) -> Dict[str, float]:
+        label_raster = regions.label_raster
+        if object_bbox is None or label_raster is None:
+            return {name: 0.0 for name in REGION_NAMES}
+
+        if object_mask.shape != label_raster.shape:
             self.logger.warning(
                 "Can't calculate mask edge proximity, masks are not the same shape"
             )
-            return 0.0
-
-        # Create a dilated version of the object mask (expand edges by proximity_px)
-        kernel = np.ones((proximity_px * 2 + 1, proximity_px * 2 + 1), np.uint8)
-        dilated_object = cv2.dilate(object_mask.astype(np.uint8), kernel, iterations=1)
-
-        # Count dilated object pixels that overlap with target
-        overlap_pixels = np.logical_and(dilated_object, target_mask)
-
-        # Calculate percentage based on dilated object area
-        total_dilated_pixels = np.sum(dilated_object)
-        if total_dilated_pixels == 0:
-            return 0.0
-
-        overlap_count = np.sum(overlap_pixels)
-        return overlap_count / total_dilated_pixels
+            return {name: 0.0 for name in REGION_NAMES}
+
+        proximities = regionProximities(
+            object_mask,
+            object_bbox,
+            label_raster,
+            len(REGION_NAMES),
+            MASK_EDGE_PROXIMITY_PX,
+        )
+        return {name: float(p) for name, p in zip(REGION_NAMES, proximities)}
 
     def _analyzeObjectRegions(
         self,
         obj_mask: np.ndarray,
-        masks_by_class: Dict[str, List[np.ndarray]],
+        obj_bbox: Optional[Tuple[int, int, int, int]],
+        regions: SceneRegions,
         track_id: str,
     ) -> FeederRegion:
-        obj_bbox = self._getBoundingBoxFromMask(obj_mask)
         if obj_bbox is None:
             self.logger.info(f"REGION[{track_id}]: UNKNOWN - no bounding box")
             return FeederRegion.UNKNOWN
 
-        # Calculate all proximities upfront
-        main_conveyor_masks = masks_by_class.get("main_conveyor", [])
-        first_feeder_masks = masks_by_class.get("first_feeder", [])
-        second_feeder_masks = masks_by_class.get("second_feeder", [])
+        # Calculate all proximities upfront, in one pass over the object's neighbourhood
+        first_feeder_masks = regions.masks_by_class.get("first_feeder", [])
+        first_feeder_distance_maps = regions.first_feeder_distance_maps
 
-        total_main_conveyor_proximity = 0.0
-        for main_conveyor_mask in main_conveyor_masks:
-            total_main_conveyor_proximity += self._calculateMaskEdgeProximity(
-                obj_mask, main_conveyor_mask
-            )
-
-        total_second_proximity = 0.0
-        for second_feeder_mask in second_feeder_masks:
-            total_second_proximity += self._calculateMaskEdgeProximity(
-                obj_mask, second_feeder_mask
-            )
-
-        total_first_proximity = 0.0
-        for first_feeder_mask in first_feeder_masks:
-            total_first_proximity += self._calculateMaskEdgeProximity(
-                obj_mask, first_feeder_mask
-            )
+        proximities = self._calculateRegionProximities(obj_mask, obj_bbox, regions)
+        total_main_conveyor_proximity = proximities["main_conveyor"]
+        total_second_proximity = proximities["second_feeder"]
+        total_first_proximity = proximities["first_feeder"]
 
         self.logger.info(
             f"REGION[{track_id}]: Proximities - main_conveyor={total_main_conveyor_proximity:.3f}, second_feeder={total_second_proximity:.3f}, first_feeder={total_first_proximity:.3f}"
@@ -629,9 +1242,15 @@ class SegmentationModelManager:
             # Check if under exit of first feeder (object on second feeder but near first)
             if first_feeder_masks:
                 min_distance_to_first = float("inf")
-                for first_feeder_mask in first_feeder_masks:
+                for i, first_feeder_mask in enumerate(first_feeder_masks):
+                    # the distance transform is built at most once per mask and
+                    # shared by every object until the regions change
+                    if i not in first_feeder_distance_maps:
+                        first_feeder_distance_maps[i] = buildDistanceMap(
+                            first_feeder_mask
+                        )
                     distance_to_first = self._calculateMinDistanceToMask(
-                        obj_bbox, first_feeder_mask
+                        obj_bbox, first_feeder_distance_maps[i]
                     )
                     min_distance_to_first = min(
                         min_distance_to_first, distance_to_first
@@ -644,25 +1263,15 @@ class SegmentationModelManager:
                     return FeederRegion.UNDER_EXIT_OF_FIRST_FEEDER
 
             # Check if at exit of second feeder
-            if main_conveyor_masks:
+            if regions.main_conveyor_bboxes_with_margin:
                 total_bbox_overlap = 0.0
-                for main_conveyor_mask in main_conveyor_masks:
-                    main_conveyor_bbox = self._getBoundingBoxFromMask(
-                        main_conveyor_mask
+                for (
+                    main_conveyor_bbox_with_margin
+                ) in regions.main_conveyor_bboxes_with_margin:
+                    bbox_overlap = self._calculateBoundingBoxOverlap(
+                        obj_bbox, main_conveyor_bbox_with_margin
                     )
-                    if main_conveyor_bbox:
-                        main_conveyor_bbox_with_margin = self._applyMarginToBoundingBox(
-                            main_conveyor_bbox,
-                            MARGIN_FOR_MAIN_CONVEYOR_BOUNDING_BOX_PX,
-                            (
-                                main_conveyor_mask.shape[0],
-                                main_conveyor_mask.shape[1],
-                            ),
-                        )
-                        bbox_overlap = self._calculateBoundingBoxOverlap(
-                            obj_bbox, main_conveyor_bbox_with_margin
-                        )
-                        total_bbox_overlap += bbox_overlap
+                    total_bbox_overlap += bbox_overlap
 
                 if total_bbox_overlap > MAIN_CONVEYOR_BOUNDING_BOX_OVERLAP_THRESHOLD:
                     self.logger.info(
@@ -687,124 +1296,96 @@ class SegmentationModelManager:
         )
         return FeederRegion.UNKNOWN
 
-    def _updateObjectDetections(self) -> None:
-        results = self._getFeederCameraResults()
-        if not results or len(results) == 0:
-            return
-
-        current_time = time.time()
-        masks_by_class = self._getDetectedMasksByClass()
-
-        with self.detection_lock:
-            # Process each YOLO result to get tracked objects
-            for result in results:
-                if (
-                    result.masks is not None
-                    and hasattr(result, "boxes")
-                    and result.boxes.id is not None
-                ):
-                    for i, mask in enumerate(result.masks):
-                        if i < len(result.boxes.id):
-                            class_id = int(result.boxes[i].cls.item())
-                            if class_id == 0:  # Only process "object" class
-                                track_id = str(int(result.boxes.id[i].item()))
-                                mask_data = mask.data[0].cpu().numpy()
-
-                                # Analyze what region this object is in
-                                region = self._analyzeObjectRegions(
-                                    mask_data, masks_by_class, track_id
-                                )
-                                region_reading = RegionReading(
-                                    timestamp=current_time,
-                                    region=region,
-                                    track_id=track_id,
-                                )
-
-                                # Find existing detection for this track_id or create new one
-                                existing_detection = None
-                                for detection in self.object_detections:
-                                    if detection.track_id == track_id:
-                                        existing_detection = detection
-                                        break
-
-                                if existing_detection:
-                                    # Add new reading to existing tracked object
-                                    existing_detection.region_readings.append(
-                                        region_reading
-                                    )
-                                else:
-                                    # Create new tracked object
-                                    new_detection = ObjectDetection(
-                                        track_id=track_id,
-                                        region_readings=[region_reading],
-                                    )
-                                    self.object_detections.append(new_detection)
-
-            # Cleanup old detections (keep only last 5 seconds)
-            cutoff_time = current_time - 5.0
-            self.object_detections = [
-                detection
-                for detection in self.object_detections
-                if detection.region_readings
-                and detection.region_readings[-1].timestamp >= cutoff_time
-            ]
+    def _updateObjectDetections(
+        self, analysis: FrameAnalysis, regions: SceneRegions
+    ) -> None:
+        # Only process tracked instances of the "object" class
+        for i in indicesForClass(analysis, OBJECT_CLASS_ID):
+            track_id = analysis.track_ids[i]
+            if track_id is None:
+                continue
 
-    def _getMainCameraMasksByClass(self) -> Dict[str, List[np.ndarray]]:
-        results = self._getMainCameraResults()
-        if not results or len(results) == 0:
-            return {}
+            # Analyze what region this object is in
+            region = self._analyzeObjectRegions(
+                analysis.masks[i],
+                analysis.mask_bboxes[i],
+                regions,
+                track_id,
+            )
+            region_changed = self.object_detections.record(
+                track_id, region, analysis.timestamp, analysis.capture_timestamp
+            )
+            if region_changed:
+                self.events.publish(
+                    VisionEvent(
+                        type=(
+                            VisionEventType.OBJECT_ENTERED_MAIN_CONVEYOR
+                            if region == FeederRegion.MAIN_CONVEYOR
+                            else VisionEventType.FEEDER_REGION_CHANGED
+                        ),
+                        timestamp=analysis.capture_timestamp,
+                        track_id=track_id,
+                        region=region,
+                    )
+                )
 
-        masks_by_class: Dict[str, List[np.ndarray]] = {}
-        for result in results:
-            if result.masks is not None:
-                for i, mask in enumerate(result.masks):
-                    class_id = int(result.boxes[i].cls.item())
-                    class_name = YOLO_CLASSES.get(class_id, f"unknown_{class_id}")
-                    mask_data = mask.data[0].cpu().numpy()
+        self.object_detections.expire(analysis.timestamp)
 
-                    if class_name not in masks_by_class:
-                        masks_by_class[class_name] = []
-                    masks_by_class[class_name].append(mask_data)
+    def _publishMainCameraEvents(self, analysis: FrameAnalysis) -> None:
+        main_camera_state = self.determineMainCameraState()
+        if main_camera_state == self.last_main_camera_state:
+            return
+        self.last_main_camera_state = main_camera_state
 
-        return masks_by_class
+        if (
+            main_camera_state
+            == MainCameraState.WAITING_FOR_OBJECT_TO_CENTER_UNDER_MAIN_CAMERA
+        ):
+            event_type = VisionEventType.OBJECT_UNDER_MAIN_CAMERA
+        elif main_camera_state == MainCameraState.OBJECT_CENTERED_UNDER_MAIN_CAMERA:
+            event_type = VisionEventType.OBJECT_CENTERED
+        else:
+            return
+        self.events.publish(
+            VisionEvent(type=event_type, timestamp=analysis.capture_timestamp)
+        )
 
     def determineMainCameraState(self) -> MainCameraState:
-        masks_by_class = self._getMainCameraMasksByClass()
-        object_masks = masks_by_class.get("object", [])
-        main_conveyor_masks = masks_by_class.get("main_conveyor", [])
+        analysis = self.getMainCameraAnalysis()
+        regions = self.getMainCameraRegions()
+        object_indices = indicesForClass(analysis, OBJECT_CLASS_ID)
 
-        if not object_masks or not main_conveyor_masks:
+        if (
+            analysis is None
+            or regions is None
+            or not object_indices
+            or not regions.main_conveyor_bboxes_with_margin
+        ):
             return MainCameraState.NO_OBJECT_UNDER_CAMERA
 
-        # Get frame dimensions from the first object mask
-        if object_masks:
-            frame_height, frame_width = object_masks[0].shape
-        else:
-            return MainCameraState.NO_OBJECT_UNDER_CAMERA
+        # Frame dimensions in mask coordinates
+        frame_height, frame_width = analysis.masks.shape[1:3]
+        main_conveyor_bboxes_with_margin = regions.main_conveyor_bboxes_with_margin
+
+        # the analysis shows where objects were when the frame was grabbed,
+        # the belt has carried them further since
+        current_time = time.time()
+        belt_speed_cm_per_s = self.encoder_manager.getCurrentSpeedCmPerS()
 
-        for obj_mask in object_masks:
-            obj_bbox = self._getBoundingBoxFromMask(obj_mask)
+        for i in object_indices:
+            obj_bbox = analysis.mask_bboxes[i]
             if not obj_bbox:
                 continue
 
-            # Check if object is >50% on main conveyor (sum across all conveyor masks)
-            total_conveyor_overlap = 0.0
-            for main_conveyor_mask in main_conveyor_masks:
-                main_conveyor_bbox = self._getBoundingBoxFromMask(main_conveyor_mask)
-                if main_conveyor_bbox:
-                    main_conveyor_bbox_with_margin = self._applyMarginToBoundingBox(
-                        main_conveyor_bbox,
-                        MARGIN_FOR_MAIN_CONVEYOR_BOUNDING_BOX_PX,
-                        (main_conveyor_mask.shape[0], main_conveyor_mask.shape[1]),
-                    )
-                    conveyor_overlap = self._calculateBoundingBoxOverlap(
-                        obj_bbox, main_conveyor_bbox_with_margin
-                    )
-                    total_conveyor_overlap += conveyor_overlap
-
-            if total_conveyor_overlap > MAIN_CONVEYOR_BOUNDING_BOX_OVERLAP_THRESHOLD:
+            if self._isOnMainConveyor(obj_bbox, main_conveyor_bboxes_with_margin):
                 # Object is on main conveyor, determine its position
-                obj_center_x = (obj_bbox[0] + obj_bbox[2]) / 2
+                dx, _ = self.main_tracker.predictDisplacement(
+                    analysis.track_ids[i],
+                    analysis.capture_timestamp,
+                    current_time,
+                    belt_speed_cm_per_s,
+                )
+                obj_center_x = (obj_bbox[0] + obj_bbox[2]) / 2 + dx
                 frame_center_x = frame_width / 2
                 right_edge_threshold = frame_width * (1 - RIGHT_SIDE_THRESHOLD)
 
@@ -821,181 +1402,197 @@ class SegmentationModelManager:
 
         return MainCameraState.NO_OBJECT_UNDER_CAMERA
 
+    def predictNextCenterCrossing(self) -> Optional[Tuple[str, float]]:
+        # track id and time of the next object on the main conveyor to cross
+        # the main camera center, from its trajectory
+        analysis = self.getMainCameraAnalysis()
+        regions = self.getMainCameraRegions()
+        object_indices = indicesForClass(analysis, OBJECT_CLASS_ID)
+        if (
+            analysis is None
+            or regions is None
+            or not object_indices
+            or not regions.main_conveyor_bboxes_with_margin
+        ):
+            return None
+
+        belt_px_per_s = None
+        if self.main_tracker.px_per_cm is not None:
+            belt_px_per_s = (
+                self.encoder_manager.getCurrentSpeedCmPerS()
+                * self.main_tracker.px_per_cm
+            )
+        frame_center_x = analysis.masks.shape[2] / 2
+        # a track that already crossed the center has its crossing in the
+        # past and would otherwise always be the earliest
+        earliest_crossing_time = (
+            analysis.capture_timestamp
+            - self.global_config["main_conveyor_stop_lead_ms"] / 1000.0
+        )
+
+        next_crossing: Optional[Tuple[str, float]] = None
+        for i in object_indices:
+            track_id = analysis.track_ids[i]
+            obj_bbox = analysis.mask_bboxes[i]
+            if (
+                track_id is None
+                or not obj_bbox
+                or not self._isOnMainConveyor(
+                    obj_bbox, regions.main_conveyor_bboxes_with_margin
+                )
+            ):
+                continue
+
+            crossing_time = self.main_trajectories.predictCrossingTime(
+                track_id, frame_center_x, belt_px_per_s
+            )
+            if crossing_time is None or crossing_time < earliest_crossing_time:
+                continue
+            if next_crossing is None or crossing_time < next_crossing[1]:
+                next_crossing = (track_id, crossing_time)
+        return next_crossing
+
+    def _isOnMainConveyor(
+        self,
+        obj_bbox: Tuple[int, int, int, int],
+        main_conveyor_bboxes: List[Tuple[int, int, int, int]],
+    ) -> bool:
+        # >50% of the object on the main conveyor, summed across its masks
+        total_conveyor_overlap = 0.0
+        for main_conveyor_bbox in main_conveyor_bboxes:
+            total_conveyor_overlap += self._calculateBoundingBoxOverlap(
+                obj_bbox, main_conveyor_bbox
+            )
+        return total_conveyor_overlap > MAIN_CONVEYOR_BOUNDING_BOX_OVERLAP_THRESHOLD
+
+    def getObjectDistancePastCenterCm(self, track_id: str) -> Optional[float]:
+        # how far along the belt the object is past the main camera center
+        # right now, negative when it hasn't reached it, None when unknown
+        analysis = self.getMainCameraAnalysis()
+        px_per_cm = self.main_tracker.px_per_cm
+        i = indexForTrackId(analysis, track_id)
+        if analysis is None or i is None or not px_per_cm:
+            return None
+
+        obj_bbox = analysis.mask_bboxes[i]
+        if obj_bbox is None:
+            return None
+
+        dx, _ = self.main_tracker.predictDisplacement(
+            track_id,
+            analysis.capture_timestamp,
+            time.time(),
+            self.encoder_manager.getCurrentSpeedCmPerS(),
+        )
+        obj_center_x = (obj_bbox[0] + obj_bbox[2]) / 2 + dx
+        frame_center_x = analysis.masks.shape[2] / 2
+        # px_per_cm is signed with the direction of belt travel
+        return (obj_center_x - frame_center_x) / px_per_cm
+
     def hasObjectOnMainConveyorInFeederView(self) -> bool:
-        feeder_masks = self._getDetectedMasks()
-        object_masks = feeder_masks.get("object", [])
-        main_conveyor_masks = feeder_masks.get("main_conveyor", [])
-        first_feeder_masks = feeder_masks.get("first_feeder", [])
-        second_feeder_masks = feeder_masks.get("second_feeder", [])
+        analysis = self.getFeederCameraAnalysis()
+        regions = self.getFeederCameraRegions()
+        object_indices = indicesForClass(analysis, OBJECT_CLASS_ID)
 
-        if not object_masks or not main_conveyor_masks:
+        if (
+            analysis is None
+            or regions is None
+            or not object_indices
+            or not regions.masks_by_class.get("main_conveyor")
+        ):
             return False
 
-        feeder_masks_negative = [mask for mask, _ in first_feeder_masks] + [
-            mask for mask, _ in second_feeder_masks
-        ]
-        main_conveyor_mask_data = [mask for mask, _ in main_conveyor_masks]
-
-        for obj_mask, track_id in object_masks:
-            total_edge_proximity = 0.0
-            for main_conveyor_mask in main_conveyor_mask_data:
-                edge_proximity = self._calculateMaskEdgeProximity(
-                    obj_mask, main_conveyor_mask
-                )
-                total_edge_proximity += edge_proximity
+        for i in object_indices:
+            total_edge_proximity = self._calculateRegionProximities(
+                analysis.masks[i], analysis.mask_bboxes[i], regions
+            )["main_conveyor"]
 
             if (
                 total_edge_proximity
                 > FEEDER_CAMERA_MAIN_CONVEYOR_MASK_PROXIMITY_THRESHOLD
             ):
                 self.logger.info(
-                    f"Object detected on main conveyor in feeder view with proximity: {total_edge_proximity}, track_id: {track_id}"
+                    f"Object detected on main conveyor in feeder view with proximity: {total_edge_proximity}, track_id: {analysis.track_ids[i]}"
                 )
                 return True
 
         return False
 
     def getFramesForClassification(self) -> List[np.ndarray]:
-        with self.frame_history_lock:
-            if not self.main_camera_frames:
-                return []
-
-            selected_frames = []
-
-            # Add most recent frame
-            recent_frame, _ = self.main_camera_frames[-1]
-            selected_frames.append(recent_frame)
-
-            # Find frames where object mask doesn't touch frame edges
-            for frame, results in reversed(self.main_camera_frames[:-1]):
-                if len(selected_frames) >= 6:
-                    break
-
-                if not results or len(results) == 0:
-                    continue
-
-                # Check if any object mask touches frame edges
-                frame_touches_edge = False
-                for result in results:
-                    if result.masks is not None:
-                        for mask in result.masks:
-                            mask_data = mask.data[0].cpu().numpy()
-
-                            # Check if mask touches any edge
-                            if (
-                                mask_data[0, :].any()  # Top edge
-                                or mask_data[-1, :].any()  # Bottom edge
-                                or mask_data[:, 0].any()  # Left edge
-                                or mask_data[:, -1].any()
-                            ):  # Right edge
-                                frame_touches_edge = True
-                                break
-                    if frame_touches_edge:
-                        break
-
-                if not frame_touches_edge:
-                    selected_frames.append(frame)
+        # the most recent frame, then frames where no mask touches the frame
+        # edges
+        selected_frames = self.main_camera_frames.selectLatestAndFrames(
+            lambda analysis: not bool(analysis.touches_edge.any()),
+            limit=5,
+        )
 
-            self.logger.info(
-                f"Selected {len(selected_frames)} frames for classification"
-            )
-            return selected_frames
+        self.logger.info(f"Selected {len(selected_frames)} frames for classification")
+        return selected_frames
 
     def getFramesForTrackId(self, track_id: str) -> List[np.ndarray]:
-        with self.frame_history_lock:
-            selected_frames = []
-
-            for frame, results in self.main_camera_frames:
-                if not results or len(results) == 0:
-                    continue
+        selected_frames = self.main_camera_frames.selectFrames(
+            lambda analysis: self._analysisContainsCompleteTrack(analysis, track_id),
+            newest_first=False,
+            include_jpeg_tier=True,
+        )
 
-                for result in results:
-                    if (
-                        result.masks is not None
-                        and hasattr(result, "boxes")
-                        and result.boxes.id is not None
-                    ):
-                        for i, mask in enumerate(result.masks):
-                            if i < len(result.boxes.id):
-                                current_track_id = str(int(result.boxes.id[i].item()))
-                                class_id = int(result.boxes[i].cls.item())
-
-                                if (
-                                    current_track_id == track_id and class_id == 0
-                                ):  # "object" class
-                                    mask_data = mask.data[0].cpu().numpy()
-
-                                    # Check if mask is completely in frame (not touching edges)
-                                    if not (
-                                        mask_data[0, :].any()
-                                        or mask_data[-1, :].any()
-                                        or mask_data[:, 0].any()
-                                        or mask_data[:, -1].any()
-                                    ):
-                                        selected_frames.append(frame)
-                                        break
+        self.logger.info(
+            f"Found {len(selected_frames)} complete frames for track ID {track_id}"
+        )
+        return selected_frames
+
+    def _analysisContainsCompleteTrack(
+        self, analysis: Optional[FrameAnalysis], track_id: str
+    ) -> bool:
+        i = indexForTrackId(analysis, track_id)
+        # Check if mask is completely in frame (not touching edges)
+        return analysis is not None and i is not None and not analysis.touches_edge[i]
+
+    def getObjectBoundingBox(self, track_id: str) -> Optional[BoundingBox]:
+        analysis = self.getMainCameraAnalysis()
+        i = indexForTrackId(analysis, track_id)
+        if analysis is None or i is None:
+            return None
 
-            self.logger.info(
-                f"Found {len(selected_frames)} complete frames for track ID {track_id}"
-            )
-            return selected_frames
+        x1, y1, x2, y2 = analysis.boxes_xyxy[i]
+        return BoundingBox(x1=int(x1), y1=int(y1), x2=int(x2), y2=int(y2))
 
     def getCurrentCenteredObjectId(self) -> Optional[str]:
-        results = self._getMainCameraResults()
-        if not results or len(results) == 0:
-            return None
+        analysis = self.getMainCameraAnalysis()
+        regions = self.getMainCameraRegions()
+        object_indices = indicesForClass(analysis, OBJECT_CLASS_ID)
 
-        masks_by_class = self._getMainCameraMasksByClass()
-        object_masks = masks_by_class.get("object", [])
-        main_conveyor_masks = masks_by_class.get("main_conveyor", [])
-
-        if not object_masks or not main_conveyor_masks:
+        if analysis is None or regions is None or not object_indices:
             return None
 
-        # Combine all main conveyor masks into one
-        combined_main_conveyor_mask = np.zeros_like(main_conveyor_masks[0])
-        for mask in main_conveyor_masks:
-            combined_main_conveyor_mask = np.logical_or(
-                combined_main_conveyor_mask, mask
-            )
-
-        main_conveyor_bbox = self._getBoundingBoxFromMask(combined_main_conveyor_mask)
-        if not main_conveyor_bbox:
+        # Combine all main conveyor masks into one bounding box
+        main_conveyor_bboxes = [
+            bbox for bbox in regions.bboxes_by_class.get("main_conveyor", []) if bbox
+        ]
+        if not main_conveyor_bboxes:
             return None
+        main_conveyor_bbox = (
+            min(bbox[0] for bbox in main_conveyor_bboxes),
+            min(bbox[1] for bbox in main_conveyor_bboxes),
+            max(bbox[2] for bbox in main_conveyor_bboxes),
+            max(bbox[3] for bbox in main_conveyor_bboxes),
+        )
 
-        frame_height, frame_width = object_masks[0].shape
+        frame_height, frame_width = analysis.masks.shape[1:3]
+        frame_center_x = frame_width / 2
+        center_threshold = frame_width * OBJECT_CENTER_THRESHOLD / 2
 
-        for result in results:
-            if (
-                result.masks is not None
-                and hasattr(result, "boxes")
-                and result.boxes.id is not None
-            ):
-                for i, mask in enumerate(result.masks):
-                    if i < len(result.boxes.id):
-                        class_id = int(result.boxes[i].cls.item())
-                        if class_id == 0:  # "object" class
-                            track_id = str(int(result.boxes.id[i].item()))
-                            mask_data = mask.data[0].cpu().numpy()
-                            obj_bbox = self._getBoundingBoxFromMask(mask_data)
-
-                            if obj_bbox:
-                                conveyor_overlap = self._calculateBoundingBoxOverlap(
-                                    obj_bbox, main_conveyor_bbox
-                                )
-                                if (
-                                    conveyor_overlap
-                                    > MAIN_CONVEYOR_BOUNDING_BOX_OVERLAP_THRESHOLD
-                                ):
-                                    obj_center_x = (obj_bbox[0] + obj_bbox[2]) / 2
-                                    frame_center_x = frame_width / 2
-                                    center_threshold = (
-                                        frame_width * OBJECT_CENTER_THRESHOLD / 2
-                                    )
-
-                                    if (
-                                        abs(obj_center_x - frame_center_x)
-                                        <= center_threshold
-                                    ):
-                                        return track_id
+        for i in object_indices:
+            track_id = analysis.track_ids[i]
+            obj_bbox = analysis.mask_bboxes[i]
+            if track_id is None or not obj_bbox:
+                continue
+
+            conveyor_overlap = self._calculateBoundingBoxOverlap(
+                obj_bbox, main_conveyor_bbox
+            )
+            if conveyor_overlap > MAIN_CONVEYOR_BOUNDING_BOX_OVERLAP_THRESHOLD:
+                obj_center_x = (obj_bbox[0] + obj_bbox[2]) / 2
+                if abs(obj_center_x - frame_center_x) <= center_threshold:
+                    return track_id
         return None
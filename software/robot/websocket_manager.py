@@ -44,6 +44,10 @@ class WebSocketManager:
     def disconnect(self, websocket: WebSocket):
         self.active_connections.discard(websocket)
 
+    def has_active_connections(self) -> bool:
+        # lets callers skip building a message nobody would receive
+        return bool(self.active_connections) and self.loop is not None
+
     def broadcast_frame(self, camera_type: CameraType, frame):
         if not self.active_connections or not self.loop:
             return
@@ -182,6 +186,8 @@ class WebSocketManager:
                 "fps_5s": metrics.fps_5s,
                 "latency_1s": metrics.latency_1s,
                 "latency_5s": metrics.latency_5s,
+                "dropped_frames_5s": metrics.dropped_frames_5s,
+                "stage_latency_ms": metrics.stage_latency_ms,
             }
 
             message_json = json.dumps(message)
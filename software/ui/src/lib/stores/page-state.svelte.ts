@@ -1,5 +1,9 @@
 import { setContext, getContext } from 'svelte';
-import type { KnownObject, EncoderStatus } from '../types/websocket';
+import type {
+  KnownObject,
+  EncoderStatus,
+  StageLatency,
+} from '../types/websocket';
 
 interface CameraFrame {
   camera: 'main_camera' | 'feeder_camera';
@@ -12,6 +16,7 @@ interface CameraPerformanceMetrics {
   fps_5s: number;
   latency_1s: number;
   latency_5s: number;
+  stage_latency_ms: Record<string, StageLatency>;
 }
 
 interface SortingStats {
@@ -151,6 +156,7 @@ class PageStateStore {
               fps_5s: message.fps_5s,
               latency_1s: message.latency_1s,
               latency_5s: message.latency_5s,
+              stage_latency_ms: message.stage_latency_ms,
             };
 
             if (message.camera === 'main_camera') {
@@ -61,6 +61,13 @@ export interface FeederStatusMessage {
   feeder_state: string | null;
 }
 
+export interface StageLatency {
+  p50: number;
+  p95: number;
+  p99: number;
+  max: number;
+}
+
 export interface CameraPerformanceMessage {
   type: 'camera_performance';
   camera: 'main_camera' | 'feeder_camera';
@@ -68,6 +75,8 @@ export interface CameraPerformanceMessage {
   fps_5s: number;
   latency_1s: number;
   latency_5s: number;
+  dropped_frames_5s: number;
+  stage_latency_ms: Record<string, StageLatency>;
 }
 
 export interface SortingStatsMessage {